@@ -0,0 +1,101 @@
+"""
+Measures the time needed to open a project in the FilesPanel: ProjectMeta
+construction, file listing and getFileStatus() for every file (the same
+work FilesPanel.handle_project_selected does).
+
+Usage:
+    python3 benchmarks/project_open_benchmark.py [file_count ...]
+
+By default synthetic projects with 10000 and 50000 indexed files are used.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tinydb import TinyDB, Query
+from tinydb.storages import JSONStorage
+from tinydb.middlewares import CachingMiddleware
+from modules.model.ProjectMeta.ProjectMeta import ProjectMeta
+from modules.model.ProjectMeta.dbRecords.DescriptionRecord import DescriptionRecord
+from modules.model.ProjectMeta.storage.MetaStorageBase import DESCRIPTIONS_TABLE
+
+FILES_PER_DIR = 100
+LEGACY_SAMPLE = 200
+
+
+def make_project(root, file_count, storage_backend):
+    records = []
+    for i in range(file_count):
+        rel_dir = f"pkg{i // FILES_PER_DIR}"
+        os.makedirs(os.path.join(root, rel_dir), exist_ok=True)
+        rel_path = os.path.join(rel_dir, f"module{i}.py")
+        with open(os.path.join(root, rel_path), "w") as f:
+            f.write(f"VALUE = {i}\n")
+        records.append(rel_path)
+
+    # Pre-index every file so that project opening takes the stat fast path
+    meta = ProjectMeta(root, storage_backend=storage_backend)
+    docs = []
+    for rel_path in records:
+        record = DescriptionRecord(rel_path, meta.calculate_checksum(rel_path), f"Stores the value of {rel_path}.")
+        record.set_stat(meta._stat_file(rel_path))
+        docs.append(record.to_dict())
+    meta.storage.upsert_many(DESCRIPTIONS_TABLE, docs)
+    meta.storage.close()
+    return docs
+
+
+def open_project(root, storage_backend):
+    start = time.perf_counter()
+    meta = ProjectMeta(root, storage_backend=storage_backend)
+    opened = time.perf_counter()
+    files = meta.getAll_project_files()
+    listed = time.perf_counter()
+    statuses = [meta.getFileStatus(rel_path) for rel_path in files]
+    finished = time.perf_counter()
+    # Listing again only revalidates the persisted manifest
+    meta.getAll_project_files()
+    relisted = time.perf_counter()
+    meta.storage.close()
+    return len(statuses), opened - start, listed - opened, finished - listed, relisted - finished, files
+
+
+def legacy_lookup_time(root, docs, files):
+    # Linear TinyDB Query scan used before the in-memory index
+    db = TinyDB(os.path.join(root, 'legacy_metadata.json'), storage=CachingMiddleware(JSONStorage))
+    db.insert_multiple(docs)
+    sample = files[:LEGACY_SAMPLE]
+    start = time.perf_counter()
+    for rel_path in sample:
+        db.search(Query().file_path == rel_path)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed * len(files) / max(1, len(sample))
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 50000]
+    for file_count in counts:
+        for storage_backend in ("sqlite", "tinydb"):
+            root = tempfile.mkdtemp(prefix="lttcdi_bench_")
+            try:
+                docs = make_project(root, file_count, storage_backend)
+                total, open_time, list_time, status_time, relist_time, files = open_project(root, storage_backend)
+                print(f"{file_count} files ({storage_backend}):")
+                print(f"  open metadata : {open_time:.3f}s")
+                print(f"  list files    : {list_time:.3f}s")
+                print(f"  status of {total} files: {status_time:.3f}s")
+                print(f"  list files from manifest: {relist_time:.3f}s")
+                if storage_backend == "tinydb":
+                    legacy = legacy_lookup_time(root, docs, files)
+                    print(f"  linear Query lookups (extrapolated from {LEGACY_SAMPLE}): {legacy:.1f}s")
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QObject, Qt
 from modules.model.model import ProjectGPTModel
 from modules.view.view import ProjectGPTView
 from modules.view.RobotWindow import RobotWindow
@@ -13,16 +13,29 @@ class ProjectGPTController(QObject):
 
         self.view.request_panel.send_request_signal.connect(self.handle_send_request)
         self.view.request_panel.send_batch_request_signal.connect(self.handle_send_batch_request)
+        self.view.request_panel.suggest_files_signal.connect(self.model.suggest_files)
+        self.view.request_panel.stop_request_signal.connect(self.model.llm_model.cancel_requests)
+        self.view.request_panel.profile_request_signal.connect(self.handle_profile_request)
+        self.model.request_profiled.connect(self.view.request_panel.show_request_profile)
+        self.view.files_panel.file_system_model.dataChanged.connect(self.handle_files_data_changed)
         self.view.batches_panel.get_completed_batch_jobs.connect(self.handle_get_completed_batch_jobs)
         self.view.batches_panel.get_results.connect(self.handle_get_batch_results)
         self.view.batches_panel.delete_job.connect(self.handle_delete_batch_job)
         self.view.batches_panel.cancel_job.connect(self.handle_cancel_batch_job)
 
         self.model.response_generated.connect(self.view.update_response)
+        self.model.response_started.connect(self.view.start_response)
+        self.model.response_chunk_received.connect(self.view.append_response_chunk)
+        self.model.request_finished.connect(self.view.finish_response)
         self.model.completed_job_list_updated.connect(self.view.batches_panel.completed_job_list_updated)
         self.model.status_changed.connect(self.view.status_bar.update_status)
+        self.model.files_suggested.connect(self.view.files_panel.check_files)
+        self.model.indexing_service.stats_changed.connect(self.view.status_bar.update_status)
+        self.model.indexing_service.file_indexed.connect(self.view.files_panel.file_system_model.update_file_status)
+        self.model.project_watcher.file_status_changed.connect(self.view.files_panel.file_system_model.update_file_status)
         self.view.files_panel.proj_dir_changed.connect(self.model.set_project_dir)
         self.view.files_panel.proj_dir_changed.connect(self.view.top_panel.update_directory)
+        self.model.project_opened.connect(self.view.request_panel.schedule_profile)
 
         self.view.top_panel.choose_dir_button.clicked.connect(self.view.files_panel.choose_directory)
         self.view.top_panel.last_projects_button.clicked.connect(self.view.files_panel.show_projects_history)
@@ -32,6 +45,7 @@ class ProjectGPTController(QObject):
 
         last_project_directory = self.model.historyModel.get_last_project_directory()
         self.view.top_panel.update_directory(last_project_directory)
+        self.view.request_panel.schedule_profile()
 
         additional_requests = self.model.get_additional_requests()
         self.view.set_additional_requests(additional_requests)
@@ -45,6 +59,27 @@ class ProjectGPTController(QObject):
         project_dir, chosen_files = self.view.files_panel.get_checked_files()
         self.model.set_project_dir(project_dir)
         self.model.set_project_files(chosen_files)
+        self.model.set_file_modes(self.view.files_panel.get_file_modes())
+
+    def handle_files_data_changed(self, top_left, bottom_right, roles=None):
+        # Checking files or changing their attach mode changes the request
+        if not roles or Qt.CheckStateRole in roles or Qt.FontRole in roles:
+            self.view.request_panel.schedule_profile()
+
+    def handle_profile_request(self):
+        project_dir, chosen_files = self.view.files_panel.get_checked_files()
+        if project_dir != self.model.project_meta.project_path:
+            return
+        request_panel = self.view.request_panel
+        self.model.profile_request(
+            request_panel.model_dropdown.currentText(),
+            request_panel.role_selector.get_role_string(),
+            request_panel.request_input.toPlainText(),
+            request_panel.editor_mode_button.isChecked(),
+            request_panel.get_request_options(),
+            chosen_files,
+            self.view.files_panel.get_file_modes()
+        )
 
     def handle_send_request(self, model_name, role_string, full_request, editor_mode, request_options):
         self._apply_current_project_context()
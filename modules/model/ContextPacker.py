@@ -0,0 +1,75 @@
+from modules.model.FileContentFormatter import FILE_MODE_FULL, FILE_MODE_OUTLINE, FILE_MODE_HEAD
+
+# Files are not truncated to fewer lines than this, they are left out instead
+MIN_TRUNCATED_LINES = 20
+
+
+class ContextPacker:
+    """
+    Fits the parts of a request into the token budget of the model.
+    Required parts (role, request) are always kept. When the rest does not
+    fit, it is reduced in this order:
+      1. optional parts are left out, least important first,
+      2. files attached in full are degraded to their outline, least
+         important (last) files first,
+      3. files are truncated to their first lines or left out.
+    Every step is recorded in the report.
+    """
+
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+
+    def pack(self, required_tokens: int, parts: list, files: list, outline_tokens=None):
+        """
+        parts: [(name, tokens)], most important first.
+        files: [(relative path, tokens, lines, mode)], most important first,
+               tokens being those of the file in its current mode.
+        outline_tokens(relative path) returns the tokens of the outline or None.
+        Returns (kept part names, {relative path: mode}, report lines); left
+        out files are missing from the modes.
+        """
+        available = self.budget_tokens - required_tokens
+        kept_parts = [name for name, _tokens in parts]
+        part_tokens = dict(parts)
+        modes = {rel_path: mode for rel_path, _tokens, _lines, mode in files}
+        tokens = {rel_path: file_tokens for rel_path, file_tokens, _lines, _mode in files}
+        lines = {rel_path: file_lines for rel_path, _tokens, file_lines, _mode in files}
+        report = []
+
+        def overflow():
+            return sum(part_tokens[name] for name in kept_parts) + sum(tokens.values()) - available
+
+        for name, part_size in reversed(parts):
+            if overflow() <= 0:
+                break
+            kept_parts.remove(name)
+            report.append(f"{name} left out (~{part_size} tokens)")
+
+        if overflow() > 0 and outline_tokens is not None:
+            for rel_path, _tokens, _lines, _mode in reversed(files):
+                if overflow() <= 0:
+                    break
+                if modes[rel_path] != FILE_MODE_FULL:
+                    continue
+                outline_size = outline_tokens(rel_path)
+                if outline_size is None or outline_size >= tokens[rel_path]:
+                    continue
+                report.append(f"{rel_path} attached as outline (~{tokens[rel_path]} -> ~{outline_size} tokens)")
+                modes[rel_path] = FILE_MODE_OUTLINE
+                tokens[rel_path] = outline_size
+
+        for rel_path, _tokens, _lines, _mode in reversed(files):
+            excess = overflow()
+            if excess <= 0:
+                break
+            size = tokens[rel_path]
+            keep_lines = int(lines[rel_path] * (size - excess) / size) if size else 0
+            if modes[rel_path] == FILE_MODE_FULL and keep_lines >= MIN_TRUNCATED_LINES:
+                report.append(f"{rel_path} truncated to {keep_lines} of {lines[rel_path]} lines")
+                modes[rel_path] = (FILE_MODE_HEAD, keep_lines)
+                tokens[rel_path] = size - excess
+            else:
+                report.append(f"{rel_path} left out (~{size} tokens)")
+                del modes[rel_path]
+                del tokens[rel_path]
+        return kept_parts, modes, report
@@ -1,22 +1,92 @@
 import os
 from modules.model.FileSyntaxCorrector import FileSyntaxCorrector
 
+# Attach modes of a file; a list of symbol names attaches only those symbols
+FILE_MODE_FULL = "full"
+FILE_MODE_OUTLINE = "outline"
+# (FILE_MODE_HEAD, lines) attaches the first lines of the file
+FILE_MODE_HEAD = "head"
+
+PARTIAL_FILES_NOTE = (
+    "Files marked as outline, selected symbols or truncated are shown partially, for reference only. "
+    "Do not return them as modified files, their full content is not provided."
+)
+
+# Formatting rules appended in editor mode
+EDITOR_MODE_RULES = (
+    "Here are the formatting rules you MUST follow when formatting your response:\n"
+    "- Rules for providing the path of a modified file:\n"
+    "  * Please return the content of each file with its corresponding file path.\n"
+    "  * Do not omit the file paths.\n"
+    "  * If you are editing a file provided by the user, do not modify the original file path.\n"
+    "  * Each file path should be enclosed in triple asterisks (***file_path***) (triple asterisks before the filename and triple asterisks after the file name), followed immediately by the modified content inside a code block.\n"
+    "  * Do not use ### before file path.\n"
+    "  * Do not use row of '─' before or after file path.\n"
+    "  * Do not insert any text, explanations, or comments before, after, or between the file path and the code block.\n"
+    "- Rules for formatting file content:\n"
+    "  * The code block should not contain a language as first string.\n"
+    "  * The code block should not contain file path as first string. File path should be provided in the format mentioned above.\n"
+    "  * The content inside the code block should be the file content only, with no additional comments, explanations, or markers.\n"
+    "  * If any files are modified, provide the entire content of each modified file, including any unmodified sections to allow direct replacement.\n"
+    "  * Do not write '# (No changes below this point)' - return the entire content of the modified file instead.\n"
+    "  * Do not write '# (No changes above this point)' - return the entire content of the modified file instead.\n"
+    "  * Do not write '# ... rest of the file unchanged ... ' - return the entire content of the modified file instead.\n"
+    "  * Do not write '# (unchanged)' - return the entire content of the modified file instead.\n"
+    "  * Do not write '# existing implementation...' - return the entire content of the modified file instead.\n"
+    "  * Do not write '...' - return the entire content of the modified file instead.\n"
+    "- Rules for including files in the response:\n"
+    "  * If a file provided by user remains unchanged, do not include it in the response.\n"
+    "  * If you modified a provided file, include its entire content.\n"
+    "- Rules for making changes:\n"
+    "  * Make minimum changes.\n"
+    "  * Do not delete existing code or comments unless it is part of a clearly necessary refactoring (e.g., code is moved to another file or replaced with an improved version). When removing code, ensure that its purpose is preserved elsewhere or justified by context.\n"
+    "  * Preserve all meaningful comments. Do not remove any comment unless the corresponding code is also being justifiably removed or relocated.\n"
+    " \n\n"
+)
+
+
 class FileContentFormatter:
     """
     Handles formatting of file contents for API requests and response parsing.
     Encapsulates logic for preparing file contents with proper syntax correction and formatting.
     """
 
-    def __init__(self):
+    def __init__(self, symbol_index=None):
         self.syntax_corrector = FileSyntaxCorrector()  # Handles syntax corrections for file contents
+        self.symbol_index = symbol_index  # SymbolIndex of the project, needed for partial files
+
+    def _partial_content(self, project_dir, relative_path, mode):
+        """Returns (label, content) of a file attached partially, None for full content."""
+        if mode in (None, FILE_MODE_FULL):
+            return None
+        if isinstance(mode, tuple) and mode[0] == FILE_MODE_HEAD:
+            with open(os.path.join(project_dir, relative_path), 'r', encoding='utf-8', errors='replace') as file:
+                lines = file.read().split("\n")
+            content = "\n".join(lines[:mode[1]])
+            label = f"truncated: first {mode[1]} of {len(lines)} lines"
+        elif self.symbol_index is None:
+            return None
+        elif mode == FILE_MODE_OUTLINE:
+            content = self.symbol_index.format_outline(relative_path)
+            label = "outline: signatures and docstrings only, bodies omitted"
+        else:
+            content = self.symbol_index.format_symbols(relative_path, mode)
+            label = "selected symbols only: " + ", ".join(mode)
+        if not content:
+            return None
+        return label, content
 
-    def make_file_content_text(self, project_dir, chosen_files, editor_mode):
+    def make_file_content_text(self, project_dir, chosen_files, editor_mode, file_modes=None):
         """
         Constructs the formatted text containing file contents for API requests.
         Includes syntax correction and special formatting instructions for editor mode.
+        file_modes maps relative paths to FILE_MODE_OUTLINE, (FILE_MODE_HEAD, lines)
+        or a list of symbol names; other files are attached in full.
         """
         if not chosen_files:
             return ""
+        file_modes = file_modes or {}
+        has_partial_files = False
 
         file_contents = []
         header = "Here is my file" if len(chosen_files) == 1 else "Here are my files"
@@ -24,7 +94,15 @@ class FileContentFormatter:
 
         for relative_path in chosen_files:
             file_path = os.path.join(project_dir, relative_path)
-            if os.path.exists(file_path):
+            if not os.path.exists(file_path):
+                continue
+            partial = self._partial_content(project_dir, relative_path, file_modes.get(relative_path))
+            if partial:
+                label, content = partial
+                content = self.syntax_corrector.prepare_for_encoding(content)
+                file_contents.append(f"**{relative_path}** ({label})\n```\n{content}\n```\n")
+                has_partial_files = True
+            else:
                 with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
                     content = file.read()
 
@@ -33,39 +111,11 @@ class FileContentFormatter:
 
                 file_contents.append(f"**{relative_path}**\n```\n{content}\n```\n")
 
-        keep_filenames_request = (
-            "Here are the formatting rules you MUST follow when formatting your response:\n"
-			"- Rules for providing the path of a modified file:\n"
-            "  * Please return the content of each file with its corresponding file path.\n"
-            "  * Do not omit the file paths.\n"
-            "  * If you are editing a file provided by the user, do not modify the original file path.\n"
-            "  * Each file path should be enclosed in triple asterisks (***file_path***) (triple asterisks before the filename and triple asterisks after the file name), followed immediately by the modified content inside a code block.\n"
-            "  * Do not use ### before file path.\n"
-            "  * Do not use row of '─' before or after file path.\n"
-            "  * Do not insert any text, explanations, or comments before, after, or between the file path and the code block.\n"
-            "- Rules for formatting file content:\n"
-            "  * The code block should not contain a language as first string.\n"
-            "  * The code block should not contain file path as first string. File path should be provided in the format mentioned above.\n"
-            "  * The content inside the code block should be the file content only, with no additional comments, explanations, or markers.\n"
-            "  * If any files are modified, provide the entire content of each modified file, including any unmodified sections to allow direct replacement.\n"
-            "  * Do not write '# (No changes below this point)' - return the entire content of the modified file instead.\n"
-            "  * Do not write '# (No changes above this point)' - return the entire content of the modified file instead.\n"
-            "  * Do not write '# ... rest of the file unchanged ... ' - return the entire content of the modified file instead.\n"
-            "  * Do not write '# (unchanged)' - return the entire content of the modified file instead.\n"
-            "  * Do not write '# existing implementation...' - return the entire content of the modified file instead.\n"
-            "  * Do not write '...' - return the entire content of the modified file instead.\n"
-            "- Rules for including files in the response:\n"
-            "  * If a file provided by user remains unchanged, do not include it in the response.\n"
-            "  * If you modified a provided file, include its entire content.\n"
-            "- Rules for making changes:\n"
-            "  * Make minimum changes.\n"
-            "  * Do not delete existing code or comments unless it is part of a clearly necessary refactoring (e.g., code is moved to another file or replaced with an improved version). When removing code, ensure that its purpose is preserved elsewhere or justified by context.\n"
-            "  * Preserve all meaningful comments. Do not remove any comment unless the corresponding code is also being justifiably removed or relocated.\n"
-            " \n\n"
-         )
+        if has_partial_files:
+            file_contents.append(PARTIAL_FILES_NOTE)
 
         formatted_text = "\n".join(file_contents)
         if editor_mode:
-            formatted_text += "\n" + keep_filenames_request
+            formatted_text += "\n" + EDITOR_MODE_RULES
             
         return formatted_text
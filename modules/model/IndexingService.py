@@ -0,0 +1,171 @@
+import os
+import time
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+from modules.model.WorkerPool import get_worker_pool, PRIORITY_INDEXING
+
+
+class IndexingService(QObject):
+    """
+    Runs ProjectMeta jobs (indexing, stats, batch indexing) one at a time in
+    the worker pool, after the interactive tasks. Jobs started while another
+    one runs are queued.
+    """
+    progress_changed = pyqtSignal(int, int, str)  # done, total, relative path
+    file_indexed = pyqtSignal(str, object)        # absolute path, FileStatus
+    stats_changed = pyqtSignal(str)               # throughput / ETA text
+    job_finished = pyqtSignal(str, object)        # job name, result
+    job_failed = pyqtSignal(str, str)             # job name, error
+    running_changed = pyqtSignal(bool)
+    paused_changed = pyqtSignal(bool)
+
+    def __init__(self, project_meta):
+        super().__init__()
+        self.project_meta = project_meta
+        self.worker_pool = get_worker_pool()
+        self.queue = []
+        self.current_job = None
+        self.idle_callbacks = []  # called once no job runs
+        self.cancel_event = threading.Event()
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self._started = 0.0
+        self._paused_at = None
+        self._paused_time = 0.0
+
+    def is_running(self) -> bool:
+        return self.current_job is not None
+
+    def is_paused(self) -> bool:
+        return not self.resume_event.is_set()
+
+    def index_all(self):
+        self.run_job("Index all", lambda: self.project_meta.update_descriptions(
+            self._on_progress, self.cancel_event, self.resume_event))
+
+    def force_index_all(self):
+        self.run_job("Force reindex all", lambda: self.project_meta.force_update_descriptions(
+            self._on_progress, self.cancel_event, self.resume_event))
+
+    def index_files(self, relative_paths, force=True):
+        """Indexes the given files; with `force` up-to-date files are described again."""
+        relative_paths = list(relative_paths)
+        update = self.project_meta.force_update_descriptions if force else self.project_meta.update_descriptions
+        self.run_job("Index files", lambda: update(
+            self._on_progress, self.cancel_event, self.resume_event, files=relative_paths))
+
+    def summarize_directories(self):
+        self.run_job("Directory summaries", lambda: self.project_meta.update_directory_summaries(
+            self._report_progress, self.cancel_event))
+
+    def compute_stats(self):
+        self.run_job("Stats", self.project_meta.stat_descriptions)
+
+    def call_when_idle(self, callback):
+        """Calls callback now or, while a job runs, after the last queued job ends."""
+        if self.current_job is None:
+            callback()
+        else:
+            self.idle_callbacks.append(callback)
+
+    def run_job(self, name, fn):
+        self.queue.append((name, fn))
+        if self.current_job is None:
+            self._start_next()
+
+    def pause(self):
+        if self.current_job is None or self.is_paused():
+            return
+        self.resume_event.clear()
+        self._paused_at = time.monotonic()
+        self.stats_changed.emit(f"{self.current_job}: paused")
+        self.paused_changed.emit(True)
+
+    def resume(self):
+        if not self.is_paused():
+            return
+        if self._paused_at is not None:
+            self._paused_time += time.monotonic() - self._paused_at
+            self._paused_at = None
+        self.resume_event.set()
+        self.paused_changed.emit(False)
+
+    def cancel(self):
+        """Drops queued jobs and stops the running one after its requests in flight."""
+        self.queue.clear()
+        if self.current_job is None:
+            return
+        self.cancel_event.set()
+        self.resume()
+        self.stats_changed.emit(f"{self.current_job}: canceling...")
+
+    def _start_next(self):
+        if not self.queue:
+            self.current_job = None
+            self.running_changed.emit(False)
+            callbacks, self.idle_callbacks = self.idle_callbacks, []
+            for callback in callbacks:
+                callback()
+            return
+        name, fn = self.queue.pop(0)
+        was_running = self.current_job is not None
+        self.current_job = name
+        self.cancel_event.clear()
+        self.resume_event.set()
+        self._started = time.monotonic()
+        self._paused_at = None
+        self._paused_time = 0.0
+        if not was_running:
+            self.running_changed.emit(True)
+        self.stats_changed.emit(f"{name}: started")
+        self.worker_pool.execute_async(
+            fn,
+            lambda result, name=name: self._on_finished(name, result),
+            lambda error, name=name: self._on_error(name, error),
+            PRIORITY_INDEXING
+        )
+
+    def _on_progress(self, done, total, relative_path):
+        # Called from the worker thread; connected slots receive queued signals
+        project_path = self.project_meta.project_path
+        status = self.project_meta.getFileStatus(relative_path)
+        self.file_indexed.emit(os.path.join(project_path, relative_path), status)
+        self._report_progress(done, total, relative_path)
+
+    def _report_progress(self, done, total, relative_path):
+        self.progress_changed.emit(done, total, relative_path)
+        if self.is_paused():
+            self.stats_changed.emit(f"{self.current_job}: {done}/{total}, paused")
+            return
+        elapsed = time.monotonic() - self._started - self._paused_time
+        if elapsed <= 0 or done == 0:
+            return
+        rate = done / elapsed
+        eta = (total - done) / rate
+        self.stats_changed.emit(
+            f"{self.current_job}: {done}/{total}, {rate * 60:.1f} per minute, ETA {self._format_time(eta)}"
+        )
+
+    @staticmethod
+    def _format_time(seconds) -> str:
+        seconds = int(seconds)
+        if seconds >= 3600:
+            return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+        if seconds >= 60:
+            return f"{seconds // 60}m {seconds % 60}s"
+        return f"{seconds}s"
+
+    def _on_finished(self, name, result):
+        elapsed = time.monotonic() - self._started - self._paused_time
+        if isinstance(result, dict) and result.get('canceled'):
+            self.stats_changed.emit(f"{name}: canceled after {self._format_time(elapsed)}")
+        else:
+            self.stats_changed.emit(f"{name}: finished in {self._format_time(elapsed)}")
+        self.job_finished.emit(name, result)
+        self._start_next()
+
+    def _on_error(self, name, error):
+        print(f"IndexingService: {name} failed: {error}")
+        self.stats_changed.emit(f"{name}: failed")
+        self.job_failed.emit(name, str(error))
+        self._start_next()
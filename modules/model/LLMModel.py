@@ -1,18 +1,28 @@
 import os
+import re
 import json
+import threading
+import time
 from PyQt5.QtCore import QObject, pyqtSignal
 from git import Repo
 from git.exc import InvalidGitRepositoryError
 from modules.model.ResponseFilesParser import ResponseFilesParser
-from modules.model.ThreadManager import ThreadManager
-from modules.model.FileContentFormatter import FileContentFormatter
+from modules.model.ProjectTaskGuard import ProjectTaskGuard
+from modules.model.WorkerPool import get_worker_pool, CancellationToken, TaskCanceled, PRIORITY_INTERACTIVE, \
+    PRIORITY_BATCH, PRIORITY_NAMES
+from modules.model.FileContentFormatter import FileContentFormatter, FILE_MODE_FULL, EDITOR_MODE_RULES
+from modules.model.ContextPacker import ContextPacker
+from modules.model.RequestLatencyModel import RequestLatencyModel
+from modules.model.ResponseCache import ResponseCache
+from modules.model.ProjectMeta.TokenCounts import estimate_tokens
 from modules.model.ProjectMeta.ProjectMeta import ProjectMeta
 from modules.model.serviceProviders.openAIServiceProvider import OpenAIServiceProvider
 from modules.model.serviceProviders.deepSeekServiceProvider import DeepSeekServiceProvider
 from modules.model.serviceProviders.ollamaServiceProvider import OllamaServiceProvider
 from modules.model.serviceProviders.geminiServiceProvider import GeminiServiceProvider
 from modules.model.serviceProviders.anthropicServiceProvider import AnthropicServiceProvider
-from modules.model.constants import FILES_LIST_INTRO
+from modules.model.constants import FILES_LIST_INTRO, PROJECT_MAP_INTRO, FILE_SELECTION_PROMPT, AUTO_SELECT_MAX_FILES, \
+    AUTO_SELECT_MAX_CANDIDATES, IMPORT_EXPANSION_TOKEN_BUDGET, CONTEXT_SAFETY_MARGIN_TOKENS, LEFT_OUT_FILES_NOTE
 
 
 def get_provider_settings(provider_name: str) -> dict:
@@ -50,6 +60,10 @@ class LLMModel(QObject):
     response_generated = pyqtSignal(str)
     completed_job_list_updated = pyqtSignal(list, list)
     status_changed = pyqtSignal(str)
+    files_selected = pyqtSignal(list)
+    response_started = pyqtSignal(object)  # request token of the response streamed next
+    response_chunk_received = pyqtSignal(object, str)  # request token, streamed text of the response
+    request_finished = pyqtSignal(object, str)  # request token, whole response or error
 
     def __init__(self):
         super().__init__()
@@ -82,9 +96,16 @@ class LLMModel(QObject):
         self.available_models = []
         for provider in self.service_providers:
             self.available_models.extend(provider.getAvailableModels())
-        self.thread_manager = ThreadManager()
+        self.worker_pool = get_worker_pool()
+        self.project_tasks = ProjectTaskGuard(self.worker_pool)  # tasks using the project metadata
+        self.request_tokens = set()  # cancellation tokens of the requests not finished yet
         self.project_dir = None
+        self.project_meta = None
         self.chosen_files = []
+        self.file_modes = {}
+        self.latency_model = RequestLatencyModel()
+        self._response_cache = None
+        self._response_cache_lock = threading.Lock()
         self.completed_batches = []
         self.completed_jobs_descriptions = []
 
@@ -98,186 +119,484 @@ class LLMModel(QObject):
         provider = self.get_provider_for_model(model_name)
         return provider.getModelOptions(model_name)
 
+    def _get_response_cache(self):
+        with self._response_cache_lock:
+            if self._response_cache is None:
+                self._response_cache = ResponseCache()
+            return self._response_cache
+
     def set_project_dir(self, project_dir):
         self.project_dir = project_dir
 
     def set_project_files(self, chosen_files):
         self.chosen_files = chosen_files
 
+    def set_file_modes(self, file_modes):
+        """{relative path: FILE_MODE_OUTLINE or list of symbol names} of the attached files."""
+        self.file_modes = file_modes
+
+    def set_project_meta(self, project_meta):
+        self.project_meta = project_meta
+
+    def _get_project_meta(self):
+        # project_dir is changed together with the metadata once no task uses it
+        if self.project_meta:
+            return self.project_meta
+        return ProjectMeta(self.project_dir, llm_model=self)
+
     def make_file_content_text(self, project_dir, chosen_files, editorMode):
         formatter = FileContentFormatter()
         return formatter.make_file_content_text(project_dir, chosen_files, editorMode)
 
-    def _build_user_message(self, role_string, full_request, editor_mode, include_files_list, attach_diff):
-        parts = []
-        if include_files_list:
-            if self.project_dir:
-                meta = ProjectMeta(self.project_dir)
-                files = meta.getAll_project_files()
-            else:
-                files = []
-            files_text = "\n".join(files)
-            parts.append(FILES_LIST_INTRO + "\n" + files_text)
+    def select_files_for_request(self, full_request):
+        """
+        First stage of a two-stage request: the indexing model of the project
+        (a cheap one) picks the files the request needs from the cached file
+        descriptions. Returns relative paths.
+        """
+        meta = self._get_project_meta()
+        files = meta.getAll_project_files()
+        if len(files) > AUTO_SELECT_MAX_CANDIDATES:
+            ranked = [rel_path for rel_path, _score in meta.search_files(full_request, AUTO_SELECT_MAX_CANDIDATES)]
+            files = ranked or files[:AUTO_SELECT_MAX_CANDIDATES]
+        lines = []
+        for rel_path in files:
+            description = meta.getFileDescription(rel_path)
+            lines.append(f"{rel_path}: {description}" if description else rel_path)
+        prompt = (
+            FILE_SELECTION_PROMPT.format(max_files=AUTO_SELECT_MAX_FILES)
+            + "\n\nFiles:\n" + "\n".join(lines)
+            + "\n\nRequest:\n" + full_request
+        )
+        response = meta.ask_indexing_model(prompt)
+        candidates = set(files)
+        selected = []
+        for line in response.splitlines():
+            path = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().strip("`*'\"")
+            if path not in candidates:
+                path = path.split(":", 1)[0].strip()
+            path = os.path.normpath(path) if path else path
+            if path in candidates and path not in selected:
+                selected.append(path)
+        return selected[:AUTO_SELECT_MAX_FILES]
+
+    def _prepare_user_message(self, role_string, full_request, editor_mode, request_options, status_changed,
+                              model_name=None, partial_files=None):
+        """
+        Builds the request text; runs in the worker thread. Returns (request
+        text, chosen files, length of its stable prefix). The files attached
+        partially are added to partial_files.
+        """
+        include = getattr(request_options, 'includeFilesList', False)
+        attach_diff = getattr(request_options, 'attachLastCommitDiff', False)
+        include_map = getattr(request_options, 'includeProjectMap', False)
+        import_hops = getattr(request_options, 'importHops', 0)
+        print(f"Include files list: {include}, attach last commit diff: {attach_diff}, include project map: {include_map}")
+        chosen_files = list(self.chosen_files)
+        if getattr(request_options, 'autoSelectFiles', False) and self.project_dir:
+            status_changed("Selecting files for the request ...")
+            try:
+                selected = self.select_files_for_request(full_request)
+            except Exception as e:
+                print(f"File selection failed: {e}")
+                status_changed("File selection failed, sending the checked files only")
+                selected = []
+            print(f"Selected files: {selected}")
+            chosen_files += [rel_path for rel_path in selected if rel_path not in chosen_files]
+            self.files_selected.emit(selected)
+        packing_report = []
+        prefix, suffix = self._build_prompt(role_string, full_request, editor_mode, include, attach_diff,
+                                            include_map, chosen_files, import_hops, model_name, packing_report,
+                                            partial_files)
+        if packing_report:
+            status_changed("Request reduced to fit the context window: " + "; ".join(packing_report))
+        if not prefix:
+            return suffix, chosen_files, 0
+        prefix += "\n\n"
+        return prefix + suffix, chosen_files, len(prefix)
+
+    def _build_user_message(self, role_string, full_request, editor_mode, include_files_list, attach_diff,
+                            include_project_map=False, chosen_files=None, import_hops=0, model_name=None,
+                            packing_report=None):
+        prefix, suffix = self._build_prompt(role_string, full_request, editor_mode, include_files_list, attach_diff,
+                                            include_project_map, chosen_files, import_hops, model_name,
+                                            packing_report)
+        return "\n\n".join(part for part in (prefix, suffix) if part)
+
+    def _build_prompt(self, role_string, full_request, editor_mode, include_files_list, attach_diff,
+                      include_project_map=False, chosen_files=None, import_hops=0, model_name=None,
+                      packing_report=None, partial_files=None):
+        """
+        Returns (stable prefix, variable suffix) of the request text. The
+        prefix holds what usually stays the same while iterating on a set of
+        files (role, formatting rules, project map, files list, files), so
+        the prompt caches of the providers can reuse it; the diff and the
+        request itself follow in the suffix. The files attached partially,
+        by the user or to fit the context window, are added to partial_files.
+        """
+        if chosen_files is None:
+            chosen_files = self.chosen_files
+        if import_hops and self.project_dir and chosen_files:
+            try:
+                imported = self._get_project_meta().expand_with_imports(
+                    chosen_files, import_hops, IMPORT_EXPANSION_TOKEN_BUDGET)
+            except Exception as e:
+                print(f"Error expanding files by imports: {e}")
+                imported = []
+            print(f"Files added by imports: {imported}")
+            chosen_files = list(chosen_files) + imported
+        # Optional parts, most important first
+        optional_parts = []
         if attach_diff:
             if self.project_dir:
                 try:
                     repo = Repo(self.project_dir)
                     diff_text = repo.git.diff('HEAD~1', 'HEAD')
-                    parts.append("Here is last commit diff:\n" + diff_text)
+                    optional_parts.append(("last commit diff", "Here is last commit diff:\n" + diff_text))
                 except InvalidGitRepositoryError:
                     print(f"No git repository found at {self.project_dir}, cannot attach diff.")
                 except Exception as e:
                     print(f"Error getting git diff: {e}")
-        parts.append(role_string)
-        if self.project_dir and self.chosen_files:
-            formatter = FileContentFormatter()
-            file_text = formatter.make_file_content_text(
-                self.project_dir, self.chosen_files, editor_mode
-            )
-            if file_text:
-                parts.append(file_text)
-        parts.append(full_request)
-        return "\n\n".join(parts)
+        if include_project_map and self.project_dir:
+            optional_parts.append(("project map", PROJECT_MAP_INTRO + "\n" + self._get_project_meta().compose_project_map()))
+        if include_files_list:
+            if self.project_dir:
+                meta = self._get_project_meta()
+                files = meta.getAll_project_files()
+            else:
+                files = []
+            files_text = "\n".join(files)
+            optional_parts.append(("files list", FILES_LIST_INTRO + "\n" + files_text))
+
+        file_modes = {rel_path: self.file_modes.get(rel_path, FILE_MODE_FULL) for rel_path in chosen_files}
+        left_out_files = []
+        if model_name and self.project_dir:
+            optional_parts, file_modes, left_out_files = self._pack_context(
+                model_name, role_string, full_request, optional_parts, chosen_files, file_modes, packing_report)
+            chosen_files = [rel_path for rel_path in chosen_files if rel_path in file_modes]
+        if partial_files is not None:
+            partial_files.extend(rel_path for rel_path in chosen_files if file_modes[rel_path] != FILE_MODE_FULL)
+
+        # Least frequently changing parts first
+        optional_texts = dict(optional_parts)
+        prefix = [role_string] if role_string else []
+        file_text = ""
+        if self.project_dir and chosen_files:
+            has_partial_files = any(mode != FILE_MODE_FULL for mode in file_modes.values())
+            symbol_index = self._get_project_meta().symbol_index if has_partial_files else None
+            formatter = FileContentFormatter(symbol_index)
+            # The rules are placed before the files so that they stay in the same place
+            file_text = formatter.make_file_content_text(self.project_dir, chosen_files, False, file_modes)
+        if file_text and editor_mode:
+            prefix.append(EDITOR_MODE_RULES.rstrip())
+        prefix += [optional_texts[name] for name in ("project map", "files list") if name in optional_texts]
+        if file_text:
+            prefix.append(file_text)
+        suffix = []
+        if "last commit diff" in optional_texts:
+            suffix.append(optional_texts["last commit diff"])
+        if left_out_files:
+            suffix.append(LEFT_OUT_FILES_NOTE + "\n" + "\n".join(left_out_files))
+        suffix.append(full_request)
+        return "\n\n".join(prefix), "\n\n".join(suffix)
+
+    def _pack_context(self, model_name, role_string, full_request, optional_parts, chosen_files, file_modes,
+                      packing_report=None):
+        """
+        Reduces the optional parts and the files to the context window of the
+        model (see ContextPacker). Returns (optional parts, file modes, left
+        out files); the reductions are added to packing_report.
+        """
+        options = self.get_model_options(model_name)
+        budget = options.contextWindow - options.maxOutputTokens - CONTEXT_SAFETY_MARGIN_TOKENS
+        meta = self._get_project_meta()
+        counts = meta.get_token_counts(chosen_files)
+        formatter = FileContentFormatter(meta.symbol_index)
+        files = []
+        for rel_path in chosen_files:
+            if rel_path not in counts:
+                continue
+            tokens, lines = counts[rel_path]
+            mode = file_modes[rel_path]
+            if mode != FILE_MODE_FULL:
+                # Outline or symbols chosen by the user
+                partial = formatter.make_file_content_text(self.project_dir, [rel_path], False, {rel_path: mode})
+                tokens = estimate_tokens(partial)
+            files.append((rel_path, tokens, lines, mode))
+
+        def outline_tokens(rel_path):
+            outline = meta.symbol_index.format_outline(rel_path)
+            return estimate_tokens(outline) if outline else None
+
+        packer = ContextPacker(budget)
+        required_tokens = estimate_tokens(role_string) + estimate_tokens(full_request)
+        kept_parts, packed_modes, report = packer.pack(
+            required_tokens,
+            [(name, estimate_tokens(text)) for name, text in optional_parts],
+            files,
+            outline_tokens
+        )
+        if report:
+            print(f"Request reduced to the context window of {model_name} (~{budget} tokens): " + "; ".join(report))
+            if packing_report is not None:
+                packing_report.extend(report)
+        left_out_files = [rel_path for rel_path, _tokens, _lines, _mode in files if rel_path not in packed_modes]
+        return [part for part in optional_parts if part[0] in kept_parts], packed_modes, left_out_files
+
+    def _execute_async(self, fn, callback, error_callback, priority, provider=None, token=None):
+        """
+        Runs fn in the worker pool within the concurrency limit of the
+        provider. fn must not take the limit of a provider itself (e.g. by
+        asking the indexing model), pass no provider and acquire the limit
+        around the provider call instead.
+        """
+        depth = self.worker_pool.queue_depth()
+        if sum(running for _queued, running in depth.values()) >= self.worker_pool.size:
+            ahead = sum(depth[name][0] for class_priority, name in PRIORITY_NAMES.items() if class_priority <= priority)
+            self.status_changed.emit(f"Waiting for a free worker ({ahead} tasks ahead) ...")
+        semaphore = provider.getConcurrencySemaphore() if provider else None
+        return self.project_tasks.execute_async(fn, callback, error_callback, priority, token, semaphore)
+
+    def cancel_requests(self):
+        """Cancels the requests sent by generate_response_async which have not finished yet."""
+        for token in self.request_tokens:
+            token.cancel()
 
     def generate_response_async(self, modelName, role_string, full_request, editor_mode, request_options):
+        token = CancellationToken()
+        self.response_started.emit(token)
         try:
-            include = getattr(request_options, 'includeFilesList', False)
-            print(f"Include files list in request: {include}")
-            attach_diff = getattr(request_options, 'attachLastCommitDiff', False)
-            print(f"Attach last commit diff in request: {attach_diff}")
             self.status_changed.emit("Sending the request ...")
-            user_message = self._build_user_message(role_string, full_request, editor_mode, include, attach_diff)
-            print(f"Model: {modelName}")
-            print(f"Request: {user_message}")
             provider = self.get_provider_for_model(modelName)
-            self.thread_manager.execute_async(
-                lambda: provider._generate_response_sync(
-                    modelName,
-                    user_message,
-                    self.status_changed.emit,
-                    self.response_generated.emit,
-                    self.project_dir,
-                    self.chosen_files
-                ),
-                lambda result: self._handle_generated_response(result, editor_mode),
-                lambda e: self.response_generated.emit("Error generating response: " + str(e))
+
+            def _run():
+                partial_files = []
+                user_message, chosen_files, cache_prefix_length = self._prepare_user_message(
+                    role_string, full_request, editor_mode, request_options, self.status_changed.emit, modelName,
+                    partial_files
+                )
+                print(f"Model: {modelName}")
+                print(f"Request: {user_message}")
+                parser = None
+                if editor_mode:
+                    # Files are written as soon as their code blocks are complete
+                    parser = ResponseFilesParser(
+                        self.project_dir,
+                        lambda rel_path: self.status_changed.emit(f"File updated: {rel_path}"),
+                        partial_files,
+                        lambda rel_path: self.status_changed.emit(
+                            f"Warning: {rel_path} was attached partially, the returned content was not written")
+                    )
+                received = []
+
+                def on_chunk(text):
+                    token.raise_if_canceled()
+                    if parser:
+                        parser.feed(text)
+                    received.append(text)
+                    self.response_chunk_received.emit(token, text)
+
+                def _generate():
+                    # The limit is held only for the call: preparing the request may ask the indexing model
+                    with provider.getConcurrencySemaphore():
+                        token.raise_if_canceled()
+                        started = time.perf_counter()
+                        generated_response, usage = provider._generate_response_stream_sync(
+                            modelName,
+                            user_message,
+                            self.status_changed.emit,
+                            self.response_generated.emit,
+                            on_chunk,
+                            self.project_dir,
+                            chosen_files,
+                            cache_prefix_length
+                        )
+                    if usage != "Error" and generated_response:
+                        self.latency_model.record(modelName, estimate_tokens(user_message),
+                                                  estimate_tokens(generated_response), time.perf_counter() - started)
+                    return generated_response, usage
+
+                try:
+                    if getattr(request_options, 'useResponseCache', False):
+                        # The request text holds the attached files, their checksums drop entries of partial files too
+                        checksums = self._get_project_meta().get_file_checksums(chosen_files) if self.project_dir else {}
+                        # Without attached files the editor mode rules are not in the request text
+                        options = {"editor_mode": bool(editor_mode),
+                                   "max_output_tokens": provider.getModelOptions(modelName).maxOutputTokens}
+                        generated_response, usage, from_cache = self._get_response_cache().get_or_generate(
+                            ResponseCache.make_key(modelName, user_message, options), checksums, _generate)
+                        if from_cache and usage != "Error":
+                            print("Response reused from the cache")
+                            on_chunk(generated_response)
+                            usage = f"Cached response ({usage})"
+                    else:
+                        generated_response, usage = _generate()
+                except TaskCanceled:
+                    generated_response, usage = "", "Error"
+                if token.is_canceled():
+                    # Keep the text received so far, the files whose blocks were complete are already written
+                    generated_response, usage = "".join(received), "Request canceled"
+                updated_files = parser.finish() if parser else []
+                if parser and parser.skipped_files:
+                    usage = f"{usage}. Not written, attached partially: {', '.join(parser.skipped_files)}"
+                return generated_response, usage, updated_files
+
+            def _handle_error(e):
+                self.request_tokens.discard(token)
+                self.request_finished.emit(token, "Error generating response: " + str(e))
+            self.request_tokens.add(token)
+            self._execute_async(
+                _run,
+                lambda result: self._handle_generated_response(result, token),
+                _handle_error,
+                PRIORITY_INTERACTIVE,
+                token=token
             )
         except Exception as e:
-            self.response_generated.emit("Error generating response: " + str(e))
-
-    def _handle_generated_response(self, result, editor_mode):
-        generated_response, usage = result
-        if editor_mode:
-            parser = ResponseFilesParser(self.project_dir)
-            parser.parse_response_and_update_files_on_disk(generated_response)
-        self.response_generated.emit(generated_response)
+            self.request_finished.emit(token, "Error generating response: " + str(e))
+
+    def _handle_generated_response(self, result, token=None):
+        self.request_tokens.discard(token)
+        generated_response, usage, updated_files = result
+        if updated_files:
+            self._get_project_meta().record_changes(updated_files)
+        self.request_finished.emit(token, generated_response)
         self.status_changed.emit(str(usage))
 
     def generate_batch_response_async(self, modelName, role_string, full_request, description, editor_mode, request_options):
         try:
-            include = getattr(request_options, 'includeFilesList', False)
-            print(f"Include files list in batch request: {include}")
-            attach_diff = getattr(request_options, 'attachLastCommitDiff', False)
-            print(f"Attach last commit diff in batch request: {attach_diff}")
-            user_message = self._build_user_message(role_string, full_request, editor_mode, include, attach_diff)
             custom_id = "true" if editor_mode else "false"
             provider = self.get_provider_for_model(modelName)
-            self.thread_manager.execute_async(
-                lambda: provider._generate_batch_response_sync(
-                    modelName,
-                    user_message,
-                    description,
-                    custom_id,
-                    self.status_changed.emit,
-                    self.response_generated.emit,
-                    self.completed_job_list_updated.emit,
-                    self.project_dir,
-                    self.chosen_files
-                ),
+
+            def _run():
+                user_message, chosen_files, _cache_prefix_length = self._prepare_user_message(
+                    role_string, full_request, editor_mode, request_options, self.status_changed.emit, modelName
+                )
+                with provider.getConcurrencySemaphore():
+                    return provider._generate_batch_response_sync(
+                        modelName,
+                        user_message,
+                        description,
+                        custom_id,
+                        self.status_changed.emit,
+                        self.response_generated.emit,
+                        self.completed_job_list_updated.emit,
+                        self.project_dir,
+                        chosen_files
+                    )
+            self._execute_async(
+                _run,
                 lambda result: self.response_generated.emit(str(result)),
-                lambda e: self.response_generated.emit("Error generating batch response: " + str(e))
+                lambda e: self.response_generated.emit("Error generating batch response: " + str(e)),
+                PRIORITY_BATCH
             )
         except Exception as e:
             self.response_generated.emit("Error generating batch response: " + str(e))
 
-    def get_completed_batch_jobs(self, modelName):
+    def _run_batch_operation(self, modelName, operation, error_text, callback=None):
+        """Runs operation(provider, project_dir, chosen_files) of the batch jobs in the worker pool."""
         try:
             provider = self.get_provider_for_model(modelName)
-            provider.get_completed_batch_jobs(
+            project_dir = self.project_dir
+            chosen_files = list(self.chosen_files)
+            self._execute_async(
+                lambda: operation(provider, project_dir, chosen_files),
+                callback or (lambda result: None),
+                lambda e: self.response_generated.emit(error_text + str(e)),
+                PRIORITY_BATCH,
+                provider
+            )
+        except Exception as e:
+            self.response_generated.emit(error_text + str(e))
+
+    def get_completed_batch_jobs(self, modelName):
+        self._run_batch_operation(
+            modelName,
+            lambda provider, project_dir, chosen_files: provider.get_completed_batch_jobs(
                 modelName,
                 self.status_changed.emit,
                 self.response_generated.emit,
                 self.completed_job_list_updated.emit,
-                self.project_dir,
-                self.chosen_files
-            )
-        except Exception as e:
-            self.response_generated.emit("Error retrieving completed batch jobs: " + str(e))
+                project_dir,
+                chosen_files
+            ),
+            "Error retrieving completed batch jobs: "
+        )
 
     def get_batch_results(self, modelName, batch_id):
-        try:
-            def _handle_results(response_text, usage, editor_mode):
-                if editor_mode:
-                    parser = ResponseFilesParser(self.project_dir)
-                    parser.parse_response_and_update_files_on_disk(response_text)
-                self.response_generated.emit(response_text)
-                self.status_changed.emit(usage)
-            provider = self.get_provider_for_model(modelName)
-            result = provider.get_batch_results(
+        def _handle_results(result):
+            if not result:
+                return
+            response_text, usage, editor_mode = result
+            if editor_mode:
+                parser = ResponseFilesParser(self.project_dir)
+                updated_files = parser.parse_response_and_update_files_on_disk(response_text)
+                if updated_files:
+                    self._get_project_meta().record_changes(updated_files)
+            self.response_generated.emit(response_text)
+            self.status_changed.emit(usage)
+        self._run_batch_operation(
+            modelName,
+            lambda provider, project_dir, chosen_files: provider.get_batch_results(
                 modelName,
                 batch_id,
                 self.status_changed.emit,
                 self.response_generated.emit,
-                self.project_dir,
-                self.chosen_files
-            )
-            if result:
-                response_text, usage, editor_mode = result
-                _handle_results(response_text, usage, editor_mode)
-        except Exception as e:
-            self.response_generated.emit("Error retrieving batch results: " + str(e))
+                project_dir,
+                chosen_files
+            ),
+            "Error retrieving batch results: ",
+            _handle_results
+        )
 
     def delete_batch_job(self, modelName, batch_id):
-        try:
-            provider = self.get_provider_for_model(modelName)
-            provider.delete_batch_job(
+        self._run_batch_operation(
+            modelName,
+            lambda provider, project_dir, chosen_files: provider.delete_batch_job(
                 modelName,
                 batch_id,
                 self.status_changed.emit,
                 self.response_generated.emit,
-                self.project_dir,
-                self.chosen_files
-            )
-        except Exception as e:
-            self.response_generated.emit("Error deleting batch results: " + str(e))
+                project_dir,
+                chosen_files
+            ),
+            "Error deleting batch results: "
+        )
 
     def cancel_batch_job(self, modelName, batch_id):
-        try:
-            provider = self.get_provider_for_model(modelName)
-            provider.cancel_batch_job(
+        self._run_batch_operation(
+            modelName,
+            lambda provider, project_dir, chosen_files: provider.cancel_batch_job(
                 modelName,
                 batch_id,
                 self.status_changed.emit,
                 self.response_generated.emit,
-                self.project_dir,
-                self.chosen_files
-            )
-        except Exception as e:
-            self.response_generated.emit("Error canceling batch job: " + str(e))
+                project_dir,
+                chosen_files
+            ),
+            "Error canceling batch job: "
+        )
 
-    def generate_simple_response_sync(self, modelName, request, printRequest=True):
+    def generate_simple_response_sync(self, modelName, request, printRequest=True, use_cache=False):
         if printRequest:
             print(f"Model: {modelName}")
             print(f"Request: {request}")
         provider = self.get_provider_for_model(modelName)
-        return provider._generate_response_sync(
-            modelName,
-            request,
-            lambda status: None,
-            lambda response: None,
-            None,
-            None
-        )
+
+        def _generate():
+            return provider._generate_response_sync(
+                modelName,
+                request,
+                lambda status: None,
+                lambda response: None,
+                None,
+                None
+            )
+        if not use_cache:
+            return _generate()
+        response, usage, _from_cache = self._get_response_cache().get_or_generate(
+            ResponseCache.make_key(modelName, request), {}, _generate)
+        return response, usage
 
     def generate_simple_response_async(self, modelName, request):
         try:
@@ -300,6 +619,6 @@ class LLMModel(QObject):
                 self.status_changed.emit(str(usage))
             def _handle_error(e):
                 self.response_generated.emit("Error generating simple response: " + str(e))
-            self.thread_manager.execute_async(_run, _handle_result, _handle_error)
+            self._execute_async(_run, _handle_result, _handle_error, PRIORITY_INTERACTIVE, provider)
         except Exception as e:
             self.response_generated.emit("Error generating simple response: " + str(e))
@@ -0,0 +1,137 @@
+import ast
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Lines starting a new top-level block in languages without an AST parser here
+BLOCK_START = re.compile(r"^(?:[A-Za-z_@#\[<]|(?:export|public|private|protected|static|def|class|function|fn|func)\b)")
+
+CHUNK_RULES = (
+    "  - Write at most two plain English sentences, no lists.\n"
+    "  - Name the main classes, functions or data the part defines and what they are for.\n\n"
+)
+
+
+class ChunkSummarizer:
+    """
+    Describes files too large for a single description request: the text is
+    split along top-level definitions, the chunks are summarized in parallel
+    (map) and the summaries are combined into one sentence (reduce). Chunk
+    summaries are cached by chunk hash, so after an edit only the changed
+    chunks are summarized again.
+    """
+    MAX_WORKERS = 4
+
+    def __init__(self, project_meta, chunk_tokens: int, bytes_per_token: int):
+        self.project_meta = project_meta
+        self.chunk_size = chunk_tokens * bytes_per_token
+
+    @staticmethod
+    def _python_boundaries(text: str, lines: list):
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return None
+        boundaries = set()
+        for node in tree.body:
+            start = node.lineno
+            for decorator in getattr(node, "decorator_list", []):
+                start = min(start, decorator.lineno)
+            boundaries.add(start - 1)
+        return boundaries
+
+    @staticmethod
+    def _text_boundaries(lines: list):
+        boundaries = set()
+        for i, line in enumerate(lines):
+            if i and BLOCK_START.match(line) and not lines[i - 1].strip():
+                boundaries.add(i)
+        return boundaries
+
+    def split(self, text: str, relative_path: str) -> list:
+        """
+        Returns [(first_line, last_line, chunk_text)] with chunks of about
+        chunk_size bytes which start at top-level boundaries where possible.
+        """
+        lines = text.splitlines(keepends=True)
+        boundaries = None
+        if relative_path.endswith((".py", ".pyi")):
+            boundaries = self._python_boundaries(text, lines)
+        if boundaries is None:
+            boundaries = self._text_boundaries(lines)
+        boundaries.add(0)
+
+        # Segments between boundaries, oversized ones are cut by lines
+        segments = []
+        starts = sorted(b for b in boundaries if b < len(lines))
+        for index, start in enumerate(starts):
+            end = starts[index + 1] if index + 1 < len(starts) else len(lines)
+            segment_start = start
+            size = 0
+            for i in range(start, end):
+                size += len(lines[i])
+                if size >= self.chunk_size:
+                    segments.append((segment_start, i + 1))
+                    segment_start = i + 1
+                    size = 0
+            if segment_start < end:
+                segments.append((segment_start, end))
+
+        chunks = []
+        current_start = None
+        current_end = None
+        current_size = 0
+        for start, end in segments:
+            size = sum(len(lines[i]) for i in range(start, end))
+            if current_start is not None and current_size + size > self.chunk_size:
+                chunks.append((current_start, current_end))
+                current_start = None
+                current_size = 0
+            if current_start is None:
+                current_start = start
+            current_end = end
+            current_size += size
+        if current_start is not None:
+            chunks.append((current_start, current_end))
+        return [(start + 1, end, "".join(lines[start:end])) for start, end in chunks]
+
+    @staticmethod
+    def chunk_hash(chunk_text: str) -> str:
+        return "chunk:" + hashlib.sha1(chunk_text.encode("utf-8")).hexdigest()
+
+    def _summarize_chunk(self, relative_path: str, chunk):
+        first_line, last_line, chunk_text = chunk
+        cache = self.project_meta.get_description_cache()
+        model_name = self.project_meta.get_indexing_model_name()
+        key = self.chunk_hash(chunk_text)
+        if cache is not None:
+            summary = cache.get(key, model_name)
+            if summary is not None:
+                return summary
+        prompt = (
+            f"You are a code summarization assistant. Lines {first_line}-{last_line} of the file "
+            f"{relative_path} will be provided; summarize what this part of the file does.\n\n"
+            + CHUNK_RULES +
+            " ----------------- \n"
+        )
+        summary = self.project_meta.ask_indexing_model(prompt + chunk_text)
+        if cache is not None:
+            cache.put(key, model_name, summary)
+        return summary
+
+    def describe(self, relative_path: str, text: str, rules: str) -> str:
+        chunks = self.split(text, relative_path)
+        print(f"ChunkSummarizer: {relative_path} split into {len(chunks)} chunks")
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(chunks))) as executor:
+            summaries = list(executor.map(lambda chunk: self._summarize_chunk(relative_path, chunk), chunks))
+        parts = [
+            "You are a code summarization assistant. The file is too large to be shown in full, so summaries "
+            "of its consecutive parts are provided; output **exactly one concise sentence** that captures the "
+            "file’s primary responsibility or purpose.\n\n"
+            + rules +
+            " ----------------- \n"
+            f"File: {relative_path}\n"
+        ]
+        for (first_line, last_line, _text), summary in zip(chunks, summaries):
+            parts.append(f"Lines {first_line}-{last_line}: {summary.strip()}")
+        return self.project_meta.ask_indexing_model("\n".join(parts))
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+import time
+
+from modules.model.constants import DESCRIPTION_CACHE_FILE, DESCRIPTION_CACHE_MAX_SIZE
+
+
+class DescriptionCache:
+    """
+    Content-addressed cache of file descriptions shared between projects.
+    Entries are keyed by (checksum, model); when the total size of the
+    descriptions exceeds max_size the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path: str = DESCRIPTION_CACHE_FILE, max_size: int = DESCRIPTION_CACHE_MAX_SIZE):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS descriptions ("
+            "checksum TEXT NOT NULL, model TEXT NOT NULL, description TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (checksum, model))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS descriptions_last_used ON descriptions (last_used)")
+        self.connection.commit()
+        row = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM descriptions").fetchone()
+        self.total_size = row[0]
+
+    def get(self, checksum: str, model: str):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT description FROM descriptions WHERE checksum = ? AND model = ?", (checksum, model)
+            ).fetchone()
+            if not row:
+                return None
+            self.connection.execute(
+                "UPDATE descriptions SET last_used = ? WHERE checksum = ? AND model = ?",
+                (time.time(), checksum, model)
+            )
+            self.connection.commit()
+            return row[0]
+
+    def put(self, checksum: str, model: str, description: str):
+        if not description:
+            return
+        size = len(checksum) + len(model) + len(description.encode("utf-8"))
+        with self.lock:
+            old = self.connection.execute(
+                "SELECT size FROM descriptions WHERE checksum = ? AND model = ?", (checksum, model)
+            ).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO descriptions (checksum, model, description, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (checksum, model, description, size, time.time())
+            )
+            self.total_size += size - (old[0] if old else 0)
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self):
+        while self.total_size > self.max_size:
+            rows = self.connection.execute(
+                "SELECT checksum, model, size FROM descriptions ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.total_size = 0
+                return
+            for checksum, model, size in rows:
+                self.connection.execute(
+                    "DELETE FROM descriptions WHERE checksum = ? AND model = ?", (checksum, model)
+                )
+                self.total_size -= size
+                if self.total_size <= self.max_size:
+                    return
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, CancelledError
+
+from .dbRecords.DescriptionRecord import DescriptionRecord
+
+
+class DescriptionIndexer:
+    """
+    Generates file descriptions for a ProjectMeta using a bounded pool of
+    worker threads. Every finished description is stored immediately, so an
+    interrupted run continues from the first file that was not stored.
+    """
+    DEFAULT_MAX_WORKERS = 8
+
+    def __init__(self, project_meta, max_workers=None):
+        self.project_meta = project_meta
+        self.max_workers = max_workers or self.DEFAULT_MAX_WORKERS
+
+    def _describe_pack(self, pack, cancel_event, resume_event):
+        """
+        Returns {relative_path: description} for a pack of files. Files the
+        packed answer did not describe are described one by one; a file whose
+        description fails is left out.
+        """
+        # Paused jobs keep their workers here until resumed or canceled
+        resume_event.wait()
+        if cancel_event.is_set():
+            raise CancelledError()
+        rel_paths = [rel_path for rel_path, _checksum, _stat in pack]
+        if len(rel_paths) == 1:
+            return {rel_paths[0]: self._call(self.project_meta.compose_file_description, rel_paths[0], cancel_event)}
+        try:
+            descriptions = self._call(self.project_meta.compose_packed_descriptions, rel_paths, cancel_event)
+        except CancelledError:
+            raise
+        except Exception as e:
+            print(f"DescriptionIndexer: failed to describe {', '.join(rel_paths)} together: {e}")
+            descriptions = {}
+        for rel_path in rel_paths:
+            if rel_path in descriptions or cancel_event.is_set():
+                continue
+            try:
+                descriptions[rel_path] = self._call(self.project_meta.compose_file_description, rel_path, cancel_event)
+            except CancelledError:
+                raise
+            except Exception as e:
+                print(f"DescriptionIndexer: failed to describe {rel_path}: {e}")
+        return descriptions
+
+    def _call(self, fn, argument, cancel_event):
+        # The provider's concurrency limit is applied by ProjectMeta.ask_indexing_model
+        if cancel_event.is_set():
+            raise CancelledError()
+        return fn(argument)
+
+    def run(self, files, force=False, progress_callback=None, cancel_event=None, resume_event=None):
+        """
+        Describes every file from `files` which is new or outdated (or every
+        file when `force` is set).
+
+        progress_callback(done, total, rel_path) is called after each file.
+        Setting `cancel_event` stops scheduling new requests; requests that are
+        already running are awaited and their results are kept. Clearing
+        `resume_event` pauses the run before the next request.
+        """
+        if cancel_event is None:
+            cancel_event = threading.Event()
+        if resume_event is None:
+            resume_event = threading.Event()
+            resume_event.set()
+        project_path = self.project_meta.project_path
+
+        pending = self.project_meta.get_files_to_index(files, force)
+        total = len(pending)
+
+        stats = {
+            'total_files': total,
+            'indexed_files': [],
+            'cached_files': [],
+            'failed_files': [],
+            'canceled': False
+        }
+        if not force:
+            # Files with the same content were already described (in any project)
+            stats['cached_files'], pending = self.project_meta.apply_cached_descriptions(pending)
+            if progress_callback:
+                for done, rel_path in enumerate(stats['cached_files'], start=1):
+                    progress_callback(done, total, rel_path)
+        if not pending:
+            return stats
+
+        packs = self.project_meta.pack_files_for_indexing(pending)
+        workers = min(self.max_workers, len(packs))
+        model_name = self.project_meta.get_indexing_model_name()
+        done = len(stats['cached_files'])
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._describe_pack, pack, cancel_event, resume_event): pack
+                for pack in packs
+            }
+            for future in as_completed(futures):
+                pack = futures[future]
+                if self.project_meta.project_path != project_path:
+                    # Another project was opened - results belong to the old one
+                    cancel_event.set()
+                    resume_event.set()
+                if cancel_event.is_set() and not stats['canceled']:
+                    stats['canceled'] = True
+                    for other in futures:
+                        other.cancel()
+                try:
+                    descriptions = future.result()
+                except CancelledError:
+                    continue
+                except Exception as e:
+                    print(f"DescriptionIndexer: failed to describe {', '.join(item[0] for item in pack)}: {e}")
+                    descriptions = {}
+                if self.project_meta.project_path != project_path:
+                    continue
+                for rel_path, checksum, file_stat in pack:
+                    new_description = descriptions.get(rel_path)
+                    if new_description is None:
+                        stats['failed_files'].append(rel_path)
+                    else:
+                        print(f"{rel_path}: {new_description}\n")
+                        record = DescriptionRecord(rel_path, checksum, new_description)
+                        record.set_stat(file_stat)
+                        self.project_meta._save_record(record)
+                        self.project_meta._store_in_description_cache(checksum, new_description, model_name)
+                        stats['indexed_files'].append(rel_path)
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total, rel_path)
+        if cancel_event.is_set():
+            stats['canceled'] = True
+        return stats
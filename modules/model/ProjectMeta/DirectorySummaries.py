@@ -0,0 +1,185 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .dbRecords.DirectorySummaryRecord import DirectorySummaryRecord
+from .storage.MetaStorageBase import DIRECTORY_SUMMARIES_TABLE
+
+# Children listed in a single directory summary request
+MAX_CHILDREN_PER_REQUEST = 200
+
+DIRECTORY_RULES = (
+    "  - Write in plain English—no JSON, no bullet lists, no quotes.\n"
+    "  - Do not explain your reasoning or add extra commentary—just the single sentence.\n"
+    "  - Avoid common introduction phases, like \"This directory\" and \"This folder\". Straight to the point.\n\n"
+)
+
+
+class DirectorySummaries:
+    """
+    One-sentence summaries of project directories built bottom-up from the
+    descriptions of their files and the summaries of their subdirectories.
+    Every summary keeps a signature of the child checksums it was built from,
+    so only directories on the path of a changed file are summarized again.
+    """
+    MAX_WORKERS = 4
+
+    def __init__(self, project_meta):
+        self.project_meta = project_meta
+
+    @staticmethod
+    def build_tree(files) -> dict:
+        """Returns {directory: (file names, subdirectory names)}, "" being the project root."""
+        tree = {"": ([], set())}
+        for rel_path in files:
+            directory, name = os.path.split(rel_path)
+            tree.setdefault(directory, ([], set()))[0].append(name)
+            while directory:
+                parent, child = os.path.split(directory)
+                entry = tree.setdefault(parent, ([], set()))
+                if child in entry[1]:
+                    break
+                entry[1].add(child)
+                directory = parent
+        return tree
+
+    def load(self) -> dict:
+        return {
+            doc['directory']: DirectorySummaryRecord(**doc)
+            for doc in self.project_meta.storage.all(DIRECTORY_SUMMARIES_TABLE)
+        }
+
+    def _signature(self, directory, files, subdirs, signatures) -> str:
+        hash_sha1 = hashlib.sha1()
+        for name in sorted(files):
+            record = self.project_meta._get_existing_record(os.path.join(directory, name))
+            hash_sha1.update(f"f {name} {record.checksum if record else '-'}\n".encode("utf-8"))
+        for name in sorted(subdirs):
+            hash_sha1.update(f"d {name} {signatures[os.path.join(directory, name)]}\n".encode("utf-8"))
+        return hash_sha1.hexdigest()
+
+    def _children_text(self, directory, files, subdirs, summaries) -> list:
+        children = []
+        for name in sorted(subdirs):
+            summary = summaries.get(os.path.join(directory, name))
+            if summary:
+                children.append((f"{name}/", summary))
+        for name in sorted(files):
+            record = self.project_meta._get_existing_record(os.path.join(directory, name))
+            if record and record.description:
+                children.append((name, record.description))
+        return children
+
+    def _summarize(self, directory, children) -> str:
+        if len(children) == 1:
+            # Nothing to combine - the only child describes the directory
+            return children[0][1]
+        if not self.project_meta.llm_model:
+            return f"Summary of {directory or 'the project'}"
+        prompt = (
+            "You are a code summarization assistant. The contents of a project directory are listed below as "
+            "files and subdirectories with their descriptions; output **exactly one concise sentence** that "
+            "captures the directory’s primary responsibility.\n\n"
+            + DIRECTORY_RULES +
+            " ----------------- \n"
+            f"Directory: {directory or '(project root)'}\n"
+        )
+        lines = [f"{name}: {text.strip()}" for name, text in children[:MAX_CHILDREN_PER_REQUEST]]
+        if len(children) > MAX_CHILDREN_PER_REQUEST:
+            lines.append(f"... and {len(children) - MAX_CHILDREN_PER_REQUEST} more entries")
+        return self.project_meta.ask_indexing_model(prompt + "\n".join(lines))
+
+    def update(self, files=None, progress_callback=None, cancel_event=None) -> dict:
+        """
+        Summarizes every directory whose signature changed, deepest
+        directories first. progress_callback(done, total, directory) is
+        called for each directory.
+        """
+        if cancel_event is None:
+            cancel_event = threading.Event()
+        if files is None:
+            files = self.project_meta.getAll_project_files()
+        tree = self.build_tree(files)
+        stored = self.load()
+        storage = self.project_meta.storage
+        for directory in set(stored) - set(tree):
+            storage.remove(DIRECTORY_SUMMARIES_TABLE, directory)
+
+        stats = {
+            'total_directories': len(tree),
+            'updated_directories': [],
+            'failed_directories': [],
+            'canceled': False
+        }
+        signatures = {}
+        summaries = {}
+        done = 0
+        by_depth = {}
+        for directory in tree:
+            depth = directory.count(os.sep) + 1 if directory else 0
+            by_depth.setdefault(depth, []).append(directory)
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            for depth in sorted(by_depth, reverse=True):
+                if cancel_event.is_set():
+                    stats['canceled'] = True
+                    break
+                jobs = {}
+                for directory in by_depth[depth]:
+                    files_in_dir, subdirs = tree[directory]
+                    signatures[directory] = self._signature(directory, files_in_dir, subdirs, signatures)
+                    record = stored.get(directory)
+                    if record and record.signature == signatures[directory]:
+                        summaries[directory] = record.summary
+                        continue
+                    children = self._children_text(directory, files_in_dir, subdirs, summaries)
+                    if not children:
+                        summaries[directory] = ""
+                        continue
+                    jobs[directory] = executor.submit(self._summarize, directory, children)
+                done += len(by_depth[depth]) - len(jobs)
+                for directory, future in jobs.items():
+                    try:
+                        summary = future.result()
+                    except Exception as e:
+                        print(f"DirectorySummaries: failed to summarize {directory or '(project root)'}: {e}")
+                        stats['failed_directories'].append(directory)
+                        summaries[directory] = ""
+                    else:
+                        summaries[directory] = summary
+                        storage.upsert(DIRECTORY_SUMMARIES_TABLE,
+                                       DirectorySummaryRecord(directory, signatures[directory], summary).to_dict())
+                        stats['updated_directories'].append(directory)
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, stats['total_directories'], directory)
+                storage.flush()
+        print(f"DirectorySummaries: {len(stats['updated_directories'])} of {stats['total_directories']} "
+              f"directories summarized, {len(stats['failed_directories'])} failed")
+        return stats
+
+    def compose_project_map(self, files=None) -> str:
+        """
+        Indented directory tree with the stored directory summaries and the
+        file names of each directory.
+        """
+        if files is None:
+            files = self.project_meta.getAll_project_files()
+        tree = self.build_tree(files)
+        stored = self.load()
+        lines = []
+
+        def add_directory(directory, depth):
+            indent = "  " * depth
+            record = stored.get(directory)
+            name = os.path.basename(directory) + "/" if directory else "./"
+            lines.append(f"{indent}{name} - {record.summary}" if record and record.summary else f"{indent}{name}")
+            files_in_dir, subdirs = tree[directory]
+            for subdir in sorted(subdirs):
+                add_directory(os.path.join(directory, subdir), depth + 1)
+            if files_in_dir:
+                lines.append(f"{indent}  " + ", ".join(sorted(files_in_dir)))
+
+        add_directory("", 0)
+        return "\n".join(lines)
@@ -0,0 +1,77 @@
+import hashlib
+import os
+from git import Repo, IndexFile
+
+
+class GitChecksums:
+    """
+    Provides git blob ids of project files. For tracked files whose stat
+    matches the git index entry the id is taken from the index, other files
+    are hashed the same way git does it.
+    """
+
+    def __init__(self, project_path: str):
+        self.project_path = project_path
+        self.repo = None
+        self._entries = {}
+        self._index_mtime = None
+        try:
+            self.repo = Repo(project_path, search_parent_directories=True)
+            self.repo_root = self.repo.working_tree_dir
+            self.index_path = os.path.join(self.repo.git_dir, 'index')
+            prefix = os.path.relpath(os.path.abspath(project_path), self.repo_root)
+            self.prefix = "" if prefix == "." else prefix.replace(os.sep, "/") + "/"
+        except Exception:
+            self.repo = None
+
+    def is_available(self) -> bool:
+        return self.repo is not None
+
+    def _refresh(self):
+        try:
+            index_mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            self._entries = {}
+            self._index_mtime = None
+            return
+        if index_mtime == self._index_mtime:
+            return
+        entries = {}
+        try:
+            for (path, stage), entry in IndexFile(self.repo).entries.items():
+                if stage != 0 or not path.startswith(self.prefix):
+                    continue
+                entries[path[len(self.prefix):]] = (entry.hexsha, entry.size, entry.mtime)
+        except Exception as e:
+            print(f"GitChecksums: failed to read git index: {e}")
+        self._entries = entries
+        self._index_mtime = index_mtime
+
+    def get_clean_checksum(self, relative_path: str, file_stat):
+        """
+        Returns the blob id from the git index if the file is tracked and its
+        stat (mtime, size, inode) matches the index entry, otherwise None.
+        """
+        self._refresh()
+        entry = self._entries.get(relative_path.replace(os.sep, "/"))
+        if entry is None:
+            return None
+        hexsha, size, (mtime_sec, mtime_nsec) = entry
+        file_mtime_ns, file_size, _inode = file_stat
+        if file_size != size or file_mtime_ns // 1_000_000_000 != mtime_sec:
+            return None
+        if mtime_nsec and file_mtime_ns % 1_000_000_000 != mtime_nsec:
+            return None
+        # "Racy" entries: the file may have changed in the same second the index was written
+        if file_mtime_ns // 1_000_000_000 >= self._index_mtime // 1_000_000_000:
+            return None
+        return hexsha
+
+    @staticmethod
+    def blob_hash(file_path: str) -> str:
+        hash_sha1 = hashlib.sha1()
+        hash_sha1.update(f"blob {os.path.getsize(file_path)}\0".encode())
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hash_sha1.update(chunk)
+        return hash_sha1.hexdigest()
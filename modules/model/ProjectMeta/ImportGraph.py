@@ -0,0 +1,174 @@
+import ast
+import os
+import threading
+
+from .storage.MetaStorageBase import IMPORTS_TABLE
+
+
+def parse_imports(text: str) -> list:
+    """Imports of a Python source as [module, level, names] lists."""
+    imports = []
+    for node in ast.walk(ast.parse(text)):
+        if isinstance(node, ast.Import):
+            imports.extend([alias.name, 0, []] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append([node.module or "", node.level, [alias.name for alias in node.names]])
+    return imports
+
+
+def module_name(relative_path: str) -> str:
+    """Dotted module name of a project file, packages are named by their directory."""
+    parts = os.path.splitext(relative_path)[0].split(os.sep)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+class ImportGraph:
+    """
+    Imports between the Python files of the project. The imports of each file
+    are parsed with ast and stored with the checksum they were parsed from;
+    they are resolved to project files on every build, so new and removed
+    modules are picked up without parsing the importers again.
+
+    Absolute imports are resolved from the project root first and then by a
+    unique dotted suffix, which covers src/ layouts and scripts run from a
+    subdirectory.
+    """
+
+    def __init__(self, project_meta):
+        self.project_meta = project_meta
+        self.lock = threading.Lock()
+        self._entries = None
+
+    def _file_imports(self, rel_path: str, updated: list):
+        record = self.project_meta._get_existing_record(rel_path)
+        try:
+            checksum = self.project_meta.get_current_checksum(rel_path, record)
+        except OSError:
+            return []
+        entry = self._entries.get(rel_path)
+        if entry and entry['checksum'] == checksum:
+            return entry['imports']
+        try:
+            with open(os.path.join(self.project_meta.project_path, rel_path), "r", encoding="utf-8",
+                      errors="replace") as f:
+                imports = parse_imports(f.read())
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"ImportGraph: can not parse {rel_path}: {e}")
+            imports = []
+        entry = {'file_path': rel_path, 'checksum': checksum, 'imports': imports}
+        self._entries[rel_path] = entry
+        updated.append(entry)
+        return imports
+
+    @staticmethod
+    def _build_module_index(files):
+        modules = {}
+        suffixes = {}
+        for rel_path in files:
+            name = module_name(rel_path)
+            modules[name] = rel_path
+            parts = name.split(".")
+            for i in range(1, len(parts)):
+                suffixes.setdefault(".".join(parts[i:]), set()).add(rel_path)
+        return modules, suffixes
+
+    @staticmethod
+    def _resolve(name, modules, suffixes):
+        if name in modules:
+            return modules[name]
+        candidates = suffixes.get(name)
+        if candidates and len(candidates) == 1:
+            return next(iter(candidates))
+        return None
+
+    def _resolve_import(self, rel_path, module, level, names, modules, suffixes) -> set:
+        if level:
+            package = module_name(rel_path).split(".")
+            # A package __init__ is its own package, a module is in the package of its directory
+            if not rel_path.endswith("__init__.py"):
+                package = package[:-1]
+            if level > 1:
+                package = package[:-(level - 1)] if level - 1 <= len(package) else None
+            if package is None:
+                return set()
+            base = ".".join(package + ([module] if module else []))
+            resolve = lambda name: modules.get(name)
+        else:
+            base = module
+            resolve = lambda name: self._resolve(name, modules, suffixes)
+        resolved = set()
+        for name in names:
+            # "from package import module" imports the module itself
+            target = resolve(f"{base}.{name}" if base else name)
+            if target:
+                resolved.add(target)
+        if base:
+            target = resolve(base)
+            if target and (not resolved or not target.endswith("__init__.py")):
+                resolved.add(target)
+        resolved.discard(rel_path)
+        return resolved
+
+    def build(self):
+        """Returns (dependencies, dependents): {file: set of files} of the Python files of the project."""
+        files = [rel_path for rel_path in self.project_meta.getAll_project_files() if rel_path.endswith(".py")]
+        storage = self.project_meta.storage
+        with self.lock:
+            if self._entries is None:
+                self._entries = {doc['file_path']: doc for doc in storage.all(IMPORTS_TABLE)}
+            updated = []
+            imports = {rel_path: self._file_imports(rel_path, updated) for rel_path in files}
+            removed = set(self._entries) - set(files)
+            for rel_path in removed:
+                del self._entries[rel_path]
+                storage.remove(IMPORTS_TABLE, rel_path)
+            if updated:
+                storage.upsert_many(IMPORTS_TABLE, updated)
+            if updated or removed:
+                storage.flush()
+
+        modules, suffixes = self._build_module_index(files)
+        dependencies = {}
+        dependents = {}
+        for rel_path, file_imports in imports.items():
+            targets = set()
+            for module, level, names in file_imports:
+                targets |= self._resolve_import(rel_path, module, level, names, modules, suffixes)
+            dependencies[rel_path] = targets
+            for target in targets:
+                dependents.setdefault(target, set()).add(rel_path)
+        return dependencies, dependents
+
+    def expand(self, files, hops: int, token_budget: int, bytes_per_token: int) -> list:
+        """
+        Files imported by or importing the given files, up to hops steps away,
+        nearest first (dependencies before dependents), as long as their
+        estimated size fits into token_budget.
+        """
+        dependencies, dependents = self.build()
+        seen = set(files)
+        frontier = [rel_path for rel_path in files if rel_path in dependencies]
+        added = []
+        used_tokens = 0
+        for _hop in range(hops):
+            next_frontier = []
+            for graph in (dependencies, dependents):
+                for rel_path in frontier:
+                    for neighbour in sorted(graph.get(rel_path, ())):
+                        if neighbour in seen:
+                            continue
+                        seen.add(neighbour)
+                        try:
+                            size = os.path.getsize(os.path.join(self.project_meta.project_path, neighbour))
+                        except OSError:
+                            continue
+                        tokens = size // bytes_per_token + 1
+                        if used_tokens + tokens > token_budget:
+                            continue
+                        used_tokens += tokens
+                        added.append(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        return added
@@ -0,0 +1,171 @@
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from .storage.MetaStorageBase import SEARCH_TERMS_TABLE
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9]*|[0-9]+")
+CAMEL_CASE_PATTERN = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+STOP_WORDS = {
+    "the", "and", "for", "with", "from", "that", "this", "are", "was", "not", "but", "have", "has", "you",
+    "all", "can", "its", "into", "our", "use", "will", "when", "then", "else", "self", "def", "return",
+    "import", "none", "true", "false", "class", "var", "let", "const", "new", "int", "str", "void",
+}
+# Weights of the terms found in the path and in the description compared to the content
+PATH_WEIGHT = 3
+DESCRIPTION_WEIGHT = 2
+MAX_CONTENT_BYTES = 200 * 1024
+MAX_TERMS_PER_FILE = 400
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list:
+    """Lower-case terms of the text; identifiers are also split by camelCase and snake_case."""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text):
+        lower = token.lower()
+        parts = CAMEL_CASE_PATTERN.findall(token)
+        if len(lower) > 1 and lower not in STOP_WORDS:
+            terms.append(lower)
+        if len(parts) > 1:
+            terms.extend(part.lower() for part in parts if len(part) > 1 and part.lower() not in STOP_WORDS)
+    return terms
+
+
+class LexicalSearchIndex:
+    """
+    Offline BM25 ranking of project files by path, cached description and
+    content. Term counts are stored per file with the checksum they were
+    made from, so only changed files are read again; the postings are kept
+    as NumPy arrays and rebuilt when a file changes.
+    """
+
+    def __init__(self, project_meta):
+        self.project_meta = project_meta
+        self.lock = threading.Lock()
+        self._documents = None
+        self._postings = None
+
+    def _document_terms(self, rel_path: str, record) -> Counter:
+        counts = Counter()
+        for term in tokenize(rel_path.replace(os.sep, " ")):
+            counts[term] += PATH_WEIGHT
+        if record and record.description:
+            for term in tokenize(record.description):
+                counts[term] += DESCRIPTION_WEIGHT
+        try:
+            with open(os.path.join(self.project_meta.project_path, rel_path), "r", encoding="utf-8",
+                      errors="replace") as f:
+                counts.update(tokenize(f.read(MAX_CONTENT_BYTES)))
+        except OSError:
+            pass
+        return Counter(dict(counts.most_common(MAX_TERMS_PER_FILE)))
+
+    def _refresh(self, files) -> bool:
+        """Brings the term counts up to date; returns True when anything changed."""
+        storage = self.project_meta.storage
+        if self._documents is None:
+            self._documents = {doc['file_path']: doc for doc in storage.all(SEARCH_TERMS_TABLE)}
+        changed = False
+        updated = []
+        for rel_path in set(self._documents) - set(files):
+            del self._documents[rel_path]
+            storage.remove(SEARCH_TERMS_TABLE, rel_path)
+            changed = True
+        for rel_path in files:
+            record = self.project_meta._get_existing_record(rel_path)
+            try:
+                checksum = self.project_meta.get_current_checksum(rel_path, record)
+            except OSError:
+                continue
+            description_crc = zlib.crc32((record.description or "").encode("utf-8")) if record else 0
+            doc = self._documents.get(rel_path)
+            if doc and doc['checksum'] == checksum and doc['description_crc'] == description_crc:
+                continue
+            terms = self._document_terms(rel_path, record)
+            doc = {
+                'file_path': rel_path,
+                'checksum': checksum,
+                'description_crc': description_crc,
+                'length': sum(terms.values()),
+                'terms': dict(terms)
+            }
+            self._documents[rel_path] = doc
+            updated.append(doc)
+            changed = True
+        if updated:
+            storage.upsert_many(SEARCH_TERMS_TABLE, updated)
+        if changed:
+            storage.flush()
+        return changed
+
+    def _build_postings(self):
+        paths = sorted(self._documents)
+        vocabulary = {}
+        term_ids = []
+        doc_indexes = []
+        counts = []
+        for doc_index, path in enumerate(paths):
+            terms = self._documents[path]['terms']
+            term_ids.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+            doc_indexes.extend([doc_index] * len(terms))
+            counts.extend(terms.values())
+        term_ids = np.array(term_ids, dtype=np.int32)
+        order = np.argsort(term_ids, kind="stable")
+        # Postings of term i are doc_indexes[starts[i]:starts[i + 1]]
+        starts = np.searchsorted(term_ids[order], np.arange(len(vocabulary) + 1))
+        lengths = np.array([self._documents[path]['length'] for path in paths], dtype=np.float64)
+        self._postings = (
+            paths,
+            lengths,
+            vocabulary,
+            starts,
+            np.array(doc_indexes, dtype=np.int32)[order],
+            np.array(counts, dtype=np.float64)[order]
+        )
+
+    def search(self, query: str, top_k: int = 20) -> list:
+        """Returns up to top_k (relative_path, score) pairs, best first."""
+        files = self.project_meta.getAll_project_files()
+        with self.lock:
+            if self._refresh(files) or self._postings is None:
+                self._build_postings()
+            paths, lengths, vocabulary, starts, all_doc_indexes, all_counts = self._postings
+            if not paths:
+                return []
+            average_length = max(lengths.mean(), 1.0)
+            scores = np.zeros(len(paths), dtype=np.float64)
+            for term in set(tokenize(query)):
+                term_id = vocabulary.get(term)
+                if term_id is None:
+                    continue
+                doc_indexes = all_doc_indexes[starts[term_id]:starts[term_id + 1]]
+                counts = all_counts[starts[term_id]:starts[term_id + 1]]
+                idf = np.log(1.0 + (len(paths) - len(doc_indexes) + 0.5) / (len(doc_indexes) + 0.5))
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths[doc_indexes] / average_length)
+                scores[doc_indexes] += idf * counts * (BM25_K1 + 1.0) / (counts + norm)
+            top = np.argsort(-scores)[:top_k]
+            return [(paths[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def suggest(self, query: str, token_budget: int, max_files: int, bytes_per_token: int) -> list:
+        """Best ranked files whose estimated size fits into token_budget."""
+        suggested = []
+        used_tokens = 0
+        for rel_path, _score in self.search(query, top_k=max_files * 3):
+            try:
+                size = os.path.getsize(os.path.join(self.project_meta.project_path, rel_path))
+            except OSError:
+                continue
+            tokens = size // bytes_per_token + 1
+            if used_tokens + tokens > token_budget:
+                continue
+            suggested.append(rel_path)
+            used_tokens += tokens
+            if len(suggested) >= max_files:
+                break
+        return suggested
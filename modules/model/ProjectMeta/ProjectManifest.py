@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+
+from .ProjectScanner import ProjectScanner
+from .storage.MetaStorageBase import SETTINGS_TABLE, MANIFEST_TABLE, MANIFEST_DIRS_TABLE, MANIFEST_JOURNAL_TABLE
+
+
+class ProjectManifest:
+    """
+    Persisted list of the project files with their stat and (lazily
+    calculated) checksum. Instead of walking the whole project the listing
+    is refreshed from
+      - the change journal: paths written by the application itself,
+      - directory mtimes: only directories whose entries (or .gitignore)
+        changed are listed again.
+    The manifest is rebuilt when the index settings change.
+    """
+
+    def __init__(self, project_meta):
+        self.project_meta = project_meta
+        self.lock = threading.RLock()
+        self.entries = None
+        self.directories = None
+        self._by_dir = None
+
+    def _settings_signature(self) -> str:
+        meta = self.project_meta
+        # The scanner defaults are included so that changing them rebuilds existing manifests
+        return json.dumps([meta.index_extensions, meta.index_directories, meta.exclude_patterns,
+                           sorted(ProjectScanner.DEFAULT_EXCLUDED_DIRS), ProjectScanner.DEFAULT_EXCLUDE_PATTERNS])
+
+    def _dir_state(self, rel_dir: str):
+        path = os.path.join(self.project_meta.project_path, rel_dir)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        try:
+            gitignore_mtime = os.stat(os.path.join(path, '.gitignore')).st_mtime_ns
+        except OSError:
+            gitignore_mtime = None
+        return mtime, gitignore_mtime
+
+    def _load(self):
+        storage = self.project_meta.storage
+        self.entries = {doc['file_path']: doc for doc in storage.all(MANIFEST_TABLE)}
+        self.directories = {doc['directory']: doc for doc in storage.all(MANIFEST_DIRS_TABLE)}
+        self._by_dir = {}
+        for rel_path in self.entries:
+            self._by_dir.setdefault(os.path.dirname(rel_path), set()).add(rel_path)
+
+    def get_files(self) -> list:
+        with self.lock:
+            if self.entries is None:
+                self._load()
+            settings = self.project_meta.storage.get(SETTINGS_TABLE, "manifest")
+            if not self.directories or not settings or settings.get("signature") != self._settings_signature():
+                self.rebuild()
+            else:
+                self.refresh()
+            return sorted(self.entries)
+
+    def record_changes(self, relative_paths):
+        """Adds paths created, modified or deleted by the application to the change journal."""
+        now = time.time()
+        storage = self.project_meta.storage
+        storage.upsert_many(MANIFEST_JOURNAL_TABLE, [{'file_path': path, 'time': now} for path in relative_paths])
+        storage.flush()
+
+    def get_checksum(self, relative_path: str, file_stat) -> str:
+        """Checksum of the file, calculated only when its stat differs from the manifest entry."""
+        with self.lock:
+            entry = self.entries.get(relative_path) if self.entries is not None else None
+            if entry and entry.get('checksum') and (entry['mtime'], entry['size'], entry['inode']) == tuple(file_stat):
+                return entry['checksum']
+        checksum = self.project_meta.calculate_checksum(relative_path)
+        with self.lock:
+            if entry is not None and self.entries.get(relative_path) is entry:
+                entry['mtime'], entry['size'], entry['inode'] = file_stat
+                entry['checksum'] = checksum
+                self.project_meta.storage.upsert(MANIFEST_TABLE, entry)
+        return checksum
+
+    def _make_entry(self, rel_path: str, old=None):
+        try:
+            st = os.stat(os.path.join(self.project_meta.project_path, rel_path))
+        except OSError:
+            return None
+        file_stat = (st.st_mtime_ns, st.st_size, st.st_ino)
+        checksum = None
+        if old and (old['mtime'], old['size'], old['inode']) == file_stat:
+            checksum = old.get('checksum')
+        mtime, size, inode = file_stat
+        return {'file_path': rel_path, 'mtime': mtime, 'size': size, 'inode': inode, 'checksum': checksum}
+
+    def _make_dir_entry(self, rel_dir: str):
+        state = self._dir_state(rel_dir)
+        if state is None:
+            return None
+        return {'directory': rel_dir, 'mtime': state[0], 'gitignore_mtime': state[1]}
+
+    def rebuild(self):
+        started = time.perf_counter()
+        scanner = self.project_meta.get_scanner()
+        files = scanner.scan()
+        old_entries = self.entries or {}
+        entries = {}
+        for rel_path in files:
+            entry = self._make_entry(rel_path, old_entries.get(rel_path))
+            if entry:
+                entries[rel_path] = entry
+        directories = {}
+        for rel_dir in scanner.visited_directories:
+            dir_entry = self._make_dir_entry(rel_dir)
+            if dir_entry:
+                directories[rel_dir] = dir_entry
+
+        storage = self.project_meta.storage
+        for rel_path in set(old_entries) - set(entries):
+            storage.remove(MANIFEST_TABLE, rel_path)
+        for rel_dir in set(self.directories or {}) - set(directories):
+            storage.remove(MANIFEST_DIRS_TABLE, rel_dir)
+        for doc in storage.all(MANIFEST_JOURNAL_TABLE):
+            storage.remove(MANIFEST_JOURNAL_TABLE, doc['file_path'])
+        storage.upsert_many(MANIFEST_TABLE, list(entries.values()))
+        storage.upsert_many(MANIFEST_DIRS_TABLE, list(directories.values()))
+        storage.upsert(SETTINGS_TABLE, {"id": "manifest", "signature": self._settings_signature()})
+        storage.flush()
+        self.entries = entries
+        self.directories = directories
+        self._by_dir = {}
+        for rel_path in entries:
+            self._by_dir.setdefault(os.path.dirname(rel_path), set()).add(rel_path)
+        print(f"ProjectManifest: {len(entries)} files in {len(directories)} directories listed "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    def _set_entry(self, rel_path: str, entry, changed_entries: dict):
+        old = self.entries.get(rel_path)
+        if entry is None:
+            if old is not None:
+                del self.entries[rel_path]
+                self._by_dir.get(os.path.dirname(rel_path), set()).discard(rel_path)
+                changed_entries[rel_path] = None
+            return
+        if old is not None and (old['mtime'], old['size'], old['inode']) == (entry['mtime'], entry['size'], entry['inode']):
+            return
+        self.entries[rel_path] = entry
+        self._by_dir.setdefault(os.path.dirname(rel_path), set()).add(rel_path)
+        changed_entries[rel_path] = entry
+
+    def _drop_directory(self, rel_dir: str, changed_entries: dict, changed_dirs: dict):
+        prefix = rel_dir + os.sep if rel_dir else ""
+        for directory in [d for d in self.directories if d == rel_dir or d.startswith(prefix)]:
+            del self.directories[directory]
+            changed_dirs[directory] = None
+            for rel_path in list(self._by_dir.get(directory, ())):
+                self._set_entry(rel_path, None, changed_entries)
+
+    def _rescan_directory(self, scanner, rel_dir: str, changed_entries: dict, changed_dirs: dict):
+        previous = dict(self.entries)
+        self._drop_directory(rel_dir, changed_entries, changed_dirs)
+        scanner.visited_directories = set()
+        for rel_path in scanner.scan_directory(rel_dir):
+            if scanner.in_index_directories(rel_path):
+                self._set_entry(rel_path, self._make_entry(rel_path, previous.get(rel_path)), changed_entries)
+        for directory in scanner.visited_directories:
+            dir_entry = self._make_dir_entry(directory)
+            if dir_entry:
+                self.directories[directory] = dir_entry
+                changed_dirs[directory] = dir_entry
+
+    def refresh(self):
+        scanner = self.project_meta.get_scanner()
+        storage = self.project_meta.storage
+        changed_entries = {}
+        changed_dirs = {}
+        rescan = set()
+
+        journal = storage.all(MANIFEST_JOURNAL_TABLE)
+        for doc in journal:
+            rel_path = doc['file_path']
+            if os.path.basename(rel_path) == '.gitignore':
+                rescan.add(os.path.dirname(rel_path))
+                continue
+            entry = None
+            if os.path.isfile(os.path.join(self.project_meta.project_path, rel_path)) and scanner.accepts_file(rel_path):
+                entry = self._make_entry(rel_path, self.entries.get(rel_path))
+            self._set_entry(rel_path, entry, changed_entries)
+
+        for rel_dir, dir_entry in list(self.directories.items()):
+            if rel_dir not in self.directories:
+                continue
+            state = self._dir_state(rel_dir)
+            if state is None:
+                self._drop_directory(rel_dir, changed_entries, changed_dirs)
+            elif state[1] != dir_entry.get('gitignore_mtime'):
+                rescan.add(rel_dir)
+            elif state[0] != dir_entry['mtime']:
+                # Entries of the directory changed: list it again without descending
+                listed = {rel_path for rel_path in scanner.scan_directory(rel_dir, recursive=False)
+                          if scanner.in_index_directories(rel_path)}
+                for rel_path in self._by_dir.get(rel_dir, set()) - listed:
+                    self._set_entry(rel_path, None, changed_entries)
+                for rel_path in listed - self._by_dir.get(rel_dir, set()):
+                    self._set_entry(rel_path, self._make_entry(rel_path), changed_entries)
+                with os.scandir(os.path.join(self.project_meta.project_path, rel_dir)) as entries:
+                    for entry in entries:
+                        child = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                        if (entry.is_dir(follow_symlinks=False) and child not in self.directories
+                                and not scanner.is_ignored(child, True)):
+                            rescan.add(child)
+                for child in [d for d in self.directories if os.path.dirname(d) == rel_dir and d]:
+                    if not os.path.isdir(os.path.join(self.project_meta.project_path, child)):
+                        self._drop_directory(child, changed_entries, changed_dirs)
+                new_entry = {'directory': rel_dir, 'mtime': state[0], 'gitignore_mtime': state[1]}
+                self.directories[rel_dir] = new_entry
+                changed_dirs[rel_dir] = new_entry
+
+        # A rescan replaces everything below the directory, nested ones are skipped
+        rescanned = []
+        for rel_dir in sorted(rescan, key=len):
+            if any(rel_dir == done or rel_dir.startswith(done + os.sep) or not done for done in rescanned):
+                continue
+            if os.path.isdir(os.path.join(self.project_meta.project_path, rel_dir)):
+                self._rescan_directory(scanner, rel_dir, changed_entries, changed_dirs)
+                rescanned.append(rel_dir)
+
+        if not journal and not changed_entries and not changed_dirs:
+            return
+        for rel_path, entry in changed_entries.items():
+            if entry is None:
+                storage.remove(MANIFEST_TABLE, rel_path)
+            else:
+                storage.upsert(MANIFEST_TABLE, entry)
+        for rel_dir, dir_entry in changed_dirs.items():
+            if dir_entry is None:
+                storage.remove(MANIFEST_DIRS_TABLE, rel_dir)
+            else:
+                storage.upsert(MANIFEST_DIRS_TABLE, dir_entry)
+        for doc in journal:
+            storage.remove(MANIFEST_JOURNAL_TABLE, doc['file_path'])
+        storage.flush()
+        print(f"ProjectManifest: {len(changed_entries)} files and {len(changed_dirs)} directories updated")
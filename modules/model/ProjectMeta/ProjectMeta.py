@@ -1,12 +1,41 @@
 import hashlib
 import os
-from pathlib import Path
-from tinydb import TinyDB, Query
-from tinydb.storages import JSONStorage
-from tinydb.middlewares import CachingMiddleware
+import re
+from datetime import datetime
 from enum import Enum
 
+from modules.model.constants import PROJECT_META_STORAGE
 from .dbRecords.DescriptionRecord import DescriptionRecord
+from .DescriptionIndexer import DescriptionIndexer
+from .ProjectScanner import ProjectScanner
+from .GitChecksums import GitChecksums
+from .DescriptionCache import DescriptionCache
+from .ChunkSummarizer import ChunkSummarizer
+from .DirectorySummaries import DirectorySummaries
+from .ProjectManifest import ProjectManifest
+from .LexicalSearchIndex import LexicalSearchIndex
+from .SymbolIndex import SymbolIndex
+from .ImportGraph import ImportGraph
+from .TokenCounts import TokenCounts
+from .storage.MetaStorageBase import DESCRIPTIONS_TABLE, SETTINGS_TABLE, INDEX_BATCHES_TABLE
+from .storage.TinyDBMetaStorage import TinyDBMetaStorage
+from .storage.SQLiteMetaStorage import SQLiteMetaStorage
+
+DESCRIPTION_RULES = (
+    "  - Write in plain English—no JSON, no bullet lists, no quotes.\n"
+    "  - Do not explain your reasoning or add extra commentary—just the single sentence.\n"
+    "  - Do not mention framework.\n"
+    "  - Avoid common introduction phases, like \"This code\", \"This file\" and \"This script\". Straight to the point.\n\n"
+)
+
+# Rough size estimation used to pack small files into one description request
+BYTES_PER_TOKEN = 4
+MAX_FILES_PER_PACK = 20
+# Larger files are described from summaries of their chunks
+MAX_DESCRIPTION_FILE_TOKENS = 16000
+CHUNK_TOKENS = 4000
+
+PACKED_DESCRIPTION_LINE = re.compile(r"^\s*\*{3}(.+?)\*{3}\s*[:\-–—]?\s*(.*)$")
 
 class FileStatus(Enum):
     NotIndexed = "NotIndexed"
@@ -14,31 +43,72 @@ class FileStatus(Enum):
     Outdated = "Outdated"
 
 class ProjectMeta:
-    def __init__(self, project_path: str, llm_model=None):
+    def __init__(self, project_path: str, llm_model=None, storage_backend: str = None):
         print(f"ProjectMeta: opening project {project_path}")
         self.llm_model = llm_model
+        self.storage_backend = storage_backend or PROJECT_META_STORAGE
+        self._description_cache = None
         self._initialize_project(project_path)
 
     def _initialize_project(self, project_path: str):
         self.project_path = project_path
-        self.db_path = os.path.join(project_path, '.lttcdi', 'metadata.json')
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        if not os.path.exists(self.db_path):
-            with open(self.db_path, "w") as f:
-                f.write('{}')
-        self.db = TinyDB(self.db_path, storage=CachingMiddleware(JSONStorage))
+        self.meta_dir = os.path.join(project_path, '.lttcdi')
+        os.makedirs(self.meta_dir, exist_ok=True)
+        self.storage = self._open_storage()
+        self._load_records()
+        self.git_checksums = GitChecksums(project_path)
+        self.manifest = ProjectManifest(self)
+        self.search_index = LexicalSearchIndex(self)
+        self.symbol_index = SymbolIndex(self)
+        self.import_graph = ImportGraph(self)
+        self.token_counts = TokenCounts(self)
         self.available_models = self.llm_model.available_models if self.llm_model else []
         default_model = self.available_models[0] if self.available_models else None
         self.index_extensions = ['py']
         self.index_directories = []
         self.indexing_model = default_model
         self.hide_extensions = []
+        self.exclude_patterns = []
+        self.pack_token_budget = 0
+        self.watch_changes = False
         self.load_settings()
 
+    def _open_storage(self):
+        json_path = os.path.join(self.meta_dir, 'metadata.json')
+        if self.storage_backend == "tinydb":
+            self.db_path = json_path
+            return TinyDBMetaStorage(self.db_path)
+        self.db_path = os.path.join(self.meta_dir, 'metadata.sqlite')
+        if not os.path.exists(self.db_path) and os.path.exists(json_path):
+            self._migrate_json_metadata(json_path)
+        return SQLiteMetaStorage(self.db_path)
+
+    def _migrate_json_metadata(self, json_path: str):
+        """
+        Copies the metadata into a temporary database which replaces
+        metadata.sqlite only when complete, so an interrupted migration is
+        started again the next time the project is opened.
+        """
+        print(f"ProjectMeta: migrating {json_path} to {self.db_path}")
+        temp_path = self.db_path + '.migrating'
+        for path in (temp_path, temp_path + '-wal', temp_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        json_storage = TinyDBMetaStorage(json_path)
+        storage = SQLiteMetaStorage(temp_path)
+        try:
+            for table in json_storage.table_names():
+                storage.upsert_many(table, json_storage.all(table))
+        finally:
+            storage.close()
+            json_storage.close()
+        os.replace(temp_path, self.db_path)
+        os.replace(json_path, json_path + '.migrated')
+
     def set_project_path(self, project_path: str):
         print(f"ProjectMeta: switching project to {project_path}")
         try:
-            self.db.close()
+            self.storage.close()
         except Exception:
             pass
         self._initialize_project(project_path)
@@ -47,6 +117,17 @@ class ProjectMeta:
         return os.path.relpath(absolute_path, self.project_path)
 
     def calculate_checksum(self, relative_path: str) -> str:
+        """
+        Git blob id for projects inside a git repository (taken from the git
+        index for clean tracked files), MD5 of the content otherwise.
+        """
+        file_path = os.path.join(self.project_path, relative_path)
+        if self.git_checksums.is_available():
+            checksum = self.git_checksums.get_clean_checksum(relative_path, self._stat_file(relative_path))
+            return checksum or GitChecksums.blob_hash(file_path)
+        return self.calculate_md5(relative_path)
+
+    def calculate_md5(self, relative_path: str) -> str:
         file_path = os.path.join(self.project_path, relative_path)
         hash_md5 = hashlib.md5()
         with open(file_path, "rb") as f:
@@ -54,86 +135,418 @@ class ProjectMeta:
                 hash_md5.update(chunk)
         return hash_md5.hexdigest()
 
+    def _checksum_length(self) -> int:
+        """Length of the checksums calculate_checksum returns: SHA-1 blob id or MD5."""
+        return 40 if self.git_checksums.is_available() else 32
+
+    def _stat_file(self, relative_path: str) -> tuple:
+        st = os.stat(os.path.join(self.project_path, relative_path))
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def get_current_checksum(self, relative_path: str, record: DescriptionRecord = None) -> str:
+        """
+        Returns the checksum of the file. The file is read only when its
+        stat differs from the one stored in the record.
+        """
+        file_stat = self._stat_file(relative_path)
+        if record is not None and record.stat_matches(file_stat):
+            if len(record.checksum or "") == self._checksum_length():
+                return record.checksum
+            # Unchanged file recorded with another checksum kind - store the current kind once
+            record.checksum = self.calculate_checksum(relative_path)
+            self._save_record(record, flush=False)
+            return record.checksum
+        checksum = self.manifest.get_checksum(relative_path, file_stat)
+        if record is None:
+            return checksum
+        if record.checksum != checksum and len(record.checksum or "") != len(checksum):
+            # Record made with another checksum kind (MD5 before the project used git blob ids)
+            if record.checksum == self.calculate_md5(relative_path):
+                record.checksum = checksum
+            else:
+                return checksum
+        elif record.checksum != checksum:
+            return checksum
+        # Content is the same (e.g. the file was touched) - remember the new stat
+        record.set_stat(file_stat)
+        self._save_record(record, flush=False)
+        return checksum
+
+    def get_scanner(self) -> ProjectScanner:
+        return ProjectScanner(self.project_path, self.index_extensions, self.index_directories,
+                              self.exclude_patterns)
+
     def getAll_project_files(self) -> list:
-        project_files = []
-        if not self.index_directories:
-            for root, dirs, files in os.walk(self.project_path):
-                for file in files:
-                    if Path(file).suffix[1:] in self.index_extensions:
-                        full_path = os.path.join(root, file)
-                        project_files.append(self._get_relative_path(full_path))
-        else:
-            for rel_dir in self.index_directories:
-                abs_dir = os.path.join(self.project_path, rel_dir)
-                if os.path.isdir(abs_dir):
-                    for root, dirs, files in os.walk(abs_dir):
-                        for file in files:
-                            if Path(file).suffix[1:] in self.index_extensions:
-                                full_path = os.path.join(root, file)
-                                project_files.append(self._get_relative_path(full_path))
-        return project_files
+        return self.manifest.get_files()
+
+    def record_changes(self, relative_paths):
+        """Tells the manifest about files the application created, modified or deleted."""
+        self.manifest.record_changes(relative_paths)
+
+    def _load_records(self):
+        # In-memory index: relative path -> record
+        self._records = {}
+        for doc in self.storage.all(DESCRIPTIONS_TABLE):
+            record = DescriptionRecord(**doc)
+            self._records[record.file_path] = record
 
     def _get_existing_record(self, relative_path: str):
-        FileQuery = Query()
-        result = self.db.search(FileQuery.file_path == relative_path)
-        return DescriptionRecord(**result[0]) if result else None
+        return self._records.get(relative_path)
 
-    def compose_file_description(self, relative_path: str) -> str:
-        absolute_path = os.path.join(self.project_path, relative_path)
-        with open(absolute_path, "r", encoding="utf-8") as f:
-            file_content = f.read()
+    def _save_record(self, record: DescriptionRecord, flush: bool = True):
+        self.storage.upsert(DESCRIPTIONS_TABLE, record.to_dict())
+        self._records[record.file_path] = record
+        if flush:
+            self.storage.flush()
+
+    def get_description_cache(self):
+        """
+        Cache of descriptions shared by all projects (None when there is no
+        LLM model to generate descriptions with).
+        """
+        if not self.llm_model:
+            return None
+        if self._description_cache is None:
+            try:
+                self._description_cache = DescriptionCache()
+            except Exception as e:
+                print(f"ProjectMeta: description cache is not available: {e}")
+                return None
+        return self._description_cache
+
+    def apply_cached_descriptions(self, pending: list) -> tuple:
+        """
+        Stores descriptions found in the shared cache for the given
+        (relative_path, checksum, stat) items. Returns the applied paths and
+        the items which still need a description.
+        """
+        cache = self.get_description_cache()
+        if cache is None:
+            return [], pending
+        model_name = self.get_indexing_model_name()
+        applied = []
+        remaining = []
+        for rel_path, checksum, file_stat in pending:
+            description = cache.get(checksum, model_name)
+            if description is None:
+                remaining.append((rel_path, checksum, file_stat))
+                continue
+            record = DescriptionRecord(rel_path, checksum, description)
+            record.set_stat(file_stat)
+            self._save_record(record, flush=False)
+            applied.append(rel_path)
+        self.storage.flush()
+        return applied, remaining
+
+    def _store_in_description_cache(self, checksum: str, description: str, model_name: str = None):
+        cache = self.get_description_cache()
+        if cache is not None:
+            cache.put(checksum, model_name or self.get_indexing_model_name(), description)
+
+    def get_indexing_model_name(self):
+        return self.indexing_model or (self.available_models[0] if self.available_models else "gpt-4o-mini")
+
+    def get_indexing_semaphore(self):
+        """Concurrency limit of the indexing model's provider (None without a model)."""
+        if not self.llm_model:
+            return None
+        try:
+            provider = self.llm_model.get_provider_for_model(self.get_indexing_model_name())
+        except ValueError:
+            return None
+        return provider.getConcurrencySemaphore()
+
+    def ask_indexing_model(self, request_text: str) -> str:
+        semaphore = self.get_indexing_semaphore()
+        if semaphore is None:
+            response = self.llm_model.generate_simple_response_sync(self.get_indexing_model_name(), request_text, printRequest=False)
+        else:
+            with semaphore:
+                response = self.llm_model.generate_simple_response_sync(self.get_indexing_model_name(), request_text, printRequest=False)
+        if isinstance(response, tuple):
+            response, usage = response
+            if usage == "Error":
+                # Providers report failures as the response text
+                raise RuntimeError(response)
+        return response
+
+    def _read_file(self, relative_path: str) -> str:
+        with open(os.path.join(self.project_path, relative_path), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _build_description_request(self, relative_path: str, file_content: str = None) -> str:
+        if file_content is None:
+            file_content = self._read_file(relative_path)
         prompt = (
         "You are a code summarization assistant. A code file’s full text will be provided; analyze it and output **exactly one concise sentence** that captures the file’s primary responsibility or purpose.\n\n"
-        "  - Write in plain English—no JSON, no bullet lists, no quotes.\n"
-        "  - Do not explain your reasoning or add extra commentary—just the single sentence.\n"
-        "  - Do not mention framework.\n"
-        "  - Avoid common introduction phases, like \"This code\", \"This file\" and \"This script\". Straight to the point.\n\n"
-        " ----------------- \n"       
+        + DESCRIPTION_RULES +
+        " ----------------- \n"
         )
-        request_text = prompt + file_content
+        return prompt + file_content
+
+    def _build_packed_description_request(self, relative_paths: list) -> str:
+        prompt = (
+        "You are a code summarization assistant. The full text of several code files will be provided; for each file output **exactly one concise sentence** that captures the file’s primary responsibility or purpose.\n\n"
+        + DESCRIPTION_RULES +
+        "  - Output exactly one line per file in the format ***file_path***: sentence\n"
+        "  - Keep every file path exactly as given and describe every file.\n\n"
+        " ----------------- \n"
+        )
+        parts = [prompt]
+        for relative_path in relative_paths:
+            parts.append(f"***{relative_path}***\n```\n{self._read_file(relative_path)}\n```\n")
+        return "\n".join(parts)
+
+    @staticmethod
+    def _parse_packed_descriptions(response: str, relative_paths: list) -> dict:
+        # A header without text (e.g. the model echoed the file) gives no description
+        expected = set(relative_paths)
+        descriptions = {}
+        for line in response.splitlines():
+            match = PACKED_DESCRIPTION_LINE.match(line)
+            if not match:
+                continue
+            path = match.group(1).strip()
+            description = match.group(2).strip()
+            if path in expected and description and path not in descriptions:
+                descriptions[path] = description
+        return descriptions
+
+    def compose_packed_descriptions(self, relative_paths: list) -> dict:
+        """
+        Describes several small files with a single request. Returns
+        {relative_path: description} for the files found in the answer.
+        """
+        if not self.llm_model:
+            return {relative_path: f"Description for {relative_path}" for relative_path in relative_paths}
+        response = self.ask_indexing_model(self._build_packed_description_request(relative_paths))
+        return self._parse_packed_descriptions(response, relative_paths)
+
+    def pack_files_for_indexing(self, pending: list) -> list:
+        """
+        Groups (relative_path, checksum, stat) items into packs whose
+        estimated size fits pack_token_budget. Every item is a pack of its
+        own when packing is disabled.
+        """
+        if not self.pack_token_budget or self.pack_token_budget <= 0:
+            return [[item] for item in pending]
+        packs = []
+        current = []
+        current_tokens = 0
+        for item in sorted(pending, key=lambda entry: entry[0]):
+            _mtime, size, _inode = item[2]
+            tokens = size // BYTES_PER_TOKEN + 1
+            if tokens > self.pack_token_budget // 2:
+                packs.append([item])
+                continue
+            if current and (current_tokens + tokens > self.pack_token_budget or len(current) >= MAX_FILES_PER_PACK):
+                packs.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    def compose_file_description(self, relative_path: str) -> str:
+        file_content = self._read_file(relative_path)
         if not self.llm_model:
             return f"Description for {relative_path}"
-        model_name = self.indexing_model or (self.available_models[0] if self.available_models else "gpt-4o-mini")
-        response = self.llm_model.generate_simple_response_sync(model_name, request_text, printRequest=False)
-        if isinstance(response, tuple):
-            description, _ = response
-        else:
-            description = response
-        return description
+        if len(file_content) // BYTES_PER_TOKEN > MAX_DESCRIPTION_FILE_TOKENS:
+            summarizer = ChunkSummarizer(self, CHUNK_TOKENS, BYTES_PER_TOKEN)
+            return summarizer.describe(relative_path, file_content, DESCRIPTION_RULES)
+        return self.ask_indexing_model(self._build_description_request(relative_path, file_content))
+
+    def update_descriptions(self, progress_callback=None, cancel_event=None, resume_event=None, files=None) -> dict:
+        indexer = DescriptionIndexer(self)
+        if files is None:
+            files = self.getAll_project_files()
+        return indexer.run(files, force=False, progress_callback=progress_callback,
+                           cancel_event=cancel_event, resume_event=resume_event)
+
+    def force_update_descriptions(self, progress_callback=None, cancel_event=None, resume_event=None, files=None) -> dict:
+        indexer = DescriptionIndexer(self)
+        if files is None:
+            files = self.getAll_project_files()
+        return indexer.run(files, force=True, progress_callback=progress_callback,
+                           cancel_event=cancel_event, resume_event=resume_event)
 
-    def update_descriptions(self):
-        files = self.getAll_project_files()
+    def get_files_to_index(self, files=None, force: bool = False) -> list:
+        """
+        Returns (relative_path, checksum, stat) of new and outdated files
+        (of all files when `force` is set).
+        """
+        if files is None:
+            files = self.getAll_project_files()
+        pending = []
         for rel_path in files:
-            current_checksum = self.calculate_checksum(rel_path)
+            file_stat = self._stat_file(rel_path)
             existing = self._get_existing_record(rel_path)
-            if not existing or existing.checksum != current_checksum:
-                new_description = self.compose_file_description(rel_path)
-                print(f"{rel_path}: {new_description}\n")
-                record = DescriptionRecord(rel_path, current_checksum, new_description)
-                self.db.upsert(record.to_dict(), Query().file_path == rel_path)
-        self.db.storage.flush()
-
-    def force_update_descriptions(self):
-        files = self.getAll_project_files()
-        for rel_path in files:
-            current_checksum = self.calculate_checksum(rel_path)
-            new_description = self.compose_file_description(rel_path)
-            print(f"{rel_path}: {new_description}\n")
-            record = DescriptionRecord(rel_path, current_checksum, new_description)
-            self.db.upsert(record.to_dict(), Query().file_path == rel_path)
-        self.db.storage.flush()
+            current_checksum = self.get_current_checksum(rel_path, existing)
+            if not force and existing and existing.checksum == current_checksum:
+                continue
+            pending.append((rel_path, current_checksum, file_stat))
+        self.storage.flush()
+        return pending
+
+    def submit_batch_indexing(self, description: str = "Index all via batch") -> dict:
+        """
+        Sends description requests of all new and outdated files as a single
+        batch job of the indexing model's provider. The job is kept in the
+        project metadata until apply_batch_indexing_results applies it.
+        Returns the job, None when every description is up to date, or
+        {"status": "unsupported", "model": ...} when the indexing model has
+        no batch API.
+        """
+        if not self.llm_model:
+            raise ValueError("No LLM model configured")
+        model_name = self.get_indexing_model_name()
+        provider = self.llm_model.get_provider_for_model(model_name)
+        if not provider.getModelOptions(model_name).supportBatch:
+            print(f"ProjectMeta: model {model_name} does not support batch requests, no batch created")
+            return {"status": "unsupported", "model": model_name}
+        cached, pending = self.apply_cached_descriptions(self.get_files_to_index())
+        if cached:
+            print(f"ProjectMeta: {len(cached)} descriptions taken from the description cache")
+        if not pending:
+            print("ProjectMeta: all descriptions are up to date, no batch created")
+            return None
+        requests = {}
+        files = {}
+        for i, (rel_path, checksum, file_stat) in enumerate(pending):
+            custom_id = f"file-{i}"
+            requests[custom_id] = self._build_description_request(rel_path)
+            mtime, size, inode = file_stat
+            files[custom_id] = {
+                "file_path": rel_path,
+                "checksum": checksum,
+                "mtime": mtime,
+                "size": size,
+                "inode": inode
+            }
+        batch_id = provider.submit_requests_batch(model_name, requests, description)
+        job = {
+            "batch_id": batch_id,
+            "model": model_name,
+            "status": "pending",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "files": files
+        }
+        self.storage.upsert(INDEX_BATCHES_TABLE, job)
+        self.storage.flush()
+        print(f"ProjectMeta: batch {batch_id} submitted for {len(files)} files")
+        return job
+
+    def get_batch_indexing_jobs(self, status: str = None) -> list:
+        jobs = self.storage.all(INDEX_BATCHES_TABLE)
+        return [job for job in jobs if status is None or job.get("status") == status]
+
+    def apply_batch_indexing_results(self) -> dict:
+        """
+        Checks pending batch jobs and stores the descriptions of finished
+        ones. Files changed after the job was submitted are left outdated.
+        A finished batch is not checked again: it is marked "applied", or
+        "partial" when some requests got no answer (errored or expired).
+        Their files stay outdated and are indexed by the next run.
+        """
+        stats = {'applied_files': [], 'stale_files': [], 'failed_files': [], 'running_jobs': [],
+                 'failed_jobs': [], 'unsupported_jobs': []}
+        if not self.llm_model:
+            return stats
+        for job in self.get_batch_indexing_jobs(status="pending"):
+            batch_id = job["batch_id"]
+            try:
+                provider = self.llm_model.get_provider_for_model(job["model"])
+                if not provider.getModelOptions(job["model"]).supportBatch:
+                    stats['unsupported_jobs'].append(batch_id)
+                    continue
+                results = provider.get_requests_batch_results(job["model"], batch_id)
+            except Exception as e:
+                print(f"ProjectMeta: batch {batch_id} failed: {e}")
+                job["status"] = "failed"
+                self.storage.upsert(INDEX_BATCHES_TABLE, job)
+                stats['failed_jobs'].append(batch_id)
+                continue
+            if results is None:
+                stats['running_jobs'].append(batch_id)
+                continue
+            unanswered = False
+            for custom_id, info in job["files"].items():
+                rel_path = info["file_path"]
+                description = (results.get(custom_id) or "").strip()
+                if not description:
+                    unanswered = True
+                    stats['failed_files'].append(rel_path)
+                    continue
+                if not os.path.exists(os.path.join(self.project_path, rel_path)):
+                    continue
+                existing = self._get_existing_record(rel_path)
+                if self.get_current_checksum(rel_path, existing) != info["checksum"]:
+                    stats['stale_files'].append(rel_path)
+                    continue
+                record = DescriptionRecord(rel_path, info["checksum"], description,
+                                           info["mtime"], info["size"], info["inode"])
+                self._save_record(record, flush=False)
+                self._store_in_description_cache(record.checksum, record.description, job["model"])
+                stats['applied_files'].append(rel_path)
+            job["status"] = "partial" if unanswered else "applied"
+            self.storage.upsert(INDEX_BATCHES_TABLE, job)
+        self.storage.flush()
+        print(f"ProjectMeta: applied {len(stats['applied_files'])} descriptions, "
+              f"{len(stats['stale_files'])} stale, {len(stats['failed_files'])} without an answer, "
+              f"{len(stats['running_jobs'])} jobs still running")
+        return stats
 
     def update_description(self, relative_path: str):
+        file_stat = self._stat_file(relative_path)
         current_checksum = self.calculate_checksum(relative_path)
         new_description = self.compose_file_description(relative_path)
         print(f"{relative_path}: {new_description}\n")
         record = DescriptionRecord(relative_path, current_checksum, new_description)
-        self.db.upsert(record.to_dict(), Query().file_path == relative_path)
-        self.db.storage.flush()
+        record.set_stat(file_stat)
+        self._save_record(record)
+        self._store_in_description_cache(current_checksum, new_description)
+
+    def update_directory_summaries(self, progress_callback=None, cancel_event=None) -> dict:
+        return DirectorySummaries(self).update(progress_callback=progress_callback, cancel_event=cancel_event)
+
+    def compose_project_map(self) -> str:
+        return DirectorySummaries(self).compose_project_map()
+
+    def search_files(self, query: str, top_k: int = 20) -> list:
+        return self.search_index.search(query, top_k)
+
+    def suggest_files(self, query: str, token_budget: int, max_files: int) -> list:
+        """Files most relevant to the request text that fit into token_budget."""
+        return self.search_index.suggest(query, token_budget, max_files, BYTES_PER_TOKEN)
+
+    def get_file_symbols(self, relative_path: str) -> list:
+        """Symbols of a Python file (see SymbolIndex), empty for other files."""
+        entry = self.symbol_index.get(relative_path)
+        return entry['symbols'] if entry else []
+
+    def expand_with_imports(self, files, hops: int, token_budget: int) -> list:
+        """Python files imported by or importing the given files (see ImportGraph.expand)."""
+        return self.import_graph.expand(files, hops, token_budget, BYTES_PER_TOKEN)
+
+    def get_file_checksums(self, relative_paths) -> dict:
+        """Returns {relative path: checksum} of the files which can be read."""
+        checksums = {}
+        for rel_path in relative_paths:
+            try:
+                checksums[rel_path] = self.get_current_checksum(rel_path, self._get_existing_record(rel_path))
+            except OSError:
+                continue
+        return checksums
+
+    def get_token_counts(self, relative_paths) -> dict:
+        """{relative path: (estimated tokens, lines)}, cached by file checksum."""
+        return self.token_counts.get_many(relative_paths)
 
     def stat_descriptions(self) -> dict:
         files_in_project = set(self.getAll_project_files())
-        db_records = {rec['file_path']: rec for rec in self.db.all()}
+        db_records = self._records
         stats = {
             'total_files': len(files_in_project),
             'new_files': [],
@@ -141,14 +554,14 @@ class ProjectMeta:
             'up_to_date_files': []
         }
         for rel_path in files_in_project:
-            current_checksum = self.calculate_checksum(rel_path)
             db_record = db_records.get(rel_path)
             if not db_record:
                 stats['new_files'].append(rel_path)
-            elif db_record['checksum'] != current_checksum:
+            elif db_record.checksum != self.get_current_checksum(rel_path, db_record):
                 stats['outdated_files'].append(rel_path)
             else:
                 stats['up_to_date_files'].append(rel_path)
+        self.storage.flush()
         print(f"Project Description Statistics:")
         print(f"Total files: {stats['total_files']}")
         print(f"New files: {len(stats['new_files'])}")
@@ -157,38 +570,55 @@ class ProjectMeta:
         return stats
 
     def load_settings(self):
-        settings_table = self.db.table('settings')
-        settings = settings_table.get(Query().id == "project_settings")
+        settings = self.storage.get(SETTINGS_TABLE, "project_settings")
         default_model = self.available_models[0] if self.available_models else None
         if settings:
             self.index_extensions = settings.get("index_extensions", self.index_extensions)
             self.index_directories = settings.get("index_directories", self.index_directories)
             self.indexing_model = settings.get("indexing_model", default_model)
             self.hide_extensions = settings.get("hide_extensions", self.hide_extensions) or []
+            self.exclude_patterns = settings.get("exclude_patterns", self.exclude_patterns) or []
+            self.pack_token_budget = settings.get("pack_token_budget", self.pack_token_budget) or 0
+            self.watch_changes = settings.get("watch_changes", False)
         else:
             if self.index_directories is None:
                 self.index_directories = []
             self.indexing_model = default_model
             self.hide_extensions = []
+            self.exclude_patterns = []
+            self.pack_token_budget = 0
+            self.watch_changes = False
         return self.index_extensions, self.index_directories
 
-    def save_settings(self, index_extensions, index_directories, indexing_model, hide_extensions):
+    def save_settings(self, index_extensions, index_directories, indexing_model, hide_extensions, exclude_patterns=None,
+                      pack_token_budget=None, watch_changes=None):
+        if exclude_patterns is None:
+            exclude_patterns = self.exclude_patterns
+        if pack_token_budget is None:
+            pack_token_budget = self.pack_token_budget
+        if watch_changes is None:
+            watch_changes = self.watch_changes
         self.index_extensions = index_extensions
         self.index_directories = index_directories
         self.indexing_model = indexing_model
         self.hide_extensions = hide_extensions
-        settings_table = self.db.table('settings')
-        settings_table.upsert(
+        self.exclude_patterns = exclude_patterns
+        self.pack_token_budget = pack_token_budget
+        self.watch_changes = watch_changes
+        self.storage.upsert(
+            SETTINGS_TABLE,
             {
                 "id": "project_settings",
                 "index_extensions": index_extensions,
                 "index_directories": index_directories,
                 "indexing_model": indexing_model,
-                "hide_extensions": hide_extensions
-            },
-            Query().id == "project_settings"
+                "hide_extensions": hide_extensions,
+                "exclude_patterns": exclude_patterns,
+                "pack_token_budget": pack_token_budget,
+                "watch_changes": watch_changes
+            }
         )
-        self.db.storage.flush()
+        self.storage.flush()
 
     def getFileDescription(self, relative_path: str):
         existing = self._get_existing_record(relative_path)
@@ -198,7 +628,7 @@ class ProjectMeta:
         existing = self._get_existing_record(relative_path)
         if not existing:
             return FileStatus.NotIndexed
-        current_checksum = self.calculate_checksum(relative_path)
+        current_checksum = self.get_current_checksum(relative_path, existing)
         if existing.checksum == current_checksum:
             return FileStatus.Indexed
         return FileStatus.Outdated
@@ -208,3 +638,6 @@ class ProjectMeta:
 
     def getHiddenExtensions(self) -> list:
         return self.hide_extensions
+
+    def getExcludePatterns(self) -> list:
+        return self.exclude_patterns
@@ -0,0 +1,270 @@
+import os
+import re
+
+
+class GitIgnoreRules:
+    """
+    Patterns of one .gitignore file (or of the project exclude list), matched
+    against paths relative to the directory the patterns belong to.
+    """
+
+    def __init__(self, base_dir: str, lines):
+        self.base_dir = base_dir
+        self.rules = []
+        for line in lines:
+            rule = self._parse_line(line)
+            if rule:
+                self.rules.append(rule)
+
+    @staticmethod
+    def _parse_line(line):
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            return None
+        negate = False
+        if line.startswith("!"):
+            negate = True
+            line = line[1:]
+        elif line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        # A leading or inner slash anchors the pattern to the .gitignore directory
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if not line:
+            return None
+        regex = GitIgnoreRules._translate(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        return re.compile("^" + regex + "$"), negate, dir_only
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        i = 0
+        result = []
+        while i < len(pattern):
+            c = pattern[i]
+            if pattern.startswith("**/", i):
+                result.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+                result.append("/.*")
+                i += 3
+            elif pattern.startswith("**", i):
+                result.append(".*")
+                i += 2
+            elif c == "*":
+                result.append("[^/]*")
+                i += 1
+            elif c == "?":
+                result.append("[^/]")
+                i += 1
+            elif c == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    result.append(re.escape(c))
+                    i += 1
+                else:
+                    chars = pattern[i + 1:end]
+                    if chars.startswith("!"):
+                        chars = "^" + chars[1:]
+                    result.append("[" + chars + "]")
+                    i = end + 1
+            else:
+                result.append(re.escape(c))
+                i += 1
+        return "".join(result)
+
+    def match(self, rel_path: str, is_dir: bool):
+        """
+        Returns True (ignored), False (re-included by a negated pattern) or
+        None when no pattern matches. `rel_path` is relative to the project.
+        """
+        if self.base_dir:
+            rel_path = rel_path[len(self.base_dir) + 1:]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+class ProjectScanner:
+    """
+    Lists project files using os.scandir. Ignored directories (VCS and
+    caches, default patterns, .gitignore and project exclude patterns) are
+    pruned before descending into them, binary files are skipped. The index
+    directories and the directories above them are never ignored.
+    """
+    DEFAULT_EXCLUDED_DIRS = {
+        '.git', '.hg', '.svn', '.lttcdi', '__pycache__', '.tox', '.nox',
+        '.mypy_cache', '.pytest_cache', '.ruff_cache',
+    }
+    # Checked before .gitignore and the exclude patterns, which can re-include them;
+    # build output (build/, dist/) is left to them
+    DEFAULT_EXCLUDE_PATTERNS = ['node_modules/', 'venv/', '.venv/', '.eggs/', '.idea/', '.vscode/']
+    BINARY_EXTENSIONS = {
+        'png', 'jpg', 'jpeg', 'gif', 'bmp', 'ico', 'webp', 'pdf', 'zip', 'gz',
+        'tgz', 'bz2', 'xz', '7z', 'rar', 'jar', 'so', 'dll', 'dylib', 'exe',
+        'o', 'a', 'lib', 'pyc', 'pyo', 'class', 'bin', 'dat', 'db', 'sqlite',
+        'mp3', 'mp4', 'wav', 'avi', 'mov', 'ttf', 'otf', 'woff', 'woff2',
+    }
+    # Extensions which are never sniffed for binary content
+    TEXT_EXTENSIONS = {
+        'py', 'pyi', 'c', 'h', 'cpp', 'hpp', 'cc', 'cs', 'java', 'kt', 'js',
+        'jsx', 'ts', 'tsx', 'php', 'rb', 'go', 'rs', 'm', 'swift', 'scala',
+        'sh', 'bash', 'md', 'rst', 'txt', 'json', 'yaml', 'yml', 'toml', 'ini',
+        'cfg', 'xml', 'html', 'htm', 'css', 'scss', 'sql', 'desktop', 'cmake',
+    }
+    SNIFF_SIZE = 1024
+
+    def __init__(self, project_path: str, index_extensions=None, index_directories=None,
+                 exclude_patterns=None, use_gitignore: bool = True):
+        self.project_path = project_path
+        # None indexes files of every extension, an empty list none
+        self.index_extensions = set(index_extensions) if index_extensions is not None else None
+        self.index_directories = index_directories or []
+        self._listed_directories = [
+            rel_dir for rel_dir in (os.path.normpath(d).strip(os.sep) for d in self.index_directories)
+            if rel_dir not in ("", ".")
+        ]
+        self.use_gitignore = use_gitignore
+        self._default_rules = GitIgnoreRules("", self.DEFAULT_EXCLUDE_PATTERNS)
+        self._exclude_rules = GitIgnoreRules("", exclude_patterns or [])
+        # rel_dir -> list of GitIgnoreRules applying inside that directory
+        self._rules_cache = {}
+        # Directories listed by scan_directory (not ignored ones)
+        self.visited_directories = set()
+
+    def _load_gitignore(self, rel_dir: str):
+        if not self.use_gitignore:
+            return None
+        path = os.path.join(self.project_path, rel_dir, '.gitignore')
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return GitIgnoreRules(rel_dir, f.readlines())
+        except OSError:
+            return None
+
+    def _rules_for_dir(self, rel_dir: str) -> list:
+        rules = self._rules_cache.get(rel_dir)
+        if rules is not None:
+            return rules
+        if rel_dir:
+            rules = list(self._rules_for_dir(os.path.dirname(rel_dir)))
+        else:
+            rules = [self._default_rules]
+        own_rules = self._load_gitignore(rel_dir)
+        if own_rules:
+            rules.append(own_rules)
+        if not rel_dir and self._exclude_rules.rules:
+            rules.append(self._exclude_rules)
+        self._rules_cache[rel_dir] = rules
+        return rules
+
+    def _is_listed_directory(self, rel_dir: str) -> bool:
+        """True for an index directory listed by the user and the directories above it."""
+        return any(listed == rel_dir or listed.startswith(rel_dir + os.sep) for listed in self._listed_directories)
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        name = os.path.basename(rel_path)
+        if is_dir and self._is_listed_directory(rel_path):
+            return False
+        if is_dir and name in self.DEFAULT_EXCLUDED_DIRS:
+            return True
+        ignored = False
+        for rules in self._rules_for_dir(os.path.dirname(rel_path)):
+            result = rules.match(rel_path, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
+
+    def _is_binary(self, abs_path: str, extension: str) -> bool:
+        if extension in self.BINARY_EXTENSIONS:
+            return True
+        if extension in self.TEXT_EXTENSIONS:
+            return False
+        try:
+            with open(abs_path, "rb") as f:
+                return b"\0" in f.read(self.SNIFF_SIZE)
+        except OSError:
+            return True
+
+    def in_index_directories(self, rel_path: str) -> bool:
+        if not self.index_directories:
+            return True
+        for rel_dir in self.index_directories:
+            rel_dir = os.path.normpath(rel_dir).strip(os.sep)
+            if rel_dir in ("", ".") or rel_path == rel_dir or rel_path.startswith(rel_dir + os.sep):
+                return True
+        return False
+
+    def accepts_file(self, rel_path: str) -> bool:
+        """
+        Checks a single file against the index directories, the extension
+        filter, the ignore rules and the binary check (used for incremental
+        updates).
+        """
+        extension = os.path.splitext(rel_path)[1][1:]
+        if self.index_extensions is not None and extension not in self.index_extensions:
+            return False
+        if not self.in_index_directories(rel_path):
+            return False
+        parent = os.path.dirname(rel_path)
+        while parent:
+            if self.is_ignored(parent, True):
+                return False
+            parent = os.path.dirname(parent)
+        if self.is_ignored(rel_path, False):
+            return False
+        return not self._is_binary(os.path.join(self.project_path, rel_path), extension)
+
+    def scan_directory(self, rel_dir: str = "", recursive: bool = True):
+        """
+        Yields relative paths of accepted files in `rel_dir`. Subdirectories
+        are visited only when `recursive` is set.
+        """
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = os.scandir(os.path.join(self.project_path, current))
+            except OSError:
+                continue
+            self.visited_directories.add(current)
+            with entries:
+                for entry in entries:
+                    rel_path = os.path.join(current, entry.name) if current else entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if not is_dir and not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if recursive and not self.is_ignored(rel_path, True):
+                            stack.append(rel_path)
+                        continue
+                    extension = os.path.splitext(entry.name)[1][1:]
+                    if self.index_extensions is not None and extension not in self.index_extensions:
+                        continue
+                    if self.is_ignored(rel_path, False):
+                        continue
+                    if self._is_binary(entry.path, extension):
+                        continue
+                    yield rel_path
+
+    def scan(self) -> list:
+        if not self.index_directories:
+            return list(self.scan_directory(""))
+        files = []
+        for rel_dir in self.index_directories:
+            rel_dir = os.path.normpath(rel_dir).strip(os.sep)
+            if rel_dir in ("", "."):
+                files.extend(self.scan_directory(""))
+            elif os.path.isdir(os.path.join(self.project_path, rel_dir)):
+                files.extend(self.scan_directory(rel_dir))
+        return files
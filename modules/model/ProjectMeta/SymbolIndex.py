@@ -0,0 +1,155 @@
+import ast
+import os
+import threading
+
+from .storage.MetaStorageBase import SYMBOLS_TABLE
+
+MAX_DOCSTRING_LENGTH = 200
+MAX_VALUE_LENGTH = 80
+
+
+class SymbolIndex:
+    """
+    Classes, functions, methods and module variables of Python files with
+    their signatures, docstrings and line ranges. Symbols are parsed with
+    ast and stored per file with the checksum they were parsed from.
+    """
+    SUPPORTED_EXTENSIONS = ('.py', '.pyi')
+
+    def __init__(self, project_meta):
+        self.project_meta = project_meta
+        self.lock = threading.Lock()
+        self._entries = {}
+
+    @classmethod
+    def supports(cls, relative_path: str) -> bool:
+        return relative_path.endswith(cls.SUPPORTED_EXTENSIONS)
+
+    @staticmethod
+    def _docstring(node) -> str:
+        docstring = ast.get_docstring(node) or ""
+        docstring = docstring.strip().split("\n\n")[0].replace("\n", " ")
+        if len(docstring) > MAX_DOCSTRING_LENGTH:
+            docstring = docstring[:MAX_DOCSTRING_LENGTH - 3] + "..."
+        return docstring
+
+    @staticmethod
+    def _start_line(node) -> int:
+        return min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])])
+
+    def _collect(self, nodes, parent, symbols):
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+                signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+                if node.returns is not None:
+                    signature += f" -> {ast.unparse(node.returns)}"
+                symbols.append({
+                    'name': f"{parent}.{node.name}" if parent else node.name,
+                    'kind': "method" if parent else "function",
+                    'signature': signature,
+                    'docstring': self._docstring(node),
+                    'start': self._start_line(node),
+                    'end': node.end_lineno
+                })
+            elif isinstance(node, ast.ClassDef):
+                bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(keyword) for keyword in node.keywords]
+                name = f"{parent}.{node.name}" if parent else node.name
+                symbols.append({
+                    'name': name,
+                    'kind': "class",
+                    'signature': f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}",
+                    'docstring': self._docstring(node),
+                    'start': self._start_line(node),
+                    'end': node.end_lineno
+                })
+                self._collect(node.body, name, symbols)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and not parent:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                signature = ast.unparse(node).split("\n")[0]
+                if len(signature) > MAX_VALUE_LENGTH:
+                    signature = signature[:MAX_VALUE_LENGTH - 3] + "..."
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        symbols.append({
+                            'name': target.id,
+                            'kind': "variable",
+                            'signature': signature,
+                            'docstring': "",
+                            'start': node.lineno,
+                            'end': node.end_lineno
+                        })
+
+    def parse(self, text: str) -> dict:
+        tree = ast.parse(text)
+        symbols = []
+        self._collect(tree.body, None, symbols)
+        return {'docstring': self._docstring(tree), 'symbols': symbols}
+
+    def get(self, relative_path: str):
+        """Symbols of the file or None when it is not a (valid) Python file."""
+        if not self.supports(relative_path):
+            return None
+        record = self.project_meta._get_existing_record(relative_path)
+        try:
+            checksum = self.project_meta.get_current_checksum(relative_path, record)
+        except OSError:
+            return None
+        storage = self.project_meta.storage
+        with self.lock:
+            entry = self._entries.get(relative_path) or storage.get(SYMBOLS_TABLE, relative_path)
+            if entry and entry['checksum'] == checksum:
+                self._entries[relative_path] = entry
+                return entry
+        try:
+            with open(os.path.join(self.project_meta.project_path, relative_path), "r", encoding="utf-8",
+                      errors="replace") as f:
+                parsed = self.parse(f.read())
+        except (OSError, SyntaxError, ValueError) as e:
+            print(f"SymbolIndex: can not parse {relative_path}: {e}")
+            return None
+        entry = {'file_path': relative_path, 'checksum': checksum, **parsed}
+        with self.lock:
+            self._entries[relative_path] = entry
+            storage.upsert(SYMBOLS_TABLE, entry)
+            storage.flush()
+        return entry
+
+    def format_outline(self, relative_path: str):
+        """Python-like stub of the file: signatures and docstrings without bodies."""
+        entry = self.get(relative_path)
+        if entry is None:
+            return None
+        lines = []
+        if entry['docstring']:
+            lines.append(f'"""{entry["docstring"]}"""')
+        for symbol in entry['symbols']:
+            depth = symbol['name'].count(".")
+            indent = "    " * depth
+            if symbol['kind'] == "variable":
+                lines.append(f"{symbol['signature']}  # line {symbol['start']}")
+                continue
+            suffix = ":" if symbol['kind'] == "class" else ": ..."
+            lines.append(f"{indent}{symbol['signature']}{suffix}  # lines {symbol['start']}-{symbol['end']}")
+            if symbol['docstring']:
+                lines.append(f'{indent}    """{symbol["docstring"]}"""')
+        return "\n".join(lines)
+
+    def format_symbols(self, relative_path: str, names) -> str:
+        """Source of the given symbols (a class includes its methods) with their line ranges."""
+        entry = self.get(relative_path)
+        if entry is None:
+            return None
+        with open(os.path.join(self.project_meta.project_path, relative_path), "r", encoding="utf-8",
+                  errors="replace") as f:
+            file_lines = f.read().splitlines()
+        parts = []
+        covered_until = 0
+        wanted = [symbol for symbol in entry['symbols'] if symbol['name'] in set(names)]
+        for symbol in sorted(wanted, key=lambda s: s['start']):
+            if symbol['end'] <= covered_until:
+                continue
+            parts.append(f"# lines {symbol['start']}-{symbol['end']}")
+            parts.append("\n".join(file_lines[symbol['start'] - 1:symbol['end']]))
+            covered_until = symbol['end']
+        return "\n".join(parts)
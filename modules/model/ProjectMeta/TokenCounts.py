@@ -0,0 +1,80 @@
+import math
+import os
+import re
+import threading
+
+from .storage.MetaStorageBase import TOKEN_COUNTS_TABLE
+
+# Local approximation of BPE tokenizers: letter runs are split into ~5
+# character tokens, digit runs into ~3, punctuation runs into pairs, a line
+# break with the indentation after it is one token and every non-ASCII
+# character is a token of its own. It errs on the high side for code.
+TOKEN_PIECE_PATTERN = re.compile(r"[A-Za-z]+|[0-9]+|[!-/:-@\[-`{-~]+|\s*\n[ \t]*|[^\x00-\x7f]")
+
+
+def estimate_tokens(text: str) -> int:
+    tokens = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            tokens += math.ceil(len(piece) / 5)
+        elif first.isascii() and first.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif first.isascii() and not first.isspace():
+            tokens += math.ceil(len(piece) / 2)
+        else:
+            tokens += 1
+    return tokens
+
+
+class TokenCounts:
+    """Estimated tokens and line counts of project files, stored with the checksum they were counted from."""
+
+    def __init__(self, project_meta):
+        self.project_meta = project_meta
+        self.lock = threading.Lock()
+        self._entries = None
+
+    def _count(self, relative_path: str):
+        record = self.project_meta._get_existing_record(relative_path)
+        try:
+            checksum = self.project_meta.get_current_checksum(relative_path, record)
+        except OSError:
+            return None, False
+        entry = self._entries.get(relative_path)
+        if entry and entry['checksum'] == checksum:
+            return entry, False
+        try:
+            with open(os.path.join(self.project_meta.project_path, relative_path), "r", encoding="utf-8",
+                      errors="replace") as f:
+                content = f.read()
+        except OSError:
+            return None, False
+        entry = {
+            'file_path': relative_path,
+            'checksum': checksum,
+            'tokens': estimate_tokens(content),
+            'lines': content.count("\n") + 1
+        }
+        self._entries[relative_path] = entry
+        return entry, True
+
+    def get_many(self, relative_paths) -> dict:
+        """Returns {relative path: (tokens, lines)} of the files which can be read."""
+        storage = self.project_meta.storage
+        counts = {}
+        updated = []
+        with self.lock:
+            if self._entries is None:
+                self._entries = {doc['file_path']: doc for doc in storage.all(TOKEN_COUNTS_TABLE)}
+            for rel_path in relative_paths:
+                entry, changed = self._count(rel_path)
+                if entry is None:
+                    continue
+                counts[rel_path] = (entry['tokens'], entry['lines'])
+                if changed:
+                    updated.append(entry)
+            if updated:
+                storage.upsert_many(TOKEN_COUNTS_TABLE, updated)
+                storage.flush()
+        return counts
@@ -1,12 +1,27 @@
 class DescriptionRecord:
-    def __init__(self, file_path: str, checksum: str, description: str):
+    def __init__(self, file_path: str, checksum: str, description: str, mtime=None, size=None, inode=None):
         self.file_path = file_path
         self.checksum = checksum
         self.description = description
+        # File stat at the moment the checksum was calculated
+        self.mtime = mtime
+        self.size = size
+        self.inode = inode
+
+    def set_stat(self, file_stat):
+        self.mtime, self.size, self.inode = file_stat
+
+    def stat_matches(self, file_stat) -> bool:
+        if self.mtime is None:
+            return False
+        return (self.mtime, self.size, self.inode) == tuple(file_stat)
 
     def to_dict(self):
         return {
             'file_path': self.file_path,
             'checksum': self.checksum,
-            'description': self.description
+            'description': self.description,
+            'mtime': self.mtime,
+            'size': self.size,
+            'inode': self.inode
         }
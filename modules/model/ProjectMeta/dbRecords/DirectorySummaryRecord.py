@@ -0,0 +1,13 @@
+class DirectorySummaryRecord:
+    def __init__(self, directory: str, signature: str, summary: str):
+        self.directory = directory
+        # Hash of the checksums of the descriptions and summaries the summary was built from
+        self.signature = signature
+        self.summary = summary
+
+    def to_dict(self):
+        return {
+            'directory': self.directory,
+            'signature': self.signature,
+            'summary': self.summary
+        }
@@ -0,0 +1,67 @@
+from abc import ABC, abstractmethod
+
+DESCRIPTIONS_TABLE = "descriptions"
+SETTINGS_TABLE = "settings"
+INDEX_BATCHES_TABLE = "index_batches"
+DIRECTORY_SUMMARIES_TABLE = "directory_summaries"
+MANIFEST_TABLE = "manifest"
+MANIFEST_DIRS_TABLE = "manifest_dirs"
+MANIFEST_JOURNAL_TABLE = "manifest_journal"
+SEARCH_TERMS_TABLE = "search_terms"
+SYMBOLS_TABLE = "symbols"
+IMPORTS_TABLE = "imports"
+TOKEN_COUNTS_TABLE = "token_counts"
+
+# Field used as the unique key of the documents of each table
+TABLE_KEYS = {
+    DESCRIPTIONS_TABLE: "file_path",
+    SETTINGS_TABLE: "id",
+    INDEX_BATCHES_TABLE: "batch_id",
+    DIRECTORY_SUMMARIES_TABLE: "directory",
+    MANIFEST_TABLE: "file_path",
+    MANIFEST_DIRS_TABLE: "directory",
+    MANIFEST_JOURNAL_TABLE: "file_path",
+    SEARCH_TERMS_TABLE: "file_path",
+    SYMBOLS_TABLE: "file_path",
+    IMPORTS_TABLE: "file_path",
+    TOKEN_COUNTS_TABLE: "file_path",
+}
+
+
+def key_field(table: str) -> str:
+    return TABLE_KEYS.get(table, "key")
+
+
+class MetaStorageBase(ABC):
+    """
+    Key-value document storage of the project metadata. Every table keeps
+    dict documents identified by the value of their key_field(table).
+    """
+
+    @abstractmethod
+    def all(self, table: str) -> list:
+        pass
+
+    @abstractmethod
+    def get(self, table: str, key: str):
+        pass
+
+    @abstractmethod
+    def upsert(self, table: str, document: dict):
+        pass
+
+    def upsert_many(self, table: str, documents: list):
+        for document in documents:
+            self.upsert(table, document)
+
+    @abstractmethod
+    def remove(self, table: str, key: str):
+        pass
+
+    @abstractmethod
+    def flush(self):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
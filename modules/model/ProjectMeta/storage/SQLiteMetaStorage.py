@@ -0,0 +1,80 @@
+import json
+import sqlite3
+import threading
+
+from .MetaStorageBase import MetaStorageBase, key_field
+
+
+class SQLiteMetaStorage(MetaStorageBase):
+    """
+    Project metadata kept in an SQLite database in WAL mode. Every table has
+    an indexed key column and a JSON column with the document, so a single
+    document upsert touches only its own row.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.RLock()
+        self._tables = set(self.table_names())
+
+    def _ensure_table(self, table: str):
+        if table in self._tables:
+            return
+        self.connection.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ("{key_field(table)}" TEXT PRIMARY KEY, data TEXT NOT NULL)'
+        )
+        self._tables.add(table)
+
+    def table_names(self) -> list:
+        rows = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        return [row[0] for row in rows]
+
+    def all(self, table: str) -> list:
+        with self.lock:
+            if table not in self._tables:
+                return []
+            rows = self.connection.execute(f'SELECT data FROM "{table}"').fetchall()
+            return [json.loads(row[0]) for row in rows]
+
+    def get(self, table: str, key: str):
+        with self.lock:
+            if table not in self._tables:
+                return None
+            row = self.connection.execute(
+                f'SELECT data FROM "{table}" WHERE "{key_field(table)}" = ?', (key,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+
+    def upsert(self, table: str, document: dict):
+        with self.lock:
+            self._ensure_table(table)
+            self.connection.execute(
+                f'INSERT OR REPLACE INTO "{table}" ("{key_field(table)}", data) VALUES (?, ?)',
+                (document[key_field(table)], json.dumps(document))
+            )
+
+    def upsert_many(self, table: str, documents: list):
+        with self.lock:
+            self._ensure_table(table)
+            field = key_field(table)
+            self.connection.executemany(
+                f'INSERT OR REPLACE INTO "{table}" ("{field}", data) VALUES (?, ?)',
+                [(document[field], json.dumps(document)) for document in documents]
+            )
+
+    def remove(self, table: str, key: str):
+        with self.lock:
+            if table in self._tables:
+                self.connection.execute(f'DELETE FROM "{table}" WHERE "{key_field(table)}" = ?', (key,))
+
+    def flush(self):
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
@@ -0,0 +1,94 @@
+import os
+import threading
+from tinydb import TinyDB
+from tinydb.storages import JSONStorage
+from tinydb.middlewares import CachingMiddleware
+
+from .MetaStorageBase import MetaStorageBase, DESCRIPTIONS_TABLE, key_field
+
+
+class TinyDBMetaStorage(MetaStorageBase):
+    """
+    Project metadata kept in a single TinyDB JSON document. Every flush
+    rewrites the whole file.
+    """
+    # Descriptions live in the TinyDB default table for backward compatibility
+    TABLE_NAMES = {DESCRIPTIONS_TABLE: TinyDB.default_table_name}
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if not os.path.exists(self.db_path):
+            with open(self.db_path, "w") as f:
+                f.write('{}')
+        self.db = TinyDB(self.db_path, storage=CachingMiddleware(JSONStorage))
+        self.lock = threading.RLock()
+        # table -> {key: doc_id}
+        self._doc_ids = {}
+
+    def _table(self, table: str):
+        return self.db.table(self.TABLE_NAMES.get(table, table))
+
+    def _get_doc_ids(self, table: str) -> dict:
+        doc_ids = self._doc_ids.get(table)
+        if doc_ids is None:
+            field = key_field(table)
+            doc_ids = {doc.get(field): doc.doc_id for doc in self._table(table).all()}
+            self._doc_ids[table] = doc_ids
+        return doc_ids
+
+    def table_names(self) -> list:
+        with self.lock:
+            names = {name: table for table, name in self.TABLE_NAMES.items()}
+            return [names.get(name, name) for name in self.db.tables()]
+
+    def all(self, table: str) -> list:
+        with self.lock:
+            return [dict(doc) for doc in self._table(table).all()]
+
+    def get(self, table: str, key: str):
+        with self.lock:
+            doc_id = self._get_doc_ids(table).get(key)
+            if doc_id is None:
+                return None
+            doc = self._table(table).get(doc_id=doc_id)
+            return dict(doc) if doc is not None else None
+
+    def upsert(self, table: str, document: dict):
+        with self.lock:
+            key = document[key_field(table)]
+            doc_ids = self._get_doc_ids(table)
+            doc_id = doc_ids.get(key)
+            if doc_id is None:
+                doc_ids[key] = self._table(table).insert(document)
+            else:
+                self._table(table).update(document, doc_ids=[doc_id])
+
+    def upsert_many(self, table: str, documents: list):
+        with self.lock:
+            field = key_field(table)
+            doc_ids = self._get_doc_ids(table)
+            new_documents = []
+            for document in documents:
+                doc_id = doc_ids.get(document[field])
+                if doc_id is None:
+                    new_documents.append(document)
+                else:
+                    self._table(table).update(document, doc_ids=[doc_id])
+            if new_documents:
+                inserted = self._table(table).insert_multiple(new_documents)
+                for document, doc_id in zip(new_documents, inserted):
+                    doc_ids[document[field]] = doc_id
+
+    def remove(self, table: str, key: str):
+        with self.lock:
+            doc_id = self._get_doc_ids(table).pop(key, None)
+            if doc_id is not None:
+                self._table(table).remove(doc_ids=[doc_id])
+
+    def flush(self):
+        with self.lock:
+            self.db.storage.flush()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,67 @@
+from modules.model.WorkerPool import CancellationToken, PRIORITY_INTERACTIVE
+
+
+class ProjectTaskGuard:
+    """
+    Runs the worker pool tasks which use the metadata of the opened project
+    (requests, profiles, file suggestions). While the project is being
+    switched new tasks wait for the switch, and the switch waits for the
+    tasks already running. All methods are called in the GUI thread.
+    """
+
+    def __init__(self, worker_pool):
+        self.worker_pool = worker_pool
+        self.running = 0
+        self.blocked = False
+        self.deferred = []  # tasks submitted while blocked
+        self.idle_callbacks = []  # called once no task runs
+
+    def execute_async(self, fn, callback, error_callback, priority=PRIORITY_INTERACTIVE, token=None, semaphore=None):
+        """Same as WorkerPool.execute_async; the task is queued only after the project switch."""
+        token = token or CancellationToken()
+        if self.blocked:
+            self.deferred.append((fn, callback, error_callback, priority, token, semaphore))
+        else:
+            self._submit(fn, callback, error_callback, priority, token, semaphore)
+        return token
+
+    def is_idle(self) -> bool:
+        return self.running == 0
+
+    def call_when_idle(self, callback):
+        """Calls callback now or after the running tasks end."""
+        if self.running == 0:
+            callback()
+        else:
+            self.idle_callbacks.append(callback)
+
+    def block(self):
+        self.blocked = True
+
+    def unblock(self):
+        """Queues the tasks submitted while blocked."""
+        self.blocked = False
+        deferred, self.deferred = self.deferred, []
+        for task in deferred:
+            self._submit(*task)
+
+    def _submit(self, fn, callback, error_callback, priority, token, semaphore):
+        self.running += 1
+        self.worker_pool.execute_async(
+            fn,
+            lambda result: self._finish(callback, result),
+            lambda error: self._finish(error_callback, error),
+            priority,
+            token,
+            semaphore
+        )
+
+    def _finish(self, handler, value):
+        self.running -= 1
+        try:
+            handler(value)
+        finally:
+            if self.running == 0:
+                callbacks, self.idle_callbacks = self.idle_callbacks, []
+                for callback in callbacks:
+                    callback()
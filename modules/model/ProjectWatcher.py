@@ -0,0 +1,134 @@
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from modules.model.ProjectMeta.ProjectMeta import FileStatus
+
+
+class ProjectWatcher(QObject):
+    """
+    Opt-in watch mode of the project (the "watch_changes" project setting).
+    Changes of indexed files are collected for DEBOUNCE_MS, then the changed
+    files get their status updated and outdated ones are queued for
+    re-description in the indexing service.
+    """
+    file_status_changed = pyqtSignal(str, object)  # absolute path, FileStatus or None when deleted
+    DEBOUNCE_MS = 1500
+
+    def __init__(self, project_meta, indexing_service):
+        super().__init__()
+        self.project_meta = project_meta
+        self.indexing_service = indexing_service
+        self.project_path = None
+        self.files = set()
+        self.pending = set()
+        self.watcher = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE_MS)
+        self.timer.timeout.connect(self._process_pending)
+
+    def is_watching(self) -> bool:
+        return self.watcher is not None
+
+    def update(self):
+        """Starts or stops watching according to the settings of the current project."""
+        enabled = bool(getattr(self.project_meta, "watch_changes", False))
+        if not enabled:
+            self.stop()
+        elif not self.is_watching() or self.project_path != self.project_meta.project_path:
+            self.restart()
+
+    def restart(self):
+        self.stop()
+        if getattr(self.project_meta, "watch_changes", False):
+            self.start()
+
+    def start(self):
+        self.project_path = self.project_meta.project_path
+        self.scanner = self.project_meta.get_scanner()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_path_changed)
+        self.watcher.directoryChanged.connect(self._on_path_changed)
+        self.files = set(self.project_meta.getAll_project_files())
+        directories = {self.project_path}
+        for rel_path in self.files:
+            directory = os.path.dirname(rel_path)
+            while directory and directory not in directories:
+                directories.add(directory)
+                directory = os.path.dirname(directory)
+        self._add_paths([os.path.join(self.project_path, path) for path in directories | self.files])
+        print(f"ProjectWatcher: watching {len(self.files)} files in {len(directories)} directories")
+
+    def stop(self):
+        self.timer.stop()
+        self.pending.clear()
+        if self.watcher is not None:
+            self.watcher.deleteLater()
+            self.watcher = None
+            print(f"ProjectWatcher: stopped watching {self.project_path}")
+        self.files = set()
+        self.project_path = None
+
+    def _add_paths(self, paths):
+        if paths:
+            failed = self.watcher.addPaths(paths)
+            if failed:
+                print(f"ProjectWatcher: {len(failed)} paths can not be watched (watch limit?)")
+
+    def _on_path_changed(self, path):
+        self.pending.add(path)
+        self.timer.start()
+
+    def _scan_new_directory(self, rel_dir):
+        new_files = [rel_path for rel_path in self.scanner.scan_directory(rel_dir)
+                     if self.scanner.in_index_directories(rel_path)]
+        directories = {os.path.dirname(rel_path) for rel_path in new_files} | {rel_dir}
+        self._add_paths([os.path.join(self.project_path, path) for path in directories])
+        return new_files
+
+    def _process_pending(self):
+        if self.watcher is None or self.project_path != self.project_meta.project_path:
+            return
+        pending = self.pending
+        self.pending = set()
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        candidates = set()
+        for path in pending:
+            rel_path = os.path.relpath(path, self.project_path)
+            rel_path = "" if rel_path == "." else rel_path
+            if os.path.isdir(path):
+                # Files created (or replaced) in the directory and new subdirectories
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        child = os.path.join(rel_path, entry.name) if rel_path else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.path not in watched and not self.scanner.is_ignored(child, True):
+                                candidates.update(self._scan_new_directory(child))
+                        elif child not in self.files and self.scanner.accepts_file(child):
+                            candidates.add(child)
+                # Files removed from the directory
+                for known in [f for f in self.files if os.path.dirname(f) == rel_path]:
+                    if not os.path.exists(os.path.join(self.project_path, known)):
+                        candidates.add(known)
+            else:
+                candidates.add(rel_path)
+
+        self.project_meta.record_changes(candidates)
+        changed = []
+        for rel_path in sorted(candidates):
+            abs_path = os.path.join(self.project_path, rel_path)
+            if not os.path.isfile(abs_path):
+                self.files.discard(rel_path)
+                self.file_status_changed.emit(abs_path, None)
+                continue
+            if rel_path not in self.files:
+                self.files.add(rel_path)
+            if abs_path not in watched:
+                # Editors which save by replacing the file drop the watch
+                self._add_paths([abs_path])
+            status = self.project_meta.getFileStatus(rel_path)
+            self.file_status_changed.emit(abs_path, status)
+            if status != FileStatus.Indexed:
+                changed.append(rel_path)
+        if changed:
+            print(f"ProjectWatcher: {len(changed)} changed files queued for indexing")
+            self.indexing_service.index_files(changed, force=False)
@@ -0,0 +1,53 @@
+import json
+import os
+import statistics
+import threading
+
+LATENCY_FILE = 'settings/request_latency.json'
+SAMPLES_PER_MODEL = 20
+
+
+class RequestLatencyModel:
+    """
+    Durations of the last requests of every model with their (estimated)
+    input and output tokens, used to predict the latency of a new request.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = self._load()
+
+    def _load(self):
+        if os.path.exists(LATENCY_FILE):
+            try:
+                with open(LATENCY_FILE, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def record(self, model_name, input_tokens, output_tokens, seconds):
+        with self.lock:
+            samples = self.samples.setdefault(model_name, [])
+            samples.append([input_tokens, output_tokens, seconds])
+            del samples[:-SAMPLES_PER_MODEL]
+            os.makedirs(os.path.dirname(LATENCY_FILE), exist_ok=True)
+            with open(LATENCY_FILE, 'w') as f:
+                json.dump(self.samples, f)
+
+    def estimate(self, model_name, input_tokens):
+        """
+        Returns (seconds, output tokens) expected for a request of the model,
+        None for both when the model was not used yet. The median output of the
+        model is expected and the time is the median time per token (input and
+        output together) of the previous requests.
+        """
+        with self.lock:
+            samples = list(self.samples.get(model_name, []))
+        if not samples:
+            return None, None
+        output_tokens = statistics.median(sample[1] for sample in samples)
+        seconds_per_token = statistics.median(
+            seconds / max(sample_input + sample_output, 1) for sample_input, sample_output, seconds in samples
+        )
+        return seconds_per_token * (input_tokens + output_tokens), int(output_tokens)
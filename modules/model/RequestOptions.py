@@ -1,4 +1,9 @@
 class RequestOptions:
-    def __init__(self, includeFilesList=False, attachLastCommitDiff=False):
+    def __init__(self, includeFilesList=False, attachLastCommitDiff=False, includeProjectMap=False,
+                 autoSelectFiles=False, importHops=0, useResponseCache=False):
         self.includeFilesList = includeFilesList
         self.attachLastCommitDiff = attachLastCommitDiff
+        self.includeProjectMap = includeProjectMap
+        self.autoSelectFiles = autoSelectFiles
+        self.importHops = importHops  # 0 - do not add imported/importing files
+        self.useResponseCache = useResponseCache
@@ -0,0 +1,136 @@
+import hashlib
+import threading
+
+from git import Repo
+from git.exc import InvalidGitRepositoryError
+
+from modules.model.FileContentFormatter import FileContentFormatter, FILE_MODE_FULL, EDITOR_MODE_RULES
+from modules.model.ProjectMeta.TokenCounts import estimate_tokens
+from modules.model.constants import FILES_LIST_INTRO, PROJECT_MAP_INTRO, IMPORT_EXPANSION_TOKEN_BUDGET
+
+
+class RequestProfiler:
+    """
+    Estimates the size, cost and latency of a request before it is sent.
+    Only the parts that changed since the previous profile are measured
+    again: file tokens are cached by checksum in the project metadata, the
+    diff by the HEAD commit and the files list and project map by their
+    content hash.
+    """
+
+    def __init__(self, llm_model, latency_model):
+        self.llm_model = llm_model
+        self.latency_model = latency_model
+        self.lock = threading.Lock()
+        self._cache = {}
+
+    def _cached_tokens(self, key, signature, make_text):
+        with self.lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        text = make_text()
+        tokens = estimate_tokens(text) if text is not None else None
+        with self.lock:
+            self._cache[key] = (signature, tokens)
+        return tokens
+
+    def _diff_tokens(self, project_dir):
+        try:
+            repo = Repo(project_dir)
+            head = repo.head.commit.hexsha
+        except (InvalidGitRepositoryError, ValueError):
+            return None
+        except Exception as e:
+            print(f"RequestProfiler: can not read git HEAD: {e}")
+            return None
+        return self._cached_tokens("diff", (project_dir, head), lambda: self._last_commit_diff(repo))
+
+    @staticmethod
+    def _last_commit_diff(repo):
+        # None when there is no previous commit (e.g. a repository with one commit)
+        try:
+            return "Here is last commit diff:\n" + repo.git.diff('HEAD~1', 'HEAD')
+        except Exception as e:
+            print(f"RequestProfiler: can not get the last commit diff: {e}")
+            return None
+
+    def profile(self, model_name, role_string, request_text, editor_mode, request_options, project_meta,
+                chosen_files, file_modes):
+        """
+        Returns a dict with
+          parts: [(name, tokens)], files: [(relative path, tokens)], total,
+          context_window, cost (USD or None), output_cost_included,
+          latency (seconds or None) and notes.
+        """
+        parts = []
+        files = []
+        notes = []
+        meta = project_meta
+        if meta:
+            project_dir = meta.project_path
+            if getattr(request_options, 'includeProjectMap', False):
+                project_map = meta.compose_project_map()
+                parts.append(("project map", self._cached_tokens(
+                    "map", hashlib.sha1(project_map.encode("utf-8")).hexdigest(),
+                    lambda: PROJECT_MAP_INTRO + "\n" + project_map)))
+            if getattr(request_options, 'includeFilesList', False):
+                project_files = meta.getAll_project_files()
+                files_text = "\n".join(project_files)
+                parts.append(("files list", self._cached_tokens(
+                    "files list", hashlib.sha1(files_text.encode("utf-8")).hexdigest(),
+                    lambda: FILES_LIST_INTRO + "\n" + files_text)))
+            if getattr(request_options, 'attachLastCommitDiff', False):
+                diff_tokens = self._diff_tokens(project_dir)
+                if diff_tokens is not None:
+                    parts.append(("diff", diff_tokens))
+
+            chosen_files = list(chosen_files)
+            import_hops = getattr(request_options, 'importHops', 0)
+            if import_hops and chosen_files:
+                imported = meta.expand_with_imports(chosen_files, import_hops, IMPORT_EXPANSION_TOKEN_BUDGET)
+                if imported:
+                    notes.append(f"{len(imported)} files added by imports")
+                chosen_files += imported
+            counts = meta.get_token_counts(chosen_files)
+            formatter = FileContentFormatter(meta.symbol_index)
+            for rel_path in chosen_files:
+                mode = file_modes.get(rel_path, FILE_MODE_FULL)
+                if mode != FILE_MODE_FULL:
+                    text = formatter.make_file_content_text(project_dir, [rel_path], False, {rel_path: mode})
+                    files.append((rel_path, estimate_tokens(text)))
+                elif rel_path in counts:
+                    files.append((rel_path, counts[rel_path][0]))
+            if getattr(request_options, 'autoSelectFiles', False):
+                notes.append("automatically selected files are not counted")
+        if files:
+            parts.append(("files", sum(tokens for _rel_path, tokens in files)))
+        if editor_mode and files:
+            parts.append(("rules", self._cached_tokens("rules", None, lambda: EDITOR_MODE_RULES)))
+        parts.append(("role", estimate_tokens(role_string)))
+        parts.append(("request", estimate_tokens(request_text)))
+        total = sum(tokens for _name, tokens in parts)
+
+        options = self.llm_model.get_model_options(model_name)
+        budget = options.contextWindow - options.maxOutputTokens
+        sent_tokens = min(total, budget)
+        if total > budget:
+            notes.append(f"exceeds the context window ({budget} tokens), the request will be reduced")
+        latency, output_tokens = self.latency_model.estimate(model_name, sent_tokens)
+        cost = None
+        output_cost_included = False
+        if options.inputPrice is not None:
+            cost = sent_tokens * options.inputPrice / 1e6
+            if output_tokens is not None and options.outputPrice is not None:
+                cost += output_tokens * options.outputPrice / 1e6
+                output_cost_included = True
+        return {
+            'parts': parts,
+            'files': files,
+            'total': total,
+            'context_window': options.contextWindow,
+            'cost': cost,
+            'output_cost_included': output_cost_included,
+            'latency': latency,
+            'notes': notes
+        }
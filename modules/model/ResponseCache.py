@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from modules.model.constants import RESPONSE_CACHE_FILE, RESPONSE_CACHE_MAX_SIZE, RESPONSE_CACHE_TTL
+from modules.model.WorkerPool import TaskCanceled
+
+
+class _Flight:
+    """A provider call in progress, shared by the identical requests sent meanwhile."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Responses of the requests sent with the cache enabled, keyed by a hash of
+    the model and the request text. An entry stores the checksums of the
+    attached files and is dropped as soon as one of them changes; entries
+    expire after ttl seconds and the least recently used ones are evicted
+    when the total size exceeds max_size.
+    Identical requests sent while the first one is still running wait for it
+    instead of calling the provider again (single flight).
+    """
+
+    def __init__(self, db_path: str = RESPONSE_CACHE_FILE, max_size: int = RESPONSE_CACHE_MAX_SIZE,
+                 ttl: float = RESPONSE_CACHE_TTL):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.flights = {}
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, usage TEXT NOT NULL, checksums TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.connection.commit()
+        row = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self.total_size = row[0]
+
+    @staticmethod
+    def make_key(model_name: str, request_text: str, options=None) -> str:
+        key_text = json.dumps([model_name, request_text, options], sort_keys=True)
+        return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, checksums: dict):
+        """Returns (response, usage) or None; checksums are those of the attached files now."""
+        with self.lock:
+            return self._get(key, checksums)
+
+    def _get(self, key, checksums):
+        row = self.connection.execute(
+            "SELECT response, usage, checksums, size, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return None
+        response, usage, stored_checksums, size, created = row
+        if time.time() - created > self.ttl or json.loads(stored_checksums) != checksums:
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.connection.commit()
+            self.total_size -= size
+            return None
+        self.connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        return response, usage
+
+    def put(self, key: str, checksums: dict, response: str, usage: str):
+        if not response:
+            return
+        checksums_text = json.dumps(checksums, sort_keys=True)
+        size = len(key) + len(response.encode("utf-8")) + len(usage) + len(checksums_text)
+        now = time.time()
+        with self.lock:
+            old = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, usage, checksums, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response, usage, checksums_text, size, now, now)
+            )
+            self.total_size += size - (old[0] if old else 0)
+            self._evict()
+            self.connection.commit()
+
+    def get_or_generate(self, key: str, checksums: dict, generate):
+        """
+        Returns (response, usage, from cache). generate() -> (response, usage)
+        is called only when the response is neither cached nor being
+        generated for an identical request; errors are not cached. When the
+        request generating the response is canceled, a waiting request
+        generates it itself.
+        """
+        while True:
+            with self.lock:
+                cached = self._get(key, checksums)
+                if cached:
+                    return cached[0], cached[1], True
+                flight = self.flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self.flights[key] = _Flight()
+            if leader:
+                break
+            flight.done.wait()
+            if isinstance(flight.error, TaskCanceled):
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result[0], flight.result[1], True
+        try:
+            flight.result = generate()
+            response, usage = flight.result
+            if usage != "Error":
+                self.put(key, checksums, response, str(usage))
+            return response, usage, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    def _evict(self):
+        self.connection.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        row = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self.total_size = row[0]
+        while self.total_size > self.max_size:
+            rows = self.connection.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.total_size = 0
+                return
+            for key, size in rows:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total_size -= size
+                if self.total_size <= self.max_size:
+                    return
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
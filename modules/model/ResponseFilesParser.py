@@ -1,116 +1,161 @@
 import os
 from modules.model.FileSyntaxCorrector import FileSyntaxCorrector  # Import the FileSyntaxCorrector
 
+FILE_MARKER = "***"
+CODE_FENCE = "```"
+# Longer "file names" are ordinary bold text, not a file header
+MAX_FILENAME_LENGTH = 512
+
+# Parser states
+TEXT = 0          # looking for ***
+NAME = 1          # reading the file name up to *** or ```
+AFTER_NAME = 2    # looking for the opening ```
+CONTENT = 3       # reading the file content up to the closing ```
+
+
 class ResponseFilesParser:
-    def __init__(self, project_dir):
+    """
+    Finds the files in a response formatted as
+        ***relative/path***
+        ```
+        content
+        ```
+    ("***relative/path" followed directly by the fence is accepted too) and
+    writes them to disk. The response can be fed in chunks while it is
+    streamed: every file is written as soon as its closing fence arrives.
+    The text is read once and only the content of the current file is kept.
+    Files attached to the request only partially (outline, selected symbols,
+    truncated) are never written: the model did not see their full content.
+    """
+
+    def __init__(self, project_dir, file_written=None, partial_files=None, file_skipped=None):
         self.project_dir = project_dir
         self.syntax_corrector = FileSyntaxCorrector()  # Instantiate the FileSyntaxCorrector
+        self.file_written = file_written  # called with the relative path of every written file
+        self.partial_files = {os.path.normpath(rel_path) for rel_path in partial_files or ()}
+        self.file_skipped = file_skipped  # called with the relative path of every partial file returned
+        self.skipped_files = []
+        self.state = TEXT
+        self.pending = ""  # end of the last chunk which may be the start of a marker
+        self.parts = []  # name or content being read
+        self.parts_length = 0
+        self.current_file = None
+        self.updated_files = []
 
     def parse_response_and_update_files_on_disk(self, response):
         """
         Parses the response to find modified files and updates them on disk.
         Assumes file contents in the response are provided within code blocks.
+        Returns the relative paths of the written files.
         """
         print("Parsing response to update files...")
-
-        # Extract the filenames from the response
-        filenames_in_response = self.extract_filenames_from_response(response)
-        print("Filenames found:")
-        print(filenames_in_response)
-
-        if not filenames_in_response:
-            print("No filenames found in the response. Skipping update.")
-            return
-
-        # Iterate over the filenames and extract corresponding content from the response
-        for relative_path in filenames_in_response:
-            # Extract the content for each file from the response
-            file_content = self.extract_content_for_file(response, relative_path)
-
-            if file_content:
-                # Fix the file content after decoding using the FileSyntaxCorrector
-                file_content = self.syntax_corrector.fix_after_decoding(file_content)
-
-                # Update the file on disk with the new content
-                self.update_file_on_disk(relative_path, file_content)
-
-    def extract_filenames_from_response(self, response):
-        """
-        Extracts potential filenames from the response by finding patterns like **filename**.
-        It assumes filenames are enclosed in double asterisks (**) and can later be filtered.
-        """
-        extracted_files = []
-        start_index = 0
-        code_fence = "```"
-
-        while True:
-            # Find the next occurrence of ***
-            start_marker = response.find("***", start_index)
-            if start_marker == -1:
-                break  # No more *** found, exit the loop
-
-            # Find the closing *** or code fence for the file name
-            next_asterisks = response.find("***", start_marker + 3)
-            next_fence = response.find(code_fence, start_marker + 3)
-
-            if next_asterisks == -1 and next_fence == -1:
-                break  # No closing marker, exit the loop
-
-            # Determine which marker comes first
-            if next_asterisks != -1 and (next_fence == -1 or next_asterisks < next_fence):
-                end_marker = next_asterisks
-                marker_length = 3
+        self.feed(response)
+        return self.finish()
+
+    def feed(self, text):
+        data = self.pending + text
+        self.pending = ""
+        pos = 0
+        keep = len(CODE_FENCE) - 1
+        while pos < len(data):
+            if self.state == TEXT:
+                start = data.find(FILE_MARKER, pos)
+                if start == -1:
+                    self.pending = data[max(pos, len(data) - keep):]
+                    return
+                self._start(NAME)
+                pos = start + len(FILE_MARKER)
+            elif self.state == NAME:
+                end_marker = data.find(FILE_MARKER, pos)
+                end_fence = data.find(CODE_FENCE, pos)
+                ends = [end for end in (end_marker, end_fence) if end != -1]
+                if not ends:
+                    self._append(data[pos:max(pos, len(data) - keep)])
+                    self.pending = data[max(pos, len(data) - keep):]
+                    if self.parts_length > MAX_FILENAME_LENGTH:
+                        self._start(TEXT)
+                    return
+                end = min(ends)
+                self._append(data[pos:end])
+                self._end_name(end_marker=end == end_marker)
+                pos = end + len(FILE_MARKER)
+            elif self.state == AFTER_NAME:
+                start_marker = data.find(FILE_MARKER, pos)
+                start_fence = data.find(CODE_FENCE, pos)
+                if start_marker != -1 and (start_fence == -1 or start_marker < start_fence):
+                    # Another header before any content: the previous one had no file
+                    print(f"Could not find the content block for file: {self.current_file}")
+                    self._start(NAME)
+                    pos = start_marker + len(FILE_MARKER)
+                elif start_fence != -1:
+                    self._start(CONTENT)
+                    pos = start_fence + len(CODE_FENCE)
+                else:
+                    self.pending = data[max(pos, len(data) - keep):]
+                    return
             else:
-                end_marker = next_fence
-                marker_length = len(code_fence)
-
-            # Extract the potential filename
-            potential_filename = response[start_marker + 3:end_marker].strip()
-
-            # Add it to the list of extracted files
-            if potential_filename:
-                extracted_files.append(potential_filename)
-
-            # Move the start index forward to search for the next filename
-            start_index = end_marker + marker_length
-
-        return extracted_files
-
-    def extract_content_for_file(self, response, relative_path):
-        """
-        Extracts the new content for a given file from the response text.
-        Assumes the content for each file is enclosed within triple backticks (```) after the filename,
-        which can be wrapped in **.
-        """
-        code_fence = "```"
-
-        # Try to find the file name enclosed in ** in the response
-        file_marker = f"***{relative_path}***"
-        start_index = response.find(file_marker)
-        if start_index == -1:
-            # Fallback: look for the file name with only the leading ***
-            file_marker = f"***{relative_path}"
-            start_index = response.find(file_marker)
-            if start_index == -1:
-                print(f"Could not find the file marker for: {relative_path}")
-                return None
-
-        # After finding the file marker, look for the content inside the next code fence
-        start_content_index = response.find(code_fence, start_index)
-        if start_content_index == -1:
-            print(f"Could not find the start of the content block for file: {relative_path}")
-            return None
-
-        # Find the closing code fence after the start_content_index
-        end_content_index = response.find(code_fence, start_content_index + len(code_fence))
-        if end_content_index == -1:
-            print(f"Could not find the end of the content block for file: {relative_path}")
-            return None
-
-        # Extract the content between the code fences
-        file_content = response[start_content_index + len(code_fence):end_content_index].strip()
-
-        return file_content
+                end = data.find(CODE_FENCE, pos)
+                if end == -1:
+                    self._append(data[pos:max(pos, len(data) - keep)])
+                    self.pending = data[max(pos, len(data) - keep):]
+                    return
+                self._append(data[pos:end])
+                self._write_current_file()
+                self._start(TEXT)
+                pos = end + len(CODE_FENCE)
+
+    def finish(self):
+        """Ends the response; returns the relative paths of the written files."""
+        if self.state == CONTENT:
+            print(f"Could not find the end of the content block for file: {self.current_file}")
+        elif self.state == AFTER_NAME:
+            print(f"Could not find the start of the content block for file: {self.current_file}")
+        self._start(TEXT)
+        self.pending = ""
+        print(f"Files updated from the response: {self.updated_files}")
+        return self.updated_files
+
+    def _start(self, state):
+        self.state = state
+        self.parts = []
+        self.parts_length = 0
+
+    def _append(self, text):
+        if text:
+            self.parts.append(text)
+            self.parts_length += len(text)
+
+    def _end_name(self, end_marker):
+        raw_name = "".join(self.parts)
+        name = raw_name.strip()
+        # A file name follows *** directly and ends on the same line
+        if not name or raw_name[0].isspace() or "\n" in raw_name.rstrip() or len(name) > MAX_FILENAME_LENGTH:
+            # *** ending a text which is not a file name may start the next header
+            self._start(NAME if end_marker else TEXT)
+            return
+        print(f"File found in the response: {name}")
+        self.current_file = name
+        # "***path```" - the fence which ended the name opens the content
+        self._start(AFTER_NAME if end_marker else CONTENT)
+
+    def _write_current_file(self):
+        file_content = "".join(self.parts).strip()
+        if not file_content:
+            return
+        if os.path.normpath(self.current_file) in self.partial_files:
+            print(f"Not writing {self.current_file}: it was attached partially")
+            if self.current_file not in self.skipped_files:
+                self.skipped_files.append(self.current_file)
+                if self.file_skipped:
+                    self.file_skipped(self.current_file)
+            return
+        # Fix the file content after decoding using the FileSyntaxCorrector
+        file_content = self.syntax_corrector.fix_after_decoding(file_content)
+        if self.update_file_on_disk(self.current_file, file_content):
+            if self.current_file not in self.updated_files:
+                self.updated_files.append(self.current_file)
+            if self.file_written:
+                self.file_written(self.current_file)
 
     def update_file_on_disk(self, relative_path, new_content):
         """
@@ -121,5 +166,7 @@ class ResponseFilesParser:
             with open(file_path, 'w') as file:
                 file.write(new_content)
             print(f"File updated: {file_path}")
+            return True
         except Exception as e:
             print(f"Error updating file {file_path}: {str(e)}")
+            return False
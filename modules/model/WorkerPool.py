@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from modules.model.constants import WORKER_POOL_SIZE
+
+SETTINGS_FILE = 'settings/settings.json'
+
+# Priority classes, lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_INDEXING = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_INDEXING: "indexing", PRIORITY_BATCH: "batch"}
+
+# Queued tasks blocked by a concurrency limit are retried at least this often,
+# the limits are shared with threads outside of the pool
+LIMIT_RETRY_INTERVAL = 0.2
+
+
+class TaskCanceled(Exception):
+    pass
+
+
+class CancellationToken:
+    """Set by cancel(); a running task checks it and stops at a convenient point."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_canceled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_canceled(self):
+        if self._event.is_set():
+            raise TaskCanceled("Task canceled")
+
+
+class _Task:
+    def __init__(self, fn, callback, error_callback, priority, token, semaphore):
+        self.fn = fn
+        self.callback = callback
+        self.error_callback = error_callback
+        self.priority = priority
+        self.token = token
+        self.semaphore = semaphore
+        self.acquired = False  # the semaphore is held by the task
+
+
+class WorkerPool(QObject):
+    """
+    A fixed number of worker threads running the submitted callables in the
+    order of their priority class, first submitted first within a class.
+    A task can carry a semaphore (the concurrency limit of a provider): it is
+    started only when the semaphore can be acquired and other tasks are run
+    meanwhile. Callbacks are called in the thread which created the pool
+    (the GUI thread).
+    """
+    _task_done = pyqtSignal(object, object, object)  # task, result, error
+
+    def __init__(self, size: int = WORKER_POOL_SIZE):
+        super().__init__()
+        self.size = max(1, size)
+        self.condition = threading.Condition()
+        self.queue = []  # heap of (priority, sequence, task)
+        self.sequence = itertools.count()
+        self.running = {priority: 0 for priority in PRIORITY_NAMES}
+        self._task_done.connect(self._deliver)
+        self.workers = []
+        for index in range(self.size):
+            worker = threading.Thread(target=self._work, name=f"WorkerPool-{index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def execute_async(self, callable, callback, error_callback, priority=PRIORITY_INTERACTIVE, token=None,
+                      semaphore=None):
+        """
+        Queues callable(); callback(result) or error_callback(exception) is
+        called when it ends. A task canceled before it starts ends with
+        TaskCanceled. Returns the cancellation token of the task.
+        """
+        token = token or CancellationToken()
+        task = _Task(callable, callback, error_callback, priority, token, semaphore)
+        with self.condition:
+            heapq.heappush(self.queue, (priority, next(self.sequence), task))
+            self.condition.notify()
+        return token
+
+    def queue_depth(self) -> dict:
+        """Returns {priority class name: (queued, running)}."""
+        with self.condition:
+            queued = {priority: 0 for priority in PRIORITY_NAMES}
+            for priority, _sequence, _task in self.queue:
+                queued[priority] += 1
+            return {name: (queued[priority], self.running[priority]) for priority, name in PRIORITY_NAMES.items()}
+
+    def _take(self):
+        """Pops the first task which is canceled or can acquire its semaphore; None if all are blocked."""
+        blocked = []
+        task = None
+        while self.queue:
+            entry = heapq.heappop(self.queue)
+            candidate = entry[2]
+            if candidate.token.is_canceled() or candidate.semaphore is None:
+                task = candidate
+                break
+            if candidate.semaphore.acquire(blocking=False):
+                candidate.acquired = True
+                task = candidate
+                break
+            blocked.append(entry)
+        for entry in blocked:
+            heapq.heappush(self.queue, entry)
+        return task
+
+    def _work(self):
+        while True:
+            with self.condition:
+                task = self._take()
+                while task is None:
+                    self.condition.wait(LIMIT_RETRY_INTERVAL if self.queue else None)
+                    task = self._take()
+                self.running[task.priority] += 1
+            result = None
+            error = None
+            try:
+                task.token.raise_if_canceled()
+                result = task.fn()
+            except Exception as e:
+                error = e
+            if task.acquired:
+                task.semaphore.release()
+            with self.condition:
+                self.running[task.priority] -= 1
+                self.condition.notify_all()
+            self._task_done.emit(task, result, error)
+
+    def _deliver(self, task, result, error):
+        if error is not None:
+            task.error_callback(error)
+        else:
+            task.callback(result)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """The pool shared by the application, sized by "workerPoolSize" in settings/settings.json."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            size = WORKER_POOL_SIZE
+            if os.path.exists(SETTINGS_FILE):
+                try:
+                    with open(SETTINGS_FILE, 'r') as f:
+                        size = int(json.load(f).get('workerPoolSize', WORKER_POOL_SIZE))
+                except (OSError, ValueError, TypeError, AttributeError):
+                    size = WORKER_POOL_SIZE
+            _pool = WorkerPool(size)
+        return _pool
@@ -1 +1,40 @@
 FILES_LIST_INTRO = "Here are list of files of the project:"
+PROJECT_MAP_INTRO = "Here is a map of the project directories with their summaries and files:"
+
+# Worker threads running the background tasks (can be overridden with "workerPoolSize" in settings/settings.json)
+WORKER_POOL_SIZE = 8
+
+# Storage of the project metadata in .lttcdi: "sqlite" or "tinydb"
+PROJECT_META_STORAGE = "sqlite"
+
+# Descriptions shared by all projects, keyed by file checksum and indexing model
+DESCRIPTION_CACHE_FILE = 'settings/description_cache.sqlite'
+DESCRIPTION_CACHE_MAX_SIZE = 50 * 1024 * 1024
+
+# Responses of the requests sent with "Reuse cached response", keyed by model and request text
+RESPONSE_CACHE_FILE = 'settings/response_cache.sqlite'
+RESPONSE_CACHE_MAX_SIZE = 50 * 1024 * 1024
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+# Files pre-checked by "Suggest files" (local lexical search over the project)
+SUGGEST_TOKEN_BUDGET = 30000
+SUGGEST_MAX_FILES = 10
+
+# Checked files are expanded by the files they import and the files importing them
+IMPORT_EXPANSION_TOKEN_BUDGET = 30000
+IMPORT_EXPANSION_MAX_HOPS = 3
+
+# Tokens kept free for the formatting rules and estimation errors when a request is fitted to the context window
+CONTEXT_SAFETY_MARGIN_TOKENS = 2000
+LEFT_OUT_FILES_NOTE = "These files were not attached because of the context size, ask for them if you need them:"
+
+# Two-stage requests: a cheap model picks the files from their descriptions
+AUTO_SELECT_MAX_FILES = 15
+# Larger projects are narrowed down by the local lexical search first
+AUTO_SELECT_MAX_CANDIDATES = 1500
+FILE_SELECTION_PROMPT = (
+    "You select source files needed to fulfil a request to a coding assistant. Below are the project files, "
+    "one per line as path: description, followed by the request. Output only the paths of the files the "
+    "assistant has to read or modify, one path per line, most important first, at most {max_files} paths. "
+    "Output nothing else."
+)
@@ -8,11 +8,22 @@ from modules.model.RequestHistoryModel import RequestHistoryModel
 from modules.model.robot.robot import RobotModel
 from modules.model.ProjectMeta.ProjectMeta import ProjectMeta
 from modules.model.DesktopFileInstaller import DesktopFileInstaller
+from modules.model.IndexingService import IndexingService
+from modules.model.ProjectWatcher import ProjectWatcher
+from modules.model.WorkerPool import get_worker_pool, PRIORITY_INTERACTIVE
+from modules.model.RequestProfiler import RequestProfiler
+from modules.model.constants import SUGGEST_TOKEN_BUDGET, SUGGEST_MAX_FILES
 
 class ProjectGPTModel(QObject):
     response_generated = pyqtSignal(str)
+    response_started = pyqtSignal(object)
+    response_chunk_received = pyqtSignal(object, str)
+    request_finished = pyqtSignal(object, str)
     completed_job_list_updated = pyqtSignal(list, list)
     status_changed = pyqtSignal(str)
+    files_suggested = pyqtSignal(list)
+    request_profiled = pyqtSignal(object)  # dict returned by RequestProfiler.profile
+    project_opened = pyqtSignal(str)  # project directory, once project_meta was switched to it
 
     def __init__(self):
         super().__init__()
@@ -21,32 +32,145 @@ class ProjectGPTModel(QObject):
         self.completed_batches = []
         self.completed_jobs_descriptions = []
         self.syntax_corrector = FileSyntaxCorrector()
+        self.worker_pool = get_worker_pool()
         self.additionalRequests = self.load_additional_requests()
         self.llm_model = LLMModel()
         self.available_models = self.llm_model.available_models
         self.llm_model.response_generated.connect(self.response_generated.emit)
+        self.llm_model.response_started.connect(self.response_started.emit)
+        self.llm_model.response_chunk_received.connect(self.response_chunk_received.emit)
+        self.llm_model.request_finished.connect(self.request_finished.emit)
         self.llm_model.completed_job_list_updated.connect(self.completed_job_list_updated.emit)
         self.llm_model.status_changed.connect(self.status_changed.emit)
+        self.llm_model.files_selected.connect(self.files_suggested.emit)
 
         self.historyModel = HistoryModel()
         self.requestHistoryModel = RequestHistoryModel()
 
         last_project_directory = self.historyModel.get_last_project_directory()
         self.project_meta = ProjectMeta(last_project_directory, llm_model=self.llm_model)
+        self.llm_model.set_project_meta(self.project_meta)
+        self.indexing_service = IndexingService(self.project_meta)
+        self.project_watcher = ProjectWatcher(self.project_meta, self.indexing_service)
+        self.project_watcher.update()
 
+        self.request_profiler = RequestProfiler(self.llm_model, self.llm_model.latency_model)
+        self.profile_generation = 0
+        self.profile_running = False
+        self.pending_profile = None
+
+        self.pending_project_dir = None  # project opened once the running indexing job ends
+        self.project_switch_scheduled = False
+        self.project_tasks = self.llm_model.project_tasks
         self.robotModel = RobotModel(self.llm_model, self.project_meta)
         self.desktop_installer = DesktopFileInstaller()
 
     def set_project_dir(self, project_dir):
-        self.llm_model.set_project_dir(project_dir)
+        """
+        Opens the project. Indexing jobs and tasks use the current metadata:
+        jobs are canceled, and the switch waits until they and the running
+        tasks end. Tasks started meanwhile wait for the switch.
+        project_opened is emitted once the project is open.
+        """
+        if project_dir == self.project_meta.project_path:
+            # Also drops the switch to another project still waiting
+            self.pending_project_dir = None
+            self.project_tasks.unblock()
+            self._set_opened_project_dir(project_dir)
+            return
+        self.pending_project_dir = project_dir
+        self.project_tasks.block()
+        if not self.project_switch_scheduled:
+            self._switch_to_pending_project()
+
+    def _switch_to_pending_project(self):
+        self.project_switch_scheduled = False
+        if self.pending_project_dir is None:
+            return
+        if self.indexing_service.is_running():
+            self.indexing_service.cancel()
+            self.project_switch_scheduled = True
+            self.indexing_service.call_when_idle(self._switch_to_pending_project)
+            return
+        if not self.project_tasks.is_idle():
+            self.project_switch_scheduled = True
+            self.project_tasks.call_when_idle(self._switch_to_pending_project)
+            return
+        project_dir = self.pending_project_dir
+        self.pending_project_dir = None
         self.project_meta.set_project_path(project_dir)
         self.robotModel.project_meta = self.project_meta
+        self.project_watcher.update()
+        self._set_opened_project_dir(project_dir)
+        self.project_tasks.unblock()
+        self.project_opened.emit(project_dir)
+
+    def _set_opened_project_dir(self, project_dir):
+        self.llm_model.set_project_dir(project_dir)
         self.project_dir = project_dir
 
     def set_project_files(self, chosen_files):
         self.llm_model.set_project_files(chosen_files)
         self.chosen_files = chosen_files
 
+    def set_file_modes(self, file_modes):
+        self.llm_model.set_file_modes(file_modes)
+
+    def suggest_files(self, request_text):
+        """Ranks project files for the request in the background and emits files_suggested."""
+        self.status_changed.emit("Searching files for the request ...")
+        project_meta = self.project_meta
+
+        def _handle_result(files):
+            self.status_changed.emit(f"Suggested {len(files)} files")
+            self.files_suggested.emit(files)
+
+        self.project_tasks.execute_async(
+            lambda: project_meta.suggest_files(request_text, SUGGEST_TOKEN_BUDGET, SUGGEST_MAX_FILES),
+            _handle_result,
+            lambda e: self.status_changed.emit("Error suggesting files: " + str(e)),
+            PRIORITY_INTERACTIVE
+        )
+
+    def profile_request(self, model_name, role_string, request_text, editor_mode, request_options, chosen_files,
+                        file_modes):
+        """
+        Estimates the request in the background and emits request_profiled.
+        Only one profile runs at a time; while it runs only the latest
+        request is kept and profiled afterwards.
+        """
+        self.pending_profile = (model_name, role_string, request_text, editor_mode, request_options,
+                                self.project_meta, list(chosen_files), dict(file_modes))
+        if not self.profile_running:
+            self._start_pending_profile()
+
+    def _start_pending_profile(self):
+        if self.pending_profile is None or not self.pending_profile[0]:
+            self.pending_profile = None
+            self.profile_running = False
+            return
+        args = self.pending_profile
+        self.pending_profile = None
+        self.profile_running = True
+        self.profile_generation += 1
+        generation = self.profile_generation
+
+        def _handle_result(profile):
+            self._start_pending_profile()
+            if generation == self.profile_generation:
+                self.request_profiled.emit(profile)
+
+        def _handle_error(e):
+            print(f"Error profiling the request: {e}")
+            self._start_pending_profile()
+
+        self.project_tasks.execute_async(
+            lambda: self.request_profiler.profile(*args),
+            _handle_result,
+            _handle_error,
+            PRIORITY_INTERACTIVE
+        )
+
     def load_additional_requests(self):
         additional_requests_path = os.path.join('additionalRequests.json')
         if os.path.exists(additional_requests_path):
@@ -1,3 +1,14 @@
+# Used when a provider does not know the limits of a model
+DEFAULT_CONTEXT_WINDOW = 128000
+DEFAULT_MAX_OUTPUT_TOKENS = 8192
+
+
 class ModelOptions:
-    def __init__(self, supportBatch=False):
+    def __init__(self, supportBatch=False, contextWindow=DEFAULT_CONTEXT_WINDOW,
+                 maxOutputTokens=DEFAULT_MAX_OUTPUT_TOKENS, inputPrice=None, outputPrice=None):
         self.supportBatch = supportBatch
+        self.contextWindow = contextWindow  # input and output tokens together
+        self.maxOutputTokens = maxOutputTokens  # kept free for the response
+        # USD per million tokens, None when unknown
+        self.inputPrice = inputPrice
+        self.outputPrice = outputPrice
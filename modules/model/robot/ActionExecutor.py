@@ -47,6 +47,7 @@ class ActionExecutor:
         try:
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(content)
+            self.project_meta.record_changes([filename])
             return f"File {filename} written successfully."
         except Exception as e:
             return f"ERROR: Could not write file {filename}: {e}"
@@ -53,7 +53,9 @@ class RobotModel(QObject):
             return
 
         try:
-            response_text, _usage = self.llm_model.generate_simple_response_sync(model_name, full_request)
+            # Scenarios may reuse the responses to identical steps ("use_response_cache": true)
+            response_text, _usage = self.llm_model.generate_simple_response_sync(
+                model_name, full_request, use_cache=scenario.get('use_response_cache', False))
             parsed = self.parseResponse(response_text)
             self.response.emit(parsed)
         except Exception as e:
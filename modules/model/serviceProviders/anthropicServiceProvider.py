@@ -1,5 +1,6 @@
 from modules.model.serviceProviders.serviceProviderBase import ServiceProviderBase
 from modules.model.modelOptions import ModelOptions
+from modules.model.WorkerPool import TaskCanceled
 import anthropic
 import os
 import json
@@ -8,6 +9,13 @@ import json
 class AnthropicServiceProvider(ServiceProviderBase):
     # Constants
     DEFAULT_MAX_TOKENS = 64000
+    CONTEXT_WINDOW = 200000
+    # USD per million input and output tokens
+    PRICES = {
+        "claude-sonnet-4-5": (3.0, 15.0),
+        "claude-haiku-4-5": (1.0, 5.0),
+        "claude-opus-4-5": (5.0, 25.0),
+    }
 
     def __init__(self, settings=None, api_key=None):
         """
@@ -38,7 +46,9 @@ class AnthropicServiceProvider(ServiceProviderBase):
         return "https://api.anthropic.com"
 
     def getModelOptions(self, modelName):
-        return ModelOptions(supportBatch=True)
+        input_price, output_price = self.PRICES.get(modelName, (None, None))
+        return ModelOptions(supportBatch=True, contextWindow=self.CONTEXT_WINDOW,
+                            maxOutputTokens=self.DEFAULT_MAX_TOKENS, inputPrice=input_price, outputPrice=output_price)
 
     def _generate_response_sync(self, modelName, full_request, status_changed, response_generated, project_dir=None, chosen_files=None):
         try:
@@ -58,16 +68,75 @@ class AnthropicServiceProvider(ServiceProviderBase):
                 ]
             )
             
-            generated_response = response.content[0].text
+            generated_response = self._content_text(response.content)
             
             # Construct usage information similar to other providers
-            usage_info = f"Input tokens: {response.usage.input_tokens}, Output tokens: {response.usage.output_tokens}"
+            usage_info = self._format_usage(response.usage)
             
             return (generated_response, usage_info)
             
         except Exception as e:
             return (f"Error generating response: {str(e)}", "Error")
 
+    @staticmethod
+    def _content_text(content):
+        """Text of all text blocks of a message (other blocks, e.g. thinking, are skipped)."""
+        return "".join(getattr(block, 'text', '') for block in content or [] if getattr(block, 'type', 'text') == 'text')
+
+    def _format_usage(self, usage):
+        # input_tokens counts only the tokens after the last cache breakpoint
+        cached_tokens = getattr(usage, 'cache_read_input_tokens', None) or 0
+        cache_write_tokens = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        return self.format_usage(usage.input_tokens + cached_tokens + cache_write_tokens, usage.output_tokens,
+                                 cached_tokens, cache_write_tokens)
+
+    def _make_content(self, full_request, cache_prefix_length):
+        """
+        The request as content blocks with a cache breakpoint after its stable
+        prefix. Prefixes below the minimal cacheable length of the model are
+        just not cached.
+        """
+        if not cache_prefix_length:
+            return full_request
+        return [
+            {"type": "text", "text": full_request[:cache_prefix_length], "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": full_request[cache_prefix_length:]}
+        ]
+
+    def _generate_response_stream_sync(self, modelName, full_request, status_changed, response_generated, chunk_received, project_dir=None, chosen_files=None, cache_prefix_length=0):
+        try:
+            if not self.api_key:
+                return ("Error: Anthropic API key not configured in settings/key.json", "Error")
+
+            if not self.client:
+                self.client = anthropic.Anthropic(api_key=self.api_key)
+
+            status_changed("Waiting for the response ...")
+
+            parts = []
+            with self.client.messages.stream(
+                model=modelName,
+                max_tokens=self.DEFAULT_MAX_TOKENS,
+                messages=[
+                    {"role": "user", "content": self._make_content(full_request, cache_prefix_length)}
+                ]
+            ) as stream:
+                for text in stream.text_stream:
+                    if not parts:
+                        status_changed("Receiving the response ...")
+                    parts.append(text)
+                    chunk_received(text)
+                response = stream.get_final_message()
+
+            usage_info = self._format_usage(response.usage)
+            return ("".join(parts), usage_info)
+
+        except TaskCanceled:
+            # Raised by chunk_received when the request is stopped
+            raise
+        except Exception as e:
+            return (f"Error generating response: {str(e)}", "Error")
+
     def _generate_batch_response_sync(self, modelName, full_request, description, custom_id, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         if not self.api_key:
             response_generated("Error: Anthropic API key not configured in settings/key.json")
@@ -88,6 +157,44 @@ class AnthropicServiceProvider(ServiceProviderBase):
         batch = self.client.messages.batches.create(requests=[request_item])
         return batch
 
+    def submit_requests_batch(self, modelName, requests, description):
+        if not self.api_key:
+            raise ValueError("Anthropic API key not configured in settings/key.json")
+        if not self.client:
+            self.client = anthropic.Anthropic(api_key=self.api_key)
+        max_tokens = self.settings.get("max_tokens", self.DEFAULT_MAX_TOKENS)
+        request_items = [
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": modelName,
+                    "messages": [{"role": "user", "content": request_text}],
+                    "max_tokens": max_tokens,
+                },
+            }
+            for custom_id, request_text in requests.items()
+        ]
+        batch = self.client.messages.batches.create(requests=request_items)
+        print(f"Batch {batch.id} ({description}) created with {len(request_items)} requests")
+        return batch.id
+
+    def get_requests_batch_results(self, modelName, batch_id):
+        if not self.api_key:
+            raise ValueError("Anthropic API key not configured in settings/key.json")
+        if not self.client:
+            self.client = anthropic.Anthropic(api_key=self.api_key)
+        batch = self.client.messages.batches.retrieve(batch_id)
+        if getattr(batch, 'processing_status', '') != "ended":
+            return None
+        results = {}
+        for resp in self.client.messages.batches.results(batch_id):
+            result = getattr(resp, 'result', None)
+            message = getattr(result, 'message', None)
+            content = getattr(message, 'content', None)
+            if content:
+                results[resp.custom_id] = self._content_text(content)
+        return results
+
     def get_completed_batch_jobs(self, modelName, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         if not self.api_key:
             response_generated("Error: Anthropic API key not configured in settings/key.json")
@@ -147,7 +254,7 @@ class AnthropicServiceProvider(ServiceProviderBase):
             content = getattr(message, 'content', [])
             if not content:
                 raise Exception("No content found in batch message.")
-            text = getattr(content[0], 'text', '')
+            text = self._content_text(content)
             usage = getattr(message, 'usage', None)
             if usage:
                 input_tokens = getattr(usage, 'input_tokens', 0)
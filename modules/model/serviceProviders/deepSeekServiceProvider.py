@@ -32,11 +32,19 @@ class DeepSeekServiceProvider(ServiceProviderBase):
         return "https://api.deepseek.com/v1"
 
     def getModelOptions(self, modelName) -> ModelOptions:
-        return ModelOptions(supportBatch=False)
+        return ModelOptions(supportBatch=False, contextWindow=128000, maxOutputTokens=8192,
+                            inputPrice=0.28, outputPrice=0.42)
 
     def getClient(self):
         return OpenAI(api_key=self.api_key, base_url=self.getBaseUrl())
 
+    def _format_usage(self, usage):
+        """DeepSeek caches the common prefixes of the prompts on disk automatically."""
+        if usage is None:
+            return "Usage information not available"
+        return self.format_usage(usage.prompt_tokens, usage.completion_tokens,
+                                 getattr(usage, 'prompt_cache_hit_tokens', None))
+
     def _generate_response_sync(self, modelName, full_request, status_changed, response_generated, project_dir=None, chosen_files=None):
         status_changed("Waiting for the response ...")
         messages = [
@@ -48,7 +56,32 @@ class DeepSeekServiceProvider(ServiceProviderBase):
             messages=messages
         )
         generated_response = response.choices[0].message.content
-        return (generated_response, response.usage)
+        return (generated_response, self._format_usage(response.usage))
+
+    def _generate_response_stream_sync(self, modelName, full_request, status_changed, response_generated, chunk_received, project_dir=None, chosen_files=None, cache_prefix_length=0):
+        status_changed("Waiting for the response ...")
+        messages = [
+            {"role": "user", "content": full_request}
+        ]
+        client = self.getClient()
+        stream = client.chat.completions.create(
+            model=modelName,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        parts = []
+        usage = None
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            # deepseek-reasoner streams its reasoning_content first, only the answer is shown
+            if chunk.choices and chunk.choices[0].delta.content:
+                if not parts:
+                    status_changed("Receiving the response ...")
+                parts.append(chunk.choices[0].delta.content)
+                chunk_received(chunk.choices[0].delta.content)
+        return ("".join(parts), self._format_usage(usage))
 
     def _generate_batch_response_sync(self, modelName, full_request, description, custom_id, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         response_generated("Batch functionality is not supported by DeepSeekServiceProvider")
@@ -1,11 +1,19 @@
 from modules.model.serviceProviders.serviceProviderBase import ServiceProviderBase
 from modules.model.modelOptions import ModelOptions
+from modules.model.WorkerPool import TaskCanceled
 import google.generativeai as genai
 import os
 import json
 
 
 class GeminiServiceProvider(ServiceProviderBase):
+    # USD per million input and output tokens
+    PRICES = {
+        "gemini-2.0-flash": (0.1, 0.4),
+        "gemini-2.5-pro-preview-05-06": (1.25, 10.0),
+        "gemini-2.5-pro-exp-03-25": (0.0, 0.0),
+        "gemini-2.5-flash-preview-04-17": (0.15, 0.6),
+    }
     def __init__(self, settings=None, api_key=None):
         """
         `settings` should come from get_provider_settings("gemini").
@@ -33,7 +41,10 @@ class GeminiServiceProvider(ServiceProviderBase):
         return "https://generativelanguage.googleapis.com/v1beta/models"
 
     def getModelOptions(self, modelName):
-        return ModelOptions(supportBatch=False)
+        max_output_tokens = 8192 if modelName.startswith("gemini-2.0") else 65536
+        input_price, output_price = self.PRICES.get(modelName, (None, None))
+        return ModelOptions(supportBatch=False, contextWindow=1048576, maxOutputTokens=max_output_tokens,
+                            inputPrice=input_price, outputPrice=output_price)
 
     def _generate_response_sync(self, modelName, full_request, status_changed, response_generated, project_dir=None, chosen_files=None):
         try:
@@ -51,6 +62,32 @@ class GeminiServiceProvider(ServiceProviderBase):
         except Exception as e:
             return (f"Error generating response: {str(e)}", "Error")
 
+    def _generate_response_stream_sync(self, modelName, full_request, status_changed, response_generated, chunk_received, project_dir=None, chosen_files=None, cache_prefix_length=0):
+        try:
+            if not self.api_key:
+                return ("Error: Gemini API key not configured in settings/key.json", "Error")
+
+            model = genai.GenerativeModel(modelName)
+            parts = []
+            for chunk in model.generate_content(full_request, stream=True):
+                if not chunk.text:
+                    continue
+                if not parts:
+                    status_changed("Receiving the response ...")
+                parts.append(chunk.text)
+                chunk_received(chunk.text)
+
+            if not parts:
+                return ("Error: Empty response from Gemini API", "Error")
+
+            return ("".join(parts), "Usage information not available for Gemini")
+
+        except TaskCanceled:
+            # Raised by chunk_received when the request is stopped
+            raise
+        except Exception as e:
+            return (f"Error generating response: {str(e)}", "Error")
+
     def _generate_batch_response_sync(self, modelName, full_request, description, custom_id, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         response_generated("Batch functionality is not supported by GeminiServiceProvider")
 
@@ -1,7 +1,10 @@
+import codecs
+import os
 import subprocess
 import re
 from modules.model.serviceProviders.serviceProviderBase import ServiceProviderBase
 from modules.model.modelOptions import ModelOptions
+from modules.model.WorkerPool import TaskCanceled
 from modules.model.FileContentFormatter import FileContentFormatter
 
 def remove_ansi_escape(text):
@@ -11,7 +14,19 @@ def remove_ansi_escape(text):
 def remove_progress_symbols(text):
     return re.sub(r'[\u2800-\u28FF]', '', text)
 
+def split_incomplete_escape(text):
+    """Splits off an escape sequence cut at the end of a streamed chunk: (complete text, rest)."""
+    match = re.search(r'\x1B(?:\[[0-?]*[ -/]*)?$', text)
+    if not match:
+        return text, ""
+    return text[:match.start()], text[match.start():]
+
 class OllamaServiceProvider(ServiceProviderBase):
+    # Local models are served one request at a time
+    DEFAULT_MAX_CONCURRENCY = 1
+    # Default context length of the ollama server (num_ctx)
+    CONTEXT_WINDOW = 8192
+
     def __init__(self):
         super().__init__()
         try:
@@ -36,7 +51,8 @@ class OllamaServiceProvider(ServiceProviderBase):
         return ""
 
     def getModelOptions(self, modelName):
-        return ModelOptions(supportBatch=False)
+        return ModelOptions(supportBatch=False, contextWindow=self.CONTEXT_WINDOW, maxOutputTokens=2048,
+                            inputPrice=0.0, outputPrice=0.0)
 
     def _generate_response_sync(self, modelName, full_request, status_changed, response_generated, project_dir=None, chosen_files=None):
         print("OllamaServiceProvider: Generating response...")
@@ -61,6 +77,47 @@ class OllamaServiceProvider(ServiceProviderBase):
             error_msg = f"Error generating response: {str(e)}"
             return (error_msg, "Error")
 
+    def _generate_response_stream_sync(self, modelName, full_request, status_changed, response_generated, chunk_received, project_dir=None, chosen_files=None, cache_prefix_length=0):
+        print("OllamaServiceProvider: Generating response (streaming)...")
+        process = None
+        try:
+            model_name = modelName.replace("ollama-", "", 1)
+            process = subprocess.Popen(
+                ["ollama", "run", model_name, full_request],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            parts = []
+            incomplete = ""  # escape sequence split between two reads
+            while True:
+                data = os.read(process.stdout.fileno(), 4096)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                parts.append(text)
+                text, incomplete = split_incomplete_escape(incomplete + text)
+                shown = remove_progress_symbols(remove_ansi_escape(text))
+                if shown:
+                    chunk_received(shown)
+            parts.append(decoder.decode(b"", final=True))
+            process.stdout.close()
+            output = remove_progress_symbols(remove_ansi_escape("".join(parts))).strip()
+            if process.wait() != 0:
+                return (f"Ollama command failed: {output}", "Error")
+            status_changed("OllamaServiceProvider: Response generated.")
+            return (output, "Usage information not available for ollama")
+        except TaskCanceled:
+            # Raised by chunk_received when the request is stopped
+            raise
+        except Exception as e:
+            error_msg = f"Error generating response: {str(e)}"
+            return (error_msg, "Error")
+        finally:
+            if process is not None and process.poll() is None:
+                process.kill()
+                process.wait()
+
     def _generate_batch_response_sync(self, modelName, full_request, description, custom_id, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         response_generated("Batch functionality is not supported by OllamaServiceProvider")
 
@@ -9,6 +9,28 @@ from ..modelOptions import ModelOptions
 
 
 class OpenAIServiceProvider(ServiceProviderBase):
+    # Context windows by model name prefix, longest prefix first
+    CONTEXT_WINDOWS = [
+        ("gpt-4.1", 1047576, 32768),
+        ("gpt-5", 400000, 128000),
+        ("o1-mini", 128000, 65536),
+        ("o", 200000, 100000),
+    ]
+    # USD per million input and output tokens
+    PRICES = {
+        "gpt-4.1-mini": (0.4, 1.6),
+        "gpt-4.1-nano": (0.1, 0.4),
+        "o1-mini": (1.1, 4.4),
+        "o1": (15.0, 60.0),
+        "o3": (2.0, 8.0),
+        "o3-mini": (1.1, 4.4),
+        "o4-mini": (1.1, 4.4),
+        "gpt-5.1": (1.25, 10.0),
+        "gpt-5.2": (1.75, 14.0),
+        "gpt-5-mini": (0.25, 2.0),
+        "gpt-5-nano": (0.05, 0.4),
+    }
+
     def __init__(self, settings=None, api_key=None):
         """
         `settings` is expected to be a dictionary returned by
@@ -93,7 +115,14 @@ class OpenAIServiceProvider(ServiceProviderBase):
         return "https://api.openai.com/v1"
 
     def getModelOptions(self, modelName):
-        return ModelOptions(supportBatch=True)
+        api_model_name, _ = self._parse_model_name(modelName)
+        input_price, output_price = self.PRICES.get(api_model_name, (None, None))
+        for prefix, context_window, max_output_tokens in self.CONTEXT_WINDOWS:
+            if api_model_name.startswith(prefix):
+                return ModelOptions(supportBatch=True, contextWindow=context_window,
+                                    maxOutputTokens=max_output_tokens, inputPrice=input_price,
+                                    outputPrice=output_price)
+        return ModelOptions(supportBatch=True, inputPrice=input_price, outputPrice=output_price)
 
     def getRoleForModel(self, modelName):
         api_model_name, _ = self._parse_model_name(modelName)
@@ -105,6 +134,14 @@ class OpenAIServiceProvider(ServiceProviderBase):
     def getClient(self):
         return OpenAI(api_key=self.api_key, base_url=self.getBaseUrl())
 
+    def _format_usage(self, usage):
+        """Prompts sharing a prefix of 1024+ tokens are cached automatically."""
+        if usage is None:
+            return "Usage information not available"
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', None) if details else None
+        return self.format_usage(usage.prompt_tokens, usage.completion_tokens, cached_tokens)
+
     def _generate_response_sync(self, modelName, full_request, status_changed, response_generated, project_dir=None, chosen_files=None):
         print("Response thread: Sending...")
         messages = [
@@ -131,8 +168,42 @@ class OpenAIServiceProvider(ServiceProviderBase):
         print("Response choices:" + str(len(response.choices)))
         print("------------ USAGE ------")
         print(response.usage)
-        status_changed(str(response.usage))
-        return (generated_response, response.usage)
+        usage_info = self._format_usage(response.usage)
+        status_changed(usage_info)
+        return (generated_response, usage_info)
+
+    def _generate_response_stream_sync(self, modelName, full_request, status_changed, response_generated, chunk_received, project_dir=None, chosen_files=None, cache_prefix_length=0):
+        print("Response thread: Sending (streaming)...")
+        messages = [
+            {"role": "user", "content": full_request},
+        ]
+        status_changed("Waiting for the response ...")
+        client = self.getClient()
+
+        api_model_name, reasoning_effort = self._parse_model_name(modelName)
+        kwargs = {"reasoning_effort": reasoning_effort} if reasoning_effort else {}
+        stream = client.chat.completions.create(
+            model=api_model_name,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+        parts = []
+        usage = None
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if not parts:
+                    status_changed("Receiving the response ...")
+                parts.append(chunk.choices[0].delta.content)
+                chunk_received(chunk.choices[0].delta.content)
+        print("------------ USAGE ------")
+        print(usage)
+        usage_info = self._format_usage(usage)
+        status_changed(usage_info)
+        return ("".join(parts), usage_info)
 
     def _generate_batch_response_sync(self, modelName, full_request, description, custom_id, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         status_changed("Uploading batch files ...")
@@ -183,6 +254,63 @@ class OpenAIServiceProvider(ServiceProviderBase):
         print(batch_obj)
         return batch_obj
 
+    def submit_requests_batch(self, modelName, requests, description):
+        api_model_name, reasoning_effort = self._parse_model_name(modelName)
+        tmp_dir = os.path.join(os.getcwd(), 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(mode="w+", suffix=".jsonl", dir=tmp_dir, delete=False) as temp_file:
+            for custom_id, request_text in requests.items():
+                batch_request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": api_model_name,
+                        "messages": [{"role": "user", "content": request_text}],
+                    }
+                }
+                if reasoning_effort:
+                    batch_request["body"]["reasoning_effort"] = reasoning_effort
+                temp_file.write(json.dumps(batch_request) + '\n')
+            temp_file_path = temp_file.name
+        print(f"Batch requests JSON saved at: {temp_file_path}")
+        client = self.getClient()
+        with open(temp_file_path, "rb") as file_to_upload:
+            batch_input_file = client.files.create(
+                file=file_to_upload,
+                purpose="batch"
+            )
+        batch_obj = client.batches.create(
+            input_file_id=batch_input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={
+                "description": description,
+            }
+        )
+        print(f"Batch {batch_obj.id} created with {len(requests)} requests")
+        return batch_obj.id
+
+    def get_requests_batch_results(self, modelName, batch_id):
+        client = self.getClient()
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} is {batch.status}")
+        if batch.status != "completed":
+            return None
+        results = {}
+        if batch.output_file_id:
+            file_response = client.files.content(batch.output_file_id).text
+            for line in file_response.splitlines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                body = (data.get('response') or {}).get('body') or {}
+                choices = body.get('choices') or []
+                if choices:
+                    results[data.get('custom_id', '')] = choices[0]['message']['content']
+        return results
+
     def get_completed_batch_jobs(self, modelName, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         try:
             status_changed("Getting batches list ...")
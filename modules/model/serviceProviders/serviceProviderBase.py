@@ -1,10 +1,18 @@
 import json
 import os
+import threading
 from abc import ABC, abstractmethod
 
+_semaphore_lock = threading.Lock()
+
 class ServiceProviderBase(ABC):
+    # Upper bound of simultaneous requests sent to the provider (can be
+    # overridden with "max_concurrency" in the provider settings)
+    DEFAULT_MAX_CONCURRENCY = 4
+
     def __init__(self):
         self.available_models = []
+        self._concurrency_semaphore = None
 
     @abstractmethod
     def getBaseUrl(self):
@@ -25,10 +33,53 @@ class ServiceProviderBase(ABC):
     def getModelOptions(self, modelName):
         pass
 
+    def getMaxConcurrency(self):
+        settings = getattr(self, "settings", None) or {}
+        try:
+            return max(1, int(settings.get("max_concurrency", self.DEFAULT_MAX_CONCURRENCY)))
+        except (TypeError, ValueError):
+            return self.DEFAULT_MAX_CONCURRENCY
+
+    def getConcurrencySemaphore(self):
+        """
+        Semaphore shared by all callers that send requests to this provider
+        in parallel, limiting them to getMaxConcurrency().
+        """
+        with _semaphore_lock:
+            if self._concurrency_semaphore is None:
+                self._concurrency_semaphore = threading.BoundedSemaphore(self.getMaxConcurrency())
+            return self._concurrency_semaphore
+
     @abstractmethod
     def _generate_response_sync(self, modelName, full_request, status_changed, response_generated, project_dir=None, chosen_files=None):
         pass
 
+    def _generate_response_stream_sync(self, modelName, full_request, status_changed, response_generated, chunk_received, project_dir=None, chosen_files=None, cache_prefix_length=0):
+        """
+        Same as _generate_response_sync, but passes the text to
+        chunk_received(text) as it arrives. Providers without streaming
+        pass the whole response as a single chunk.
+        The first cache_prefix_length characters of full_request stay the same
+        between similar requests; providers with explicit prompt caching mark
+        them as cacheable, the others ignore it.
+        """
+        result = self._generate_response_sync(modelName, full_request, status_changed, response_generated, project_dir, chosen_files)
+        generated_response, usage = result
+        if usage != "Error" and generated_response:
+            chunk_received(generated_response)
+        return result
+
+    @staticmethod
+    def format_usage(input_tokens, output_tokens, cached_tokens=None, cache_write_tokens=None):
+        """Usage text for the status bar; input_tokens includes the cached tokens."""
+        cache_info = []
+        if cached_tokens is not None:
+            cache_info.append(f"cached: {cached_tokens}")
+        if cache_write_tokens:
+            cache_info.append(f"written to cache: {cache_write_tokens}")
+        cache_text = f" ({', '.join(cache_info)})" if cache_info else ""
+        return f"Input tokens: {input_tokens}{cache_text}, Output tokens: {output_tokens}"
+
     @abstractmethod
     def _generate_batch_response_sync(self, modelName, full_request, description, custom_id, status_changed, response_generated, completed_job_list_updated, project_dir=None, chosen_files=None):
         pass
@@ -52,3 +103,17 @@ class ServiceProviderBase(ABC):
     @abstractmethod
     def delete_all_server_files(self, modelName, status_changed, response_generated, project_dir=None, chosen_files=None):
         pass
+
+    def submit_requests_batch(self, modelName, requests, description):
+        """
+        Submits several independent requests ({custom_id: request_text}) as
+        one batch job and returns the batch id.
+        """
+        raise NotImplementedError(f"Multi-request batches are not supported by {self.__class__.__name__}")
+
+    def get_requests_batch_results(self, modelName, batch_id):
+        """
+        Returns {custom_id: response_text} of a finished batch submitted with
+        submit_requests_batch, or None while the batch is still running.
+        """
+        raise NotImplementedError(f"Multi-request batches are not supported by {self.__class__.__name__}")
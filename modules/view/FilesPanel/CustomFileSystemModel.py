@@ -1,13 +1,15 @@
 import os
 from PyQt5.QtWidgets import QFileSystemModel
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap, QIcon, QPainter, QBrush
+from PyQt5.QtGui import QPixmap, QIcon, QPainter, QBrush, QFont
+from modules.model.FileContentFormatter import FILE_MODE_FULL
 from modules.model.ProjectMeta.ProjectMeta import FileStatus
 
 class CustomFileSystemModel(QFileSystemModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.checked_files = {}
+        self.file_modes = {}  # files attached as outline or selected symbols
         self.status_map = {}
         self._generate_icons()
 
@@ -35,8 +37,29 @@ class CustomFileSystemModel(QFileSystemModel):
         self.status_map = status_map
         self.endResetModel()
 
+    def update_file_status(self, file_path, status):
+        """Changes the status icon of a single file without resetting the model."""
+        if self.status_map.get(file_path) == status:
+            return
+        self.status_map[file_path] = status
+        index = self.index(file_path)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_file_mode(self, file_path, mode):
+        """Sets how the file is attached to requests; partially attached files are shown in italics."""
+        if mode == FILE_MODE_FULL:
+            self.file_modes.pop(file_path, None)
+        else:
+            self.file_modes[file_path] = mode
+            self.checked_files[file_path] = True
+        index = self.index(file_path)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.FontRole, Qt.CheckStateRole])
+
     def clear_checked_files(self):
         self.checked_files = {}
+        self.file_modes = {}
 
     def flags(self, index):
         if not index.isValid():
@@ -54,6 +77,10 @@ class CustomFileSystemModel(QFileSystemModel):
             icon = self.icons.get(self.status_map.get(file_path))
             if icon:
                 return icon
+        if role == Qt.FontRole and self.filePath(index) in self.file_modes:
+            font = QFont(super().data(index, role) or QFont())
+            font.setItalic(True)
+            return font
         return super().data(index, role)
 
     def setData(self, index, value, role):
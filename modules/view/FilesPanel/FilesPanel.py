@@ -24,9 +24,13 @@ class FilesPanel(QWidget):
 
     def set_model(self, model):
         self.model = model
+        self.model.project_opened.connect(self.show_project_status)
         self.project_dir = self.load_last_project_directory()
         self.file_system_model.setRootPath(self.project_dir)
         self.handle_project_selected(self.project_dir)
+        if self.model.project_meta.project_path == self.project_dir:
+            # The last project is opened by the model itself
+            self.show_project_status(self.project_dir)
 
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -75,40 +79,19 @@ class FilesPanel(QWidget):
         if self.model is None or getattr(self.model, "project_meta", None) is None:
             QMessageBox.critical(self, "Error", "Project Meta information is not available.")
             return
-        dialog = ProjectMetaSettingsDialog(self.model.project_meta, self)
+        dialog = ProjectMetaSettingsDialog(self.model.project_meta, self.model.indexing_service, self)
         dialog.exec_()
+        # Index settings or the watch mode may have changed
+        self.model.project_watcher.restart()
 
     def handle_project_selected(self, directory):
         if not directory:
             return
 
-        # Ensure that ProjectMeta is switched to the newly selected project
-        if self.model and getattr(self.model, "project_meta", None):
-            try:
-                self.model.project_meta.set_project_path(directory)
-            except Exception as e:
-                # Do not interrupt the UI flow if something goes wrong
-                print(f"FilesPanel: failed to switch ProjectMeta path -> {e}")
-
-        # Update file system view
+        # Update file system view; the project is opened by the model on proj_dir_changed
+        # and show_project_status applies its settings once it is open
         self.file_system_model.setRootPath(directory)
 
-        # Apply per-project settings (e.g., hidden extensions)
-        hidden_extensions = []
-        if self.model and getattr(self.model, "project_meta", None):
-            hidden_extensions = self.model.project_meta.getHiddenExtensions()
-        self.proxy_model.set_hidden_extensions(hidden_extensions)
-
-        # Refresh status map based on the currently opened project
-        if self.model and getattr(self.model, "project_meta", None):
-            relative_files = self.model.project_meta.getAll_project_files()
-            statuses_map = {}
-            for rel_path in relative_files:
-                status = self.model.project_meta.getFileStatus(rel_path)
-                abs_path = os.path.join(directory, rel_path)
-                statuses_map[abs_path] = status
-            self.file_system_model.set_status_map(statuses_map)
-
         source_index = self.file_system_model.index(directory)
         proxy_index = self.proxy_model.mapFromSource(source_index)
         if proxy_index.isValid():
@@ -119,6 +102,21 @@ class FilesPanel(QWidget):
         self.clear_checked_files()
         self.update_settings(directory)
 
+    def show_project_status(self, directory):
+        """Applies the settings and file statuses of the project opened by the model."""
+        if directory != self.project_dir or not self.model or not getattr(self.model, "project_meta", None):
+            return
+        project_meta = self.model.project_meta
+
+        # Apply per-project settings (e.g., hidden extensions)
+        self.proxy_model.set_hidden_extensions(project_meta.getHiddenExtensions())
+
+        # Refresh status map based on the currently opened project
+        statuses_map = {}
+        for rel_path in project_meta.getAll_project_files():
+            statuses_map[os.path.join(directory, rel_path)] = project_meta.getFileStatus(rel_path)
+        self.file_system_model.set_status_map(statuses_map)
+
     def load_last_project_directory(self):
         if self.model and hasattr(self.model, "historyModel"):
             return self.model.historyModel.get_last_project_directory()
@@ -136,9 +134,31 @@ class FilesPanel(QWidget):
         ]
         return self.project_dir, relative_files
 
+    def get_file_modes(self):
+        """Attach modes of the checked files which are not attached in full."""
+        return {
+            os.path.relpath(path, self.project_dir): mode
+            for path, mode in self.file_system_model.file_modes.items()
+            if self.file_system_model.checked_files.get(path, False)
+        }
+
     def clear_checked_files(self):
         self.file_system_model.clear_checked_files()
 
+    def check_files(self, relative_files):
+        """Checks the given files and expands the tree down to them."""
+        for rel_path in relative_files:
+            file_path = os.path.join(self.project_dir, rel_path)
+            self.file_system_model.checked_files[file_path] = True
+            source_index = self.file_system_model.index(file_path)
+            if not source_index.isValid():
+                continue
+            self.file_system_model.dataChanged.emit(source_index, source_index, [Qt.CheckStateRole])
+            parent = source_index.parent()
+            while parent.isValid():
+                self.tree_view.expand(self.proxy_model.mapFromSource(parent))
+                parent = parent.parent()
+
     def on_item_entered(self, index):
         if not index.isValid():
             QToolTip.hideText()
@@ -5,6 +5,9 @@ import subprocess
 from PyQt5.QtWidgets import QMenu, QMessageBox
 from PyQt5.QtCore import QUrl
 from PyQt5.QtGui import QDesktopServices
+from modules.model.FileContentFormatter import FILE_MODE_FULL, FILE_MODE_OUTLINE
+from modules.model.ProjectMeta.SymbolIndex import SymbolIndex
+from modules.view.FilesPanel.SymbolSelectionDialog import SymbolSelectionDialog
 
 
 class FilesPanelContextMenu:
@@ -32,6 +35,8 @@ class FilesPanelContextMenu:
             open_action.triggered.connect(lambda *_: self.open_file(item_path))
             index_action = menu.addAction("Index description")
             index_action.triggered.connect(lambda *_: self.index_description(item_path))
+            if SymbolIndex.supports(item_path):
+                self.add_attach_mode_menu(menu, item_path)
             delete_action = menu.addAction("Delete file")
             delete_action.triggered.connect(lambda *_: self.delete_file(item_path))
         menu.exec_(self.files_panel.tree_view.viewport().mapToGlobal(point))
@@ -44,14 +49,36 @@ class FilesPanelContextMenu:
 
     def index_description(self, file_path):
         rel_path = os.path.relpath(file_path, self.files_panel.project_dir)
-        self.files_panel.model.project_meta.update_description(rel_path)
-        new_status = self.files_panel.model.project_meta.getFileStatus(rel_path)
-        self.files_panel.file_system_model.status_map[file_path] = new_status
-        self.files_panel.file_system_model.set_status_map(self.files_panel.file_system_model.status_map)
-        source_index = self.files_panel.file_system_model.index(self.files_panel.project_dir)
-        proxy_index = self.files_panel.proxy_model.mapFromSource(source_index)
-        if proxy_index.isValid():
-            self.files_panel.tree_view.setRootIndex(proxy_index)
+        # The status icon is updated by the indexing service when the file is done
+        self.files_panel.model.indexing_service.index_files([rel_path])
+
+    def add_attach_mode_menu(self, menu, file_path):
+        mode = self.files_panel.file_system_model.file_modes.get(file_path, FILE_MODE_FULL)
+        attach_menu = menu.addMenu("Attach as")
+        full_action = attach_menu.addAction("Full content")
+        full_action.setCheckable(True)
+        full_action.setChecked(mode == FILE_MODE_FULL)
+        full_action.triggered.connect(lambda *_: self.files_panel.file_system_model.set_file_mode(file_path, FILE_MODE_FULL))
+        outline_action = attach_menu.addAction("Outline")
+        outline_action.setCheckable(True)
+        outline_action.setChecked(mode == FILE_MODE_OUTLINE)
+        outline_action.triggered.connect(lambda *_: self.files_panel.file_system_model.set_file_mode(file_path, FILE_MODE_OUTLINE))
+        symbols_action = attach_menu.addAction("Selected symbols...")
+        symbols_action.setCheckable(True)
+        symbols_action.setChecked(isinstance(mode, list))
+        symbols_action.triggered.connect(lambda *_: self.select_symbols(file_path))
+
+    def select_symbols(self, file_path):
+        rel_path = os.path.relpath(file_path, self.files_panel.project_dir)
+        symbols = self.files_panel.model.project_meta.get_file_symbols(rel_path)
+        if not symbols:
+            QMessageBox.information(self.files_panel, "Attach selected symbols", f"No symbols found in {rel_path}.")
+            return
+        current = self.files_panel.file_system_model.file_modes.get(file_path)
+        dialog = SymbolSelectionDialog(rel_path, symbols, current if isinstance(current, list) else None, self.files_panel)
+        if dialog.exec_():
+            selected = dialog.selected_symbols()
+            self.files_panel.file_system_model.set_file_mode(file_path, selected if selected else FILE_MODE_FULL)
 
     def delete_file(self, file_path):
         reply = QMessageBox.question(
@@ -0,0 +1,39 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QDialogButtonBox
+
+
+class SymbolSelectionDialog(QDialog):
+    """Lets the user pick the classes and functions of a file to attach to requests."""
+
+    def __init__(self, relative_path, symbols, selected=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Attach selected symbols")
+        self.resize(500, 450)
+        selected = set(selected or [])
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(f"Symbols of {relative_path} to attach:"))
+        self.list_widget = QListWidget()
+        for symbol in symbols:
+            if symbol['kind'] == "variable":
+                continue
+            indent = "    " * symbol['name'].count(".")
+            item = QListWidgetItem(f"{indent}{symbol['signature']}  (lines {symbol['start']}-{symbol['end']})")
+            item.setData(Qt.UserRole, symbol['name'])
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if symbol['name'] in selected else Qt.Unchecked)
+            if symbol['docstring']:
+                item.setToolTip(symbol['docstring'])
+            self.list_widget.addItem(item)
+        layout.addWidget(self.list_widget)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+    def selected_symbols(self):
+        return [
+            self.list_widget.item(row).data(Qt.UserRole)
+            for row in range(self.list_widget.count())
+            if self.list_widget.item(row).checkState() == Qt.Checked
+        ]
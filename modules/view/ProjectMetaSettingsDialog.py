@@ -1,11 +1,13 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QLineEdit, QPushButton, QInputDialog, QComboBox
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, QLineEdit, QPushButton, QInputDialog, QComboBox, QMessageBox, QSpinBox, QProgressBar, QCheckBox
 
 class ProjectMetaSettingsDialog(QDialog):
-    def __init__(self, project_meta, parent=None):
+    def __init__(self, project_meta, indexing_service, parent=None):
         super().__init__(parent)
         self.project_meta = project_meta
+        self.indexing_service = indexing_service
         self.init_ui()
         self.load_settings()
+        self.connect_indexing_service()
 
     def init_ui(self):
         self.setWindowTitle("Project Meta Settings")
@@ -25,6 +27,18 @@ class ProjectMetaSettingsDialog(QDialog):
         settings_layout.addWidget(self.hide_label)
         self.hide_line_edit = QLineEdit()
         settings_layout.addWidget(self.hide_line_edit)
+        self.exclude_label = QLabel("Exclude patterns (comma-separated, .gitignore syntax):")
+        settings_layout.addWidget(self.exclude_label)
+        self.exclude_line_edit = QLineEdit()
+        settings_layout.addWidget(self.exclude_line_edit)
+        self.pack_label = QLabel("Pack small files into one indexing request, tokens per request (0 - off):")
+        settings_layout.addWidget(self.pack_label)
+        self.pack_spin_box = QSpinBox()
+        self.pack_spin_box.setRange(0, 200000)
+        self.pack_spin_box.setSingleStep(1000)
+        settings_layout.addWidget(self.pack_spin_box)
+        self.watch_checkbox = QCheckBox("Watch for changes and re-index changed files")
+        settings_layout.addWidget(self.watch_checkbox)
         self.model_label = QLabel("Indexing model:")
         settings_layout.addWidget(self.model_label)
         self.model_combo = QComboBox()
@@ -45,7 +59,30 @@ class ProjectMetaSettingsDialog(QDialog):
         actions_layout.addWidget(self.force_index_all_button)
         self.index_one_button = QPushButton("Index one")
         actions_layout.addWidget(self.index_one_button)
-        actions_group.setLayout(actions_layout)
+
+        batch_layout = QHBoxLayout()
+        self.batch_index_button = QPushButton("Index all via batch")
+        batch_layout.addWidget(self.batch_index_button)
+        self.apply_batch_button = QPushButton("Apply batch results")
+        batch_layout.addWidget(self.apply_batch_button)
+        self.summarize_dirs_button = QPushButton("Summarize directories")
+        batch_layout.addWidget(self.summarize_dirs_button)
+        actions_outer_layout = QVBoxLayout()
+        actions_outer_layout.addLayout(actions_layout)
+        actions_outer_layout.addLayout(batch_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        actions_outer_layout.addWidget(self.progress_bar)
+        self.progress_label = QLabel("")
+        actions_outer_layout.addWidget(self.progress_label)
+        control_layout = QHBoxLayout()
+        self.pause_button = QPushButton("Pause")
+        control_layout.addWidget(self.pause_button)
+        self.cancel_button = QPushButton("Cancel")
+        control_layout.addWidget(self.cancel_button)
+        actions_outer_layout.addLayout(control_layout)
+        actions_group.setLayout(actions_outer_layout)
         main_layout.addWidget(actions_group)
 
         self.setLayout(main_layout)
@@ -55,6 +92,100 @@ class ProjectMetaSettingsDialog(QDialog):
         self.index_all_button.clicked.connect(self.run_index_all)
         self.force_index_all_button.clicked.connect(self.run_force_index_all)
         self.index_one_button.clicked.connect(self.run_index_one)
+        self.batch_index_button.clicked.connect(self.run_batch_index_all)
+        self.apply_batch_button.clicked.connect(self.run_apply_batch_results)
+        self.summarize_dirs_button.clicked.connect(self.run_summarize_directories)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button.clicked.connect(self.cancel_job)
+
+    def connect_indexing_service(self):
+        service = self.indexing_service
+        service.progress_changed.connect(self.on_progress_changed)
+        service.stats_changed.connect(self.progress_label.setText)
+        service.running_changed.connect(self.on_running_changed)
+        service.paused_changed.connect(self.on_paused_changed)
+        service.job_finished.connect(self.on_job_finished)
+        service.job_failed.connect(self.on_job_failed)
+        self.finished.connect(self.disconnect_indexing_service)
+        self.on_running_changed(service.is_running())
+        self.on_paused_changed(service.is_paused())
+
+    def disconnect_indexing_service(self):
+        # Jobs keep running after the dialog is closed
+        service = self.indexing_service
+        service.progress_changed.disconnect(self.on_progress_changed)
+        service.stats_changed.disconnect(self.progress_label.setText)
+        service.running_changed.disconnect(self.on_running_changed)
+        service.paused_changed.disconnect(self.on_paused_changed)
+        service.job_finished.disconnect(self.on_job_finished)
+        service.job_failed.disconnect(self.on_job_failed)
+
+    def on_progress_changed(self, done, total, rel_path):
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def on_running_changed(self, running):
+        self.pause_button.setEnabled(running)
+        self.cancel_button.setEnabled(running)
+        if running:
+            self.progress_bar.setValue(0)
+
+    def on_paused_changed(self, paused):
+        self.pause_button.setText("Resume" if paused else "Pause")
+
+    def toggle_pause(self):
+        if self.indexing_service.is_paused():
+            self.indexing_service.resume()
+        else:
+            self.indexing_service.pause()
+
+    def cancel_job(self):
+        self.indexing_service.cancel()
+
+    def on_job_finished(self, name, result):
+        print(f"[GUI] {name} completed")
+        if name == "Stats":
+            QMessageBox.information(
+                self,
+                "Stats",
+                f"Total files: {result['total_files']}\n"
+                f"New files: {len(result['new_files'])}\n"
+                f"Outdated files: {len(result['outdated_files'])}\n"
+                f"Up-to-date files: {len(result['up_to_date_files'])}"
+            )
+        elif name == "Batch submit":
+            if result and result.get('status') == "unsupported":
+                QMessageBox.information(self, "Batch",
+                                        f"Model {result['model']} does not support batch requests.")
+            elif result:
+                QMessageBox.information(self, "Batch submitted",
+                                        f"Batch {result['batch_id']} submitted for {len(result['files'])} files.")
+            else:
+                QMessageBox.information(self, "Batch", "All descriptions are up to date.")
+        elif name == "Batch apply":
+            QMessageBox.information(
+                self,
+                "Batch results",
+                f"Applied: {len(result['applied_files'])}\n"
+                f"Changed since submission: {len(result['stale_files'])}\n"
+                f"Without an answer (indexed by the next run): {len(result['failed_files'])}\n"
+                f"Jobs still running: {len(result['running_jobs'])}\n"
+                f"Failed jobs: {len(result['failed_jobs'])}\n"
+                f"Jobs of models without batch support: {len(result['unsupported_jobs'])}"
+            )
+        elif name == "Directory summaries":
+            self.progress_label.setText(
+                f"{name}: {len(result['updated_directories'])} of {result['total_directories']} updated, "
+                f"{len(result['failed_directories'])} failed" + (" (canceled)" if result['canceled'] else "")
+            )
+        elif isinstance(result, dict) and 'failed_files' in result:
+            self.progress_label.setText(
+                f"{name}: {len(result['indexed_files'])} indexed, {len(result['cached_files'])} from cache, "
+                f"{len(result['failed_files'])} failed" + (" (canceled)" if result['canceled'] else "")
+            )
+
+    def on_job_failed(self, name, error):
+        QMessageBox.critical(self, "Error", f"{name} failed: {error}")
 
     def save_settings(self):
         ext_text = self.line_edit.text()
@@ -63,12 +194,20 @@ class ProjectMetaSettingsDialog(QDialog):
         index_directories = [d.strip() for d in dir_text.split(",") if d.strip()]
         hide_text = self.hide_line_edit.text()
         hide_extensions = [h.strip() for h in hide_text.split(",") if h.strip()]
+        exclude_text = self.exclude_line_edit.text()
+        exclude_patterns = [p.strip() for p in exclude_text.split(",") if p.strip()]
+        pack_token_budget = self.pack_spin_box.value()
+        watch_changes = self.watch_checkbox.isChecked()
         model = self.model_combo.currentText()
         print(f"\n[GUI] Saving index extensions: {index_extensions}")
         print(f"[GUI] Saving index directories: {index_directories}")
         print(f"[GUI] Saving hide extensions: {hide_extensions}")
+        print(f"[GUI] Saving exclude patterns: {exclude_patterns}")
+        print(f"[GUI] Saving pack token budget: {pack_token_budget}")
+        print(f"[GUI] Saving watch changes: {watch_changes}")
         print(f"[GUI] Saving indexing model: {model}")
-        self.project_meta.save_settings(index_extensions, index_directories, model, hide_extensions)
+        self.project_meta.save_settings(index_extensions, index_directories, model, hide_extensions, exclude_patterns,
+                                        pack_token_budget, watch_changes)
         print("[GUI] Settings saved successfully")
 
     def load_settings(self):
@@ -87,26 +226,44 @@ class ProjectMetaSettingsDialog(QDialog):
         hide_extensions = self.project_meta.getHiddenExtensions()
         print(f"[GUI] Retrieved hide extensions: {hide_extensions}")
         self.hide_line_edit.setText(", ".join(hide_extensions))
+        exclude_patterns = self.project_meta.getExcludePatterns()
+        print(f"[GUI] Retrieved exclude patterns: {exclude_patterns}")
+        self.exclude_line_edit.setText(", ".join(exclude_patterns))
+        pack_token_budget = getattr(self.project_meta, 'pack_token_budget', 0)
+        print(f"[GUI] Retrieved pack token budget: {pack_token_budget}")
+        self.pack_spin_box.setValue(pack_token_budget)
+        watch_changes = getattr(self.project_meta, 'watch_changes', False)
+        print(f"[GUI] Retrieved watch changes: {watch_changes}")
+        self.watch_checkbox.setChecked(watch_changes)
         print("[GUI] Settings loaded into UI")
 
     def run_stats(self):
         print("\n[GUI] Running stats")
-        self.project_meta.stat_descriptions()
+        self.indexing_service.compute_stats()
 
     def run_index_all(self):
         print("\n[GUI] Running index all")
-        self.project_meta.update_descriptions()
-        print("[GUI] Index all completed")
+        self.indexing_service.index_all()
 
     def run_force_index_all(self):
         print("\n[GUI] Running force reindex all")
-        self.project_meta.force_update_descriptions()
-        print("[GUI] Force reindex all completed")
+        self.indexing_service.force_index_all()
+
+    def run_batch_index_all(self):
+        print("\n[GUI] Submitting index all batch")
+        self.indexing_service.run_job("Batch submit", self.project_meta.submit_batch_indexing)
+
+    def run_apply_batch_results(self):
+        print("\n[GUI] Applying batch results")
+        self.indexing_service.run_job("Batch apply", self.project_meta.apply_batch_indexing_results)
+
+    def run_summarize_directories(self):
+        print("\n[GUI] Summarizing directories")
+        self.indexing_service.summarize_directories()
 
     def run_index_one(self):
         files = self.project_meta.getAll_project_files()
         file, ok = QInputDialog.getItem(self, "Select File", "File:", files, 0, False)
         if ok and file:
             print(f"\n[GUI] Indexing one file: {file}")
-            self.project_meta.update_description(file)
-            print("[GUI] Index one completed")
+            self.indexing_service.index_files([file])
@@ -1,12 +1,17 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QComboBox, QLabel, QTextEdit, QPushButton, QHBoxLayout, QLineEdit, QRadioButton, QButtonGroup, QCheckBox, QScrollArea, QGridLayout, QMenu
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGroupBox, QComboBox, QLabel, QTextEdit, QPushButton, QHBoxLayout, QLineEdit, QRadioButton, QButtonGroup, QCheckBox, QScrollArea, QGridLayout, QMenu, QSpinBox
+from PyQt5.QtCore import pyqtSignal, QTimer
 from PyQt5.QtGui import QMovie, QCursor
 from modules.view.RoleSelector import RoleSelector
 from modules.model.RequestOptions import RequestOptions
+from modules.model.constants import IMPORT_EXPANSION_MAX_HOPS
 
 class RequestPanel(QWidget):
     send_request_signal = pyqtSignal(str, str, str, bool, object)  # model, role, request, editorMode, requestOptions
     send_batch_request_signal = pyqtSignal(str, str, str, str, bool, object)  # model, role, request, description, editorMode, requestOptions
+    suggest_files_signal = pyqtSignal(str)  # request
+    profile_request_signal = pyqtSignal()  # the request or its options changed
+    stop_request_signal = pyqtSignal()
+    PROFILE_DELAY_MS = 500
 
     def __init__(self, available_models):
         super().__init__()
@@ -63,6 +68,11 @@ class RequestPanel(QWidget):
         self.history_button.setFixedWidth(30)
         self.history_button.clicked.connect(self.show_history_menu)
         text_edit_layout.addWidget(self.history_button)
+        self.suggest_button = QPushButton("S")
+        self.suggest_button.setFixedWidth(30)
+        self.suggest_button.setToolTip("Suggest files for the request (checks them in the files panel)")
+        self.suggest_button.clicked.connect(self.handle_suggest_files)
+        text_edit_layout.addWidget(self.suggest_button)
 
         request_layout.addWidget(self.request_label)
         request_layout.addLayout(text_edit_layout)
@@ -71,10 +81,50 @@ class RequestPanel(QWidget):
         self.include_files_checkbox = QCheckBox("Include files list in the request")
         request_layout.addWidget(self.include_files_checkbox)
 
+        # Directory summaries instead of (or in addition to) the flat list
+        self.include_map_checkbox = QCheckBox("Include project map (directory summaries)")
+        request_layout.addWidget(self.include_map_checkbox)
+
+        self.auto_select_checkbox = QCheckBox("Select files automatically (by file descriptions)")
+        request_layout.addWidget(self.auto_select_checkbox)
+
+        # Python files imported by the checked files and importing them
+        imports_layout = QHBoxLayout()
+        self.include_imports_checkbox = QCheckBox("Include imported and importing files, hops:")
+        imports_layout.addWidget(self.include_imports_checkbox)
+        self.import_hops_spin_box = QSpinBox()
+        self.import_hops_spin_box.setRange(1, IMPORT_EXPANSION_MAX_HOPS)
+        imports_layout.addWidget(self.import_hops_spin_box)
+        imports_layout.addStretch()
+        request_layout.addLayout(imports_layout)
+
         # New checkbox for attaching last commit diff
         self.attach_diff_checkbox = QCheckBox("Attach last commit diff")
         request_layout.addWidget(self.attach_diff_checkbox)
 
+        # Identical requests on unchanged files get the stored response
+        self.use_cache_checkbox = QCheckBox("Reuse cached response of an identical request")
+        request_layout.addWidget(self.use_cache_checkbox)
+
+        # Pre-flight estimate of the request, updated shortly after the last change
+        self.profile_label = QLabel()
+        self.profile_label.setWordWrap(True)
+        request_layout.addWidget(self.profile_label)
+        self.profile_timer = QTimer(self)
+        self.profile_timer.setSingleShot(True)
+        self.profile_timer.setInterval(self.PROFILE_DELAY_MS)
+        self.profile_timer.timeout.connect(self.profile_request_signal.emit)
+        self.request_input.textChanged.connect(self.schedule_profile)
+        self.model_dropdown.currentTextChanged.connect(self.schedule_profile)
+        self.editor_mode_button.toggled.connect(self.schedule_profile)
+        self.role_selector.role_checkbox.toggled.connect(self.schedule_profile)
+        self.role_selector.language_dropdown.currentTextChanged.connect(self.schedule_profile)
+        self.role_selector.role_dropdown.currentTextChanged.connect(self.schedule_profile)
+        for checkbox in (self.include_files_checkbox, self.include_map_checkbox, self.auto_select_checkbox,
+                         self.include_imports_checkbox, self.attach_diff_checkbox):
+            checkbox.toggled.connect(self.schedule_profile)
+        self.import_hops_spin_box.valueChanged.connect(self.schedule_profile)
+
         batch_layout = QHBoxLayout()
 
         self.description_label = QLabel('Description:')
@@ -92,6 +142,11 @@ class RequestPanel(QWidget):
         self.send_button = QPushButton('Send')
         self.send_button.clicked.connect(self.handle_send)
         button_layout.addWidget(self.send_button)
+        self.stop_button = QPushButton('Stop')
+        self.stop_button.setToolTip("Cancel the request; the text received so far is kept")
+        self.stop_button.clicked.connect(self.stop_request_signal.emit)
+        self.stop_button.hide()
+        button_layout.addWidget(self.stop_button)
         self.spinner = QLabel()
         self.movie = QMovie("resources/spinner.gif")
         self.spinner.setMovie(self.movie)
@@ -110,21 +165,25 @@ class RequestPanel(QWidget):
     def handle_send_batch(self):
         self._emit_send(is_batch=True)
 
+    def handle_suggest_files(self):
+        request_text = self.request_input.toPlainText()
+        if request_text.strip():
+            self.suggest_files_signal.emit(request_text)
+
     def _emit_send(self, is_batch=False):
         self.send_button.setEnabled(False)
         self.send_batch_button.setEnabled(False)
         self.movie.start()
         self.spinner.show()
+        if not is_batch:
+            self.stop_button.show()
 
         request_text = self.request_input.toPlainText()
         if request_text:
             role_description = self.role_selector.get_role_string()
             selected_model = self.model_dropdown.currentText()
             editor_mode = self.editor_mode_button.isChecked()
-            request_options = RequestOptions(
-                includeFilesList=self.include_files_checkbox.isChecked(),
-                attachLastCommitDiff=self.attach_diff_checkbox.isChecked()
-            )
+            request_options = self.get_request_options()
             self.request_input.clear()
             if is_batch:
                 description_text = self.description_input.text()
@@ -132,6 +191,34 @@ class RequestPanel(QWidget):
             else:
                 self.send_request_signal.emit(selected_model, role_description, request_text, editor_mode, request_options)
 
+    def get_request_options(self):
+        return RequestOptions(
+            includeFilesList=self.include_files_checkbox.isChecked(),
+            attachLastCommitDiff=self.attach_diff_checkbox.isChecked(),
+            includeProjectMap=self.include_map_checkbox.isChecked(),
+            autoSelectFiles=self.auto_select_checkbox.isChecked(),
+            importHops=self.import_hops_spin_box.value() if self.include_imports_checkbox.isChecked() else 0,
+            useResponseCache=self.use_cache_checkbox.isChecked()
+        )
+
+    def schedule_profile(self, *args):
+        self.profile_timer.start()
+
+    def show_request_profile(self, profile):
+        parts = ", ".join(f"{name} {tokens:,}" for name, tokens in profile['parts'] if tokens)
+        text = f"~{profile['total']:,} tokens ({parts})"
+        if profile['cost'] is not None:
+            text += f" · ~${profile['cost']:.4f}"
+            if not profile['output_cost_included']:
+                text += " + output"
+        if profile['latency'] is not None:
+            text += f" · ~{profile['latency']:.0f} s"
+        if profile['notes']:
+            text += " · " + "; ".join(profile['notes'])
+        self.profile_label.setText(text)
+        files = sorted(profile['files'], key=lambda item: -item[1])
+        self.profile_label.setToolTip("\n".join(f"{rel_path}: {tokens:,}" for rel_path, tokens in files))
+
     def set_processing(self, is_processing):
         self.send_button.setEnabled(not is_processing)
         self.send_batch_button.setEnabled(not is_processing)
@@ -141,6 +228,7 @@ class RequestPanel(QWidget):
         else:
             self.movie.stop()
             self.spinner.hide()
+            self.stop_button.hide()
 
     def set_batch_support(self, supportBatch):
         self.send_batch_button.setEnabled(supportBatch)
@@ -1,5 +1,6 @@
 from PyQt5.QtWidgets import QApplication, QWidget, QTextEdit, QVBoxLayout, QHBoxLayout, QSplitter, QGroupBox, QSizePolicy
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QTextCursor
 from modules.view.FilesPanel.FilesPanel import FilesPanel
 from modules.view.BatchesPanel import BatchesPanel
 from modules.view.RequestPanel import RequestPanel
@@ -7,10 +8,18 @@ from modules.view.TopPanel import TopPanel  # Import the new TopPanel
 from modules.view.StatusBar import StatusBar  # Import the new StatusBar
 
 class ProjectGPTView(QWidget):
+    # Streamed text is appended to the response display at most this often
+    RESPONSE_FLUSH_MS = 100
+
     def __init__(self, available_models):
         super().__init__()
         self.available_models = available_models
         self.model = None
+        self.pending_chunks = []
+        self.active_request = None  # token of the request whose response is streamed
+        self.chunk_timer = QTimer(self)
+        self.chunk_timer.setInterval(self.RESPONSE_FLUSH_MS)
+        self.chunk_timer.timeout.connect(self.flush_response_chunks)
         self.init_ui()
 
     def init_ui(self):
@@ -78,11 +87,52 @@ class ProjectGPTView(QWidget):
 
     def update_response(self, response):
         """
-        Updates the response display in the UI.
+        Updates the response display in the UI. Messages which are not part of
+        the response being streamed go to the status bar until it ends.
         """
+        if self.active_request is not None:
+            self.status_bar.update_status(response)
+            return
+        self.chunk_timer.stop()
+        self.pending_chunks = []
         self.response_display.setText(response)
         self.request_panel.set_processing(False)
 
+    def start_response(self, request):
+        """Clears the response display for the text streamed by the request."""
+        self.active_request = request
+        self.chunk_timer.stop()
+        self.pending_chunks = []
+        self.response_display.clear()
+
+    def finish_response(self, request, response):
+        """Replaces the streamed text by the whole response of the request."""
+        if request is not self.active_request:
+            return
+        self.active_request = None
+        self.update_response(response)
+
+    def append_response_chunk(self, request, text):
+        if request is not self.active_request:
+            return
+        self.pending_chunks.append(text)
+        if not self.chunk_timer.isActive():
+            self.chunk_timer.start()
+
+    def flush_response_chunks(self):
+        if not self.pending_chunks:
+            self.chunk_timer.stop()
+            return
+        text = "".join(self.pending_chunks)
+        self.pending_chunks = []
+        scroll_bar = self.response_display.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum() - 4
+        cursor = self.response_display.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
     def set_additional_requests(self, additional_requests):
         """
         Sets the additional requests in the RequestPanel.